@@ -0,0 +1,157 @@
+"""add_listing_price_history
+
+Revision ID: a7b3c9d1e5f8
+Revises: f2a7b3c5d9e1
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'a7b3c9d1e5f8'
+down_revision = 'f2a7b3c5d9e1'
+branch_labels = None
+depends_on = None
+
+
+# Creates the monthly partitions of listing_price_history from the current
+# month through `months_ahead` months later.  Rows outside them land in
+# the default partition, so writes never fail if maintenance falls behind;
+# once their month is created they are moved out of the default (which
+# is detached meanwhile, as Postgres requires).  A month that still fails
+# is reported as a warning and skipped, so the others go ahead.
+ENSURE_PARTITIONS_SQL = """
+CREATE FUNCTION listing_price_history_ensure_partitions(months_ahead integer DEFAULT 3)
+RETURNS integer LANGUAGE plpgsql AS $$
+DECLARE
+    month_start date := date_trunc('month', now() AT TIME ZONE 'UTC')::date;
+    range_start timestamptz;
+    range_end timestamptz;
+    partition_name text;
+    created integer := 0;
+BEGIN
+    FOR i IN 0..months_ahead LOOP
+        partition_name := 'listing_price_history_' || to_char(month_start, 'YYYY_MM');
+        range_start := month_start::timestamp AT TIME ZONE 'UTC';
+        range_end := (month_start + interval '1 month')::timestamp AT TIME ZONE 'UTC';
+        IF to_regclass(partition_name) IS NULL THEN
+            BEGIN
+                IF EXISTS (
+                    SELECT 1 FROM listing_price_history_default
+                    WHERE recorded_at >= range_start AND recorded_at < range_end
+                ) THEN
+                    ALTER TABLE listing_price_history DETACH PARTITION listing_price_history_default;
+                    EXECUTE format(
+                        'CREATE TABLE %I PARTITION OF listing_price_history FOR VALUES FROM (%L) TO (%L)',
+                        partition_name, range_start, range_end
+                    );
+                    WITH moved AS (
+                        DELETE FROM listing_price_history_default
+                        WHERE recorded_at >= range_start AND recorded_at < range_end
+                        RETURNING *
+                    )
+                    INSERT INTO listing_price_history SELECT * FROM moved;
+                    ALTER TABLE listing_price_history ATTACH PARTITION listing_price_history_default DEFAULT;
+                ELSE
+                    EXECUTE format(
+                        'CREATE TABLE %I PARTITION OF listing_price_history FOR VALUES FROM (%L) TO (%L)',
+                        partition_name, range_start, range_end
+                    );
+                END IF;
+                created := created + 1;
+            EXCEPTION WHEN others THEN
+                RAISE WARNING 'could not create partition %: %', partition_name, SQLERRM;
+            END;
+        END IF;
+        month_start := (month_start + interval '1 month')::date;
+    END LOOP;
+    RETURN created;
+END;
+$$
+"""
+
+# One history row per price change, folded into the hour and day rollups
+# of the listing in the same statement.  Rollups are keyed by currency, so
+# a listing whose currency changes starts new buckets instead of mixing
+# amounts; listings without a currency are rolled up as USD.
+RECORD_PRICE_SQL = """
+CREATE FUNCTION listing_price_history_record() RETURNS trigger LANGUAGE plpgsql AS $$
+DECLARE
+    recorded timestamptz := now();
+    previous integer := CASE WHEN TG_OP = 'UPDATE' THEN OLD.price_amount END;
+BEGIN
+    INSERT INTO listing_price_history (recorded_at, listing_id, price_amount, previous_amount, currency)
+    VALUES (recorded, NEW.id, NEW.price_amount, previous, NEW.currency);
+
+    INSERT INTO listing_price_rollups AS r
+        (listing_id, granularity, currency, bucket_start, min_price, max_price, sum_price, observations)
+    SELECT NEW.id, g.granularity, COALESCE(NEW.currency, 'USD'),
+           date_trunc(g.granularity, recorded AT TIME ZONE 'UTC') AT TIME ZONE 'UTC',
+           NEW.price_amount, NEW.price_amount, NEW.price_amount, 1
+    FROM (VALUES ('hour'), ('day')) AS g (granularity)
+    ON CONFLICT (listing_id, granularity, currency, bucket_start) DO UPDATE SET
+        min_price = LEAST(r.min_price, EXCLUDED.min_price),
+        max_price = GREATEST(r.max_price, EXCLUDED.max_price),
+        sum_price = r.sum_price + EXCLUDED.sum_price,
+        observations = r.observations + 1;
+    RETURN NULL;
+END;
+$$
+"""
+
+
+def upgrade() -> None:
+    op.create_table('listing_price_history',
+    sa.Column('id', sa.BigInteger(), sa.Identity(), nullable=False),
+    sa.Column('recorded_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('listing_id', sa.UUID(), nullable=False),
+    sa.Column('price_amount', sa.Integer(), nullable=False, comment='Price in smallest currency denomination (cents, pence, etc.)'),
+    sa.Column('previous_amount', sa.Integer(), nullable=True),
+    sa.Column('currency', sa.String(length=3), nullable=True),
+    sa.ForeignKeyConstraint(['listing_id'], ['listings.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id', 'recorded_at'),
+    postgresql_partition_by='RANGE (recorded_at)',
+    )
+    op.create_index(op.f('ix_listing_price_history_listing_id'), 'listing_price_history', ['listing_id'])
+    op.execute("CREATE TABLE listing_price_history_default PARTITION OF listing_price_history DEFAULT")
+    op.execute(ENSURE_PARTITIONS_SQL)
+    op.execute("SELECT listing_price_history_ensure_partitions(3)")
+
+    op.create_table('listing_price_rollups',
+    sa.Column('listing_id', sa.UUID(), nullable=False),
+    sa.Column('granularity', sa.String(length=5), nullable=False),
+    sa.Column('currency', sa.String(length=3), nullable=False),
+    sa.Column('bucket_start', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('min_price', sa.Integer(), nullable=False),
+    sa.Column('max_price', sa.Integer(), nullable=False),
+    sa.Column('sum_price', sa.BigInteger(), nullable=False),
+    sa.Column('observations', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['listing_id'], ['listings.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('listing_id', 'granularity', 'currency', 'bucket_start')
+    )
+
+    op.execute(RECORD_PRICE_SQL)
+    op.execute("""
+        CREATE TRIGGER listings_price_history_insert
+        AFTER INSERT ON listings
+        FOR EACH ROW WHEN (NEW.price_amount IS NOT NULL)
+        EXECUTE FUNCTION listing_price_history_record()
+    """)
+    op.execute("""
+        CREATE TRIGGER listings_price_history_update
+        AFTER UPDATE OF price_amount ON listings
+        FOR EACH ROW WHEN (NEW.price_amount IS NOT NULL AND NEW.price_amount IS DISTINCT FROM OLD.price_amount)
+        EXECUTE FUNCTION listing_price_history_record()
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER listings_price_history_update ON listings")
+    op.execute("DROP TRIGGER listings_price_history_insert ON listings")
+    op.execute("DROP FUNCTION listing_price_history_record()")
+    op.drop_table('listing_price_rollups')
+    op.execute("DROP FUNCTION listing_price_history_ensure_partitions(integer)")
+    # Drops every partition with it.
+    op.drop_index(op.f('ix_listing_price_history_listing_id'), table_name='listing_price_history')
+    op.drop_table('listing_price_history')
@@ -0,0 +1,43 @@
+"""add_chat_turn_events
+
+Revision ID: c1d7e9a2f4b6
+Revises: a8c2e4f61b93
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'c1d7e9a2f4b6'
+down_revision = 'a8c2e4f61b93'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('chat_turn_events',
+    sa.Column('turn_id', sa.UUID(), nullable=False),
+    sa.Column('seq', sa.Integer(), nullable=False, comment='1-based event id, sent to clients as the SSE id'),
+    sa.Column('data', sa.Text(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('turn_id', 'seq')
+    )
+    # Old turns are pruned by age.
+    op.create_index('ix_chat_turn_events_created_at', 'chat_turn_events', ['created_at'])
+
+    op.create_table('chat_turns',
+    sa.Column('turn_id', sa.UUID(), nullable=False),
+    sa.Column('owner_uid', sa.String(length=128), nullable=True, comment='Firebase uid; NULL for guest turns'),
+    sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('turn_id')
+    )
+    op.create_index(op.f('ix_chat_turns_created_at'), 'chat_turns', ['created_at'])
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_chat_turns_created_at'), table_name='chat_turns')
+    op.drop_table('chat_turns')
+    op.drop_index('ix_chat_turn_events_created_at', table_name='chat_turn_events')
+    op.drop_table('chat_turn_events')
@@ -0,0 +1,108 @@
+"""add_part_compatibility_view
+
+Revision ID: d4e8f1a3b5c7
+Revises: c1d7e9a2f4b6
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'd4e8f1a3b5c7'
+down_revision = 'c1d7e9a2f4b6'
+branch_labels = None
+depends_on = None
+
+
+# One row per active part with the columns the recommender filters and
+# ranks on (see recommender.ranking). Columns that several part tables
+# share (socket, form_factor, ...) are coalesced into one; part_type says
+# which table a row came from.
+VIEW_SQL = """
+CREATE MATERIALIZED VIEW part_compatibility AS
+SELECT
+    p.id,
+    p.part_type,
+    p.name,
+    p.manufacturer,
+    COALESCE(p.street_price_cents, p.msrp_cents)             AS price_cents,
+    COALESCE(cpu.brand, gpu.brand)                           AS brand,
+    COALESCE(cpu.socket, mb.socket)                          AS socket,
+    cpu.ddr_generation                                       AS cpu_ddr_generations,
+    COALESCE(mb.ddr_generation, ram.ddr_generation)          AS ddr_generation,
+    cooler.supported_sockets,
+    COALESCE(mb.form_factor, st.form_factor, psu.form_factor) AS form_factor,
+    cs.supported_mobo_form_factors,
+    COALESCE(cpu.tdp_watts, gpu.tdp_watts)                   AS tdp_watts,
+    cpu.has_igpu,
+    cooler.cooler_type,
+    cooler.max_tdp_watts,
+    COALESCE(cooler.height_mm, ram.height_mm)                AS height_mm,
+    cooler.radiator_size_mm,
+    mb.has_wifi,
+    mb.memory_slots,
+    mb.m2_slots,
+    mb.m2_pcie_gen,
+    COALESCE(ram.capacity_gb, st.capacity_gb)                AS capacity_gb,
+    ram.speed_mhz,
+    st.interface,
+    gpu.vram_gb,
+    gpu.length_mm                                            AS gpu_length_mm,
+    gpu.recommended_psu_watts,
+    psu.wattage,
+    psu.efficiency_rating,
+    psu.depth_mm                                             AS psu_depth_mm,
+    cs.max_gpu_length_mm,
+    cs.max_cooler_height_mm,
+    cs.max_radiator_front_mm,
+    cs.max_radiator_top_mm,
+    cs.max_psu_length_mm,
+    cs.included_fan_count,
+    cs.color,
+    fan.size_mm                                              AS fan_size_mm,
+    COALESCE(cooler.has_rgb, ram.has_rgb, fan.has_rgb)       AS has_rgb,
+    COALESCE(cpu.benchmark_scores, gpu.benchmark_scores)     AS benchmark_scores,
+    cpu.cores,
+    cpu.threads,
+    cpu.l3_cache_mb,
+    COALESCE(cpu.max_memory_gb, mb.max_memory_gb)            AS max_memory_gb,
+    mb.sata_ports,
+    ram.cas_latency,
+    st.read_speed_mbps,
+    st.write_speed_mbps,
+    st.endurance_tbw,
+    fan.airflow_cfm,
+    COALESCE(cooler.noise_dba, fan.noise_dba)                AS noise_dba
+FROM pc_parts p
+LEFT JOIN cpus         cpu    ON cpu.id    = p.id
+LEFT JOIN cpu_coolers  cooler ON cooler.id = p.id
+LEFT JOIN motherboards mb     ON mb.id     = p.id
+LEFT JOIN ram          ram    ON ram.id    = p.id
+LEFT JOIN storage      st     ON st.id     = p.id
+LEFT JOIN gpus         gpu    ON gpu.id    = p.id
+LEFT JOIN psus         psu    ON psu.id    = p.id
+LEFT JOIN cases        cs     ON cs.id     = p.id
+LEFT JOIN fans         fan    ON fan.id    = p.id
+WHERE p.is_active
+WITH DATA
+"""
+
+
+def upgrade() -> None:
+    op.execute(VIEW_SQL)
+
+    # Required for REFRESH MATERIALIZED VIEW CONCURRENTLY.
+    op.execute("CREATE UNIQUE INDEX ux_part_compatibility_id ON part_compatibility (id)")
+
+    op.execute("CREATE INDEX ix_part_compatibility_type_price ON part_compatibility (part_type, price_cents)")
+    op.execute("CREATE INDEX ix_part_compatibility_type_socket ON part_compatibility (part_type, socket)")
+    op.execute("CREATE INDEX ix_part_compatibility_type_ddr ON part_compatibility (part_type, ddr_generation)")
+    op.execute("CREATE INDEX ix_part_compatibility_type_form_factor ON part_compatibility (part_type, form_factor)")
+    op.execute("CREATE INDEX ix_part_compatibility_supported_sockets ON part_compatibility USING gin (supported_sockets)")
+    op.execute("CREATE INDEX ix_part_compatibility_cpu_ddr ON part_compatibility USING gin (cpu_ddr_generations)")
+    op.execute("CREATE INDEX ix_part_compatibility_mobo_form_factors ON part_compatibility USING gin (supported_mobo_form_factors)")
+
+
+def downgrade() -> None:
+    # Dropping the view drops its indexes.
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS part_compatibility")
@@ -0,0 +1,209 @@
+"""add_performance_index_columns
+
+Revision ID: e5f2a7b9c1d3
+Revises: d4e8f1a3b5c7
+Create Date: 2026-10-19
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'e5f2a7b9c1d3'
+down_revision = 'd4e8f1a3b5c7'
+branch_labels = None
+depends_on = None
+
+
+INDEX_COLUMNS = {
+    'cpus': ['single_thread_index', 'multi_thread_index'],
+    'gpus': ['raster_index', 'rt_index', 'compute_index'],
+}
+
+# part_compatibility from d4e8f1a3b5c7 plus the performance index columns.
+VIEW_SQL = """
+CREATE MATERIALIZED VIEW part_compatibility AS
+SELECT
+    p.id,
+    p.part_type,
+    p.name,
+    p.manufacturer,
+    COALESCE(p.street_price_cents, p.msrp_cents)             AS price_cents,
+    COALESCE(cpu.brand, gpu.brand)                           AS brand,
+    COALESCE(cpu.socket, mb.socket)                          AS socket,
+    cpu.ddr_generation                                       AS cpu_ddr_generations,
+    COALESCE(mb.ddr_generation, ram.ddr_generation)          AS ddr_generation,
+    cooler.supported_sockets,
+    COALESCE(mb.form_factor, st.form_factor, psu.form_factor) AS form_factor,
+    cs.supported_mobo_form_factors,
+    COALESCE(cpu.tdp_watts, gpu.tdp_watts)                   AS tdp_watts,
+    cpu.has_igpu,
+    cooler.cooler_type,
+    cooler.max_tdp_watts,
+    COALESCE(cooler.height_mm, ram.height_mm)                AS height_mm,
+    cooler.radiator_size_mm,
+    mb.has_wifi,
+    mb.memory_slots,
+    mb.m2_slots,
+    mb.m2_pcie_gen,
+    COALESCE(ram.capacity_gb, st.capacity_gb)                AS capacity_gb,
+    ram.speed_mhz,
+    st.interface,
+    gpu.vram_gb,
+    gpu.length_mm                                            AS gpu_length_mm,
+    gpu.recommended_psu_watts,
+    psu.wattage,
+    psu.efficiency_rating,
+    psu.depth_mm                                             AS psu_depth_mm,
+    cs.max_gpu_length_mm,
+    cs.max_cooler_height_mm,
+    cs.max_radiator_front_mm,
+    cs.max_radiator_top_mm,
+    cs.max_psu_length_mm,
+    cs.included_fan_count,
+    cs.color,
+    fan.size_mm                                              AS fan_size_mm,
+    COALESCE(cooler.has_rgb, ram.has_rgb, fan.has_rgb)       AS has_rgb,
+    COALESCE(cpu.benchmark_scores, gpu.benchmark_scores)     AS benchmark_scores,
+    cpu.single_thread_index,
+    cpu.multi_thread_index,
+    gpu.raster_index,
+    gpu.rt_index,
+    gpu.compute_index,
+    cpu.cores,
+    cpu.threads,
+    cpu.l3_cache_mb,
+    COALESCE(cpu.max_memory_gb, mb.max_memory_gb)            AS max_memory_gb,
+    mb.sata_ports,
+    ram.cas_latency,
+    st.read_speed_mbps,
+    st.write_speed_mbps,
+    st.endurance_tbw,
+    fan.airflow_cfm,
+    COALESCE(cooler.noise_dba, fan.noise_dba)                AS noise_dba
+FROM pc_parts p
+LEFT JOIN cpus         cpu    ON cpu.id    = p.id
+LEFT JOIN cpu_coolers  cooler ON cooler.id = p.id
+LEFT JOIN motherboards mb     ON mb.id     = p.id
+LEFT JOIN ram          ram    ON ram.id    = p.id
+LEFT JOIN storage      st     ON st.id     = p.id
+LEFT JOIN gpus         gpu    ON gpu.id    = p.id
+LEFT JOIN psus         psu    ON psu.id    = p.id
+LEFT JOIN cases        cs     ON cs.id     = p.id
+LEFT JOIN fans         fan    ON fan.id    = p.id
+WHERE p.is_active
+WITH DATA
+"""
+
+# As created by d4e8f1a3b5c7, for downgrade.
+PREVIOUS_VIEW_SQL = """
+CREATE MATERIALIZED VIEW part_compatibility AS
+SELECT
+    p.id,
+    p.part_type,
+    p.name,
+    p.manufacturer,
+    COALESCE(p.street_price_cents, p.msrp_cents)             AS price_cents,
+    COALESCE(cpu.brand, gpu.brand)                           AS brand,
+    COALESCE(cpu.socket, mb.socket)                          AS socket,
+    cpu.ddr_generation                                       AS cpu_ddr_generations,
+    COALESCE(mb.ddr_generation, ram.ddr_generation)          AS ddr_generation,
+    cooler.supported_sockets,
+    COALESCE(mb.form_factor, st.form_factor, psu.form_factor) AS form_factor,
+    cs.supported_mobo_form_factors,
+    COALESCE(cpu.tdp_watts, gpu.tdp_watts)                   AS tdp_watts,
+    cpu.has_igpu,
+    cooler.cooler_type,
+    cooler.max_tdp_watts,
+    COALESCE(cooler.height_mm, ram.height_mm)                AS height_mm,
+    cooler.radiator_size_mm,
+    mb.has_wifi,
+    mb.memory_slots,
+    mb.m2_slots,
+    mb.m2_pcie_gen,
+    COALESCE(ram.capacity_gb, st.capacity_gb)                AS capacity_gb,
+    ram.speed_mhz,
+    st.interface,
+    gpu.vram_gb,
+    gpu.length_mm                                            AS gpu_length_mm,
+    gpu.recommended_psu_watts,
+    psu.wattage,
+    psu.efficiency_rating,
+    psu.depth_mm                                             AS psu_depth_mm,
+    cs.max_gpu_length_mm,
+    cs.max_cooler_height_mm,
+    cs.max_radiator_front_mm,
+    cs.max_radiator_top_mm,
+    cs.max_psu_length_mm,
+    cs.included_fan_count,
+    cs.color,
+    fan.size_mm                                              AS fan_size_mm,
+    COALESCE(cooler.has_rgb, ram.has_rgb, fan.has_rgb)       AS has_rgb,
+    COALESCE(cpu.benchmark_scores, gpu.benchmark_scores)     AS benchmark_scores,
+    cpu.cores,
+    cpu.threads,
+    cpu.l3_cache_mb,
+    COALESCE(cpu.max_memory_gb, mb.max_memory_gb)            AS max_memory_gb,
+    mb.sata_ports,
+    ram.cas_latency,
+    st.read_speed_mbps,
+    st.write_speed_mbps,
+    st.endurance_tbw,
+    fan.airflow_cfm,
+    COALESCE(cooler.noise_dba, fan.noise_dba)                AS noise_dba
+FROM pc_parts p
+LEFT JOIN cpus         cpu    ON cpu.id    = p.id
+LEFT JOIN cpu_coolers  cooler ON cooler.id = p.id
+LEFT JOIN motherboards mb     ON mb.id     = p.id
+LEFT JOIN ram          ram    ON ram.id    = p.id
+LEFT JOIN storage      st     ON st.id     = p.id
+LEFT JOIN gpus         gpu    ON gpu.id    = p.id
+LEFT JOIN psus         psu    ON psu.id    = p.id
+LEFT JOIN cases        cs     ON cs.id     = p.id
+LEFT JOIN fans         fan    ON fan.id    = p.id
+WHERE p.is_active
+WITH DATA
+"""
+
+
+def _create_view(sql: str) -> None:
+    op.execute(sql)
+
+    # Required for REFRESH MATERIALIZED VIEW CONCURRENTLY.
+    op.execute("CREATE UNIQUE INDEX ux_part_compatibility_id ON part_compatibility (id)")
+
+    op.execute("CREATE INDEX ix_part_compatibility_type_price ON part_compatibility (part_type, price_cents)")
+    op.execute("CREATE INDEX ix_part_compatibility_type_socket ON part_compatibility (part_type, socket)")
+    op.execute("CREATE INDEX ix_part_compatibility_type_ddr ON part_compatibility (part_type, ddr_generation)")
+    op.execute("CREATE INDEX ix_part_compatibility_type_form_factor ON part_compatibility (part_type, form_factor)")
+    op.execute("CREATE INDEX ix_part_compatibility_supported_sockets ON part_compatibility USING gin (supported_sockets)")
+    op.execute("CREATE INDEX ix_part_compatibility_cpu_ddr ON part_compatibility USING gin (cpu_ddr_generations)")
+    op.execute("CREATE INDEX ix_part_compatibility_mobo_form_factors ON part_compatibility USING gin (supported_mobo_form_factors)")
+
+
+def upgrade() -> None:
+    for table, columns in INDEX_COLUMNS.items():
+        for column in columns:
+            op.add_column(table, sa.Column(column, sa.Float(), nullable=True))
+            op.create_index(f'ix_{table}_{column}', table, [column])
+
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS part_compatibility")
+    _create_view(VIEW_SQL)
+    # "Best <part> under $X": index scan in index order, filtered on price.
+    for table, columns in INDEX_COLUMNS.items():
+        part_type = table[:-1]
+        for column in columns:
+            op.execute(
+                f"CREATE INDEX ix_part_compatibility_{column} ON part_compatibility "
+                f"({column} DESC NULLS LAST, price_cents) WHERE part_type = '{part_type}'"
+            )
+
+
+def downgrade() -> None:
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS part_compatibility")
+    _create_view(PREVIOUS_VIEW_SQL)
+
+    for table, columns in INDEX_COLUMNS.items():
+        for column in columns:
+            op.drop_index(f'ix_{table}_{column}', table_name=table)
+            op.drop_column(table, column)
@@ -0,0 +1,30 @@
+"""add_merged_into_id_to_pc_parts
+
+Revision ID: f2a7b3c5d9e1
+Revises: f6a3b8c0d2e4
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'f2a7b3c5d9e1'
+down_revision = 'f6a3b8c0d2e4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('pc_parts', sa.Column('merged_into_id', sa.UUID(), nullable=True))
+    op.create_foreign_key(
+        'pc_parts_merged_into_id_fkey', 'pc_parts', 'pc_parts',
+        ['merged_into_id'], ['id'], ondelete='SET NULL',
+    )
+    op.create_index(op.f('ix_pc_parts_merged_into_id'), 'pc_parts', ['merged_into_id'])
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_pc_parts_merged_into_id'), table_name='pc_parts')
+    op.drop_constraint('pc_parts_merged_into_id_fkey', 'pc_parts', type_='foreignkey')
+    op.drop_column('pc_parts', 'merged_into_id')
@@ -0,0 +1,26 @@
+"""add_pc_parts_catalog_key_index
+
+Revision ID: f6a3b8c0d2e4
+Revises: e5f2a7b9c1d3
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'f6a3b8c0d2e4'
+down_revision = 'e5f2a7b9c1d3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_pc_parts_type_manufacturer_model',
+        'pc_parts',
+        ['part_type', 'manufacturer', 'model_number'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_pc_parts_type_manufacturer_model', table_name='pc_parts')
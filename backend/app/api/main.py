@@ -1,8 +1,18 @@
 from fastapi import APIRouter
- 
-from app.api.routes import chat, conversations, login, private, users, utils, health, llm
+
 from app.core.config import settings
- 
+from app.core.startup import timed_import
+
+# Imported one by one so /ready can report each route module's import cost.
+login = timed_import("app.api.routes.login")
+users = timed_import("app.api.routes.users")
+utils = timed_import("app.api.routes.utils")
+health = timed_import("app.api.routes.health")
+llm = timed_import("app.api.routes.llm")
+chat = timed_import("app.api.routes.chat")
+conversations = timed_import("app.api.routes.conversations")
+builds = timed_import("app.api.routes.builds")
+
 api_router = APIRouter()
 api_router.include_router(login.router)
 api_router.include_router(users.router)
@@ -11,7 +21,10 @@ api_router.include_router(health.router)
 api_router.include_router(llm.router)
 api_router.include_router(chat.router)
 api_router.include_router(conversations.router)
- 
- 
+api_router.include_router(builds.router)
+
+
 if settings.ENVIRONMENT == "local":
+    from app.api.routes import private
+
     api_router.include_router(private.router)
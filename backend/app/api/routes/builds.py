@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import json
+import logging
+import uuid
+from collections.abc import AsyncIterator
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+
+from app.api.deps import SessionDep
+from app.services.can_run import CanRunResult, check_build
+from app.services.recommender.pipeline import (
+    BuildRequest,
+    aget_build_session,
+    astream_build_phase1,
+    astream_build_phase2,
+    astream_replan,
+)
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/builds", tags=["builds"])
+
+
+class CaseSelection(BaseModel):
+    index: int = Field(..., ge=0, le=2, description="Index into the streamed case_options")
+
+
+class CanRunRequest(BaseModel):
+    part_ids: list[uuid.UUID] = Field(..., min_length=1, max_length=20, description="The build's pc_parts ids")
+    games: list[str] = Field(..., min_length=1, max_length=200, description="Game slugs")
+
+
+async def _sse(events: AsyncIterator[dict]) -> AsyncIterator[str]:
+    """Format pipeline events as SSE lines, ending with [DONE]."""
+    try:
+        async for event in events:
+            yield f"data: {json.dumps(event)}\n\n"
+    except Exception:
+        logger.exception("Build pipeline error")
+        error_event = {"type": "error", "message": "Something went wrong building your PC. Please try again."}
+        yield f"data: {json.dumps(error_event)}\n\n"
+
+    yield "data: [DONE]\n\n"
+
+
+def _sse_response(events: AsyncIterator[dict]) -> StreamingResponse:
+    return StreamingResponse(
+        _sse(events),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no",  # Disable nginx buffering if proxied
+        },
+    )
+
+
+@router.post("/configure")
+async def configure_build(req: BuildRequest) -> StreamingResponse:
+    """
+    Run the recommender up to the case selection, streaming events as it goes:
+    `session` (with the session id), `progress` as each step starts, `pick`
+    as each part is chosen, `case_options`, then `awaiting_case_selection`.
+    """
+    return _sse_response(astream_build_phase1(req))
+
+
+@router.post("/can-run", response_model=CanRunResult)
+def can_run(session: SessionDep, req: CanRunRequest) -> CanRunResult:
+    """
+    The highest requirement tier (minimum / recommended / ultra) the build
+    meets for each game, with what holds it back from the next tier.
+    """
+    return check_build(session, req.part_ids, req.games)
+
+
+@router.post("/{session_id}/case")
+async def select_case(session_id: str, selection: CaseSelection) -> StreamingResponse:
+    """
+    Resume a configure session with the chosen case, streaming the remaining
+    `progress` / `pick` events and a final `build` event.
+    """
+    values = await aget_build_session(session_id)
+    if values is None:
+        raise HTTPException(status_code=404, detail="Build session not found")
+    if not values.get("case_options") or values.get("case_selection") is not None:
+        raise HTTPException(status_code=409, detail="Build session is not awaiting a case selection")
+
+    return _sse_response(astream_build_phase2(session_id, selection.index))
+
+
+@router.post("/{session_id}/replan")
+async def replan_build(session_id: str, req: BuildRequest) -> StreamingResponse:
+    """
+    Apply a changed BuildRequest to an existing session, re-running only the
+    picks that depend on the changed fields (and their dependents).  Streams
+    a `replan` event listing those steps, then `progress` / `pick` events,
+    and a final `build` or `awaiting_case_selection`.
+    """
+    if await aget_build_session(session_id) is None:
+        raise HTTPException(status_code=404, detail="Build session not found")
+
+    return _sse_response(astream_replan(session_id, req))
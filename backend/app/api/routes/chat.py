@@ -2,16 +2,24 @@ from __future__ import annotations
 
 import asyncio
 import functools
+import hashlib
 import json
 import logging
 import uuid
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
 from fastapi.responses import StreamingResponse
 from sqlalchemy import func, select
 
 from app.schemas.chat import ChatMessage, ChatRequest
 from app.services.chat_pipeline import run_chat_turn
+from app.services.turn_events import (
+    DONE,
+    EventsEvicted,
+    IdempotencyConflict,
+    TurnLog,
+    get_turn_store,
+)
 from app.core.auth import optional_firebase_token
 
 logger = logging.getLogger(__name__)
@@ -103,52 +111,154 @@ def _save_turn(
         db.close()
 
 
-async def _event_stream(messages: list[ChatMessage], user: dict | None, conversation_id: str | None):
-    """Async generator that yields SSE-formatted lines."""
+async def _produce_turn(
+    log: TurnLog,
+    messages: list[ChatMessage],
+    user: dict | None,
+    conversation_id: str | None,
+) -> None:
+    """
+    Run the chat pipeline into `log`.  Runs as a background task so the turn
+    completes (and is saved) even if every client disconnects.
+    """
     assistant_text = ""
     try:
         async for event in run_chat_turn(messages):
             if event.get("type") == "token":
                 assistant_text += event.get("text", "")
-            line = f"data: {json.dumps(event)}\n\n"
-            yield line
+            await log.append(json.dumps(event))
     except Exception:
         logger.exception("Chat pipeline error")
-        error_event = json.dumps({
+        await log.append(json.dumps({
             "type": "token",
             "text": "\n\nSomething went wrong generating your recommendation. Please try again.",
-        })
-        yield f"data: {error_event}\n\n"
-
-    # Persist the turn for authenticated users
-    if user and conversation_id:
-        save_fn = functools.partial(
-            _save_turn,
-            user.get("uid", ""),
-            user.get("email"),
-            conversation_id,
-            messages,
-            assistant_text,
-        )
-        await asyncio.get_running_loop().run_in_executor(None, save_fn)
+        }))
 
-    yield "data: [DONE]\n\n"
+    try:
+        # Persist the turn for authenticated users
+        if user and conversation_id:
+            save_fn = functools.partial(
+                _save_turn,
+                user.get("uid", ""),
+                user.get("email"),
+                conversation_id,
+                messages,
+                assistant_text,
+            )
+            await asyncio.get_running_loop().run_in_executor(None, save_fn)
+    finally:
+        await log.append(DONE)
+        await log.finish()
+
+
+async def _event_stream(log: TurnLog, after: int = 0):
+    """Async generator that yields SSE-formatted lines from a turn's event log."""
+    try:
+        async for seq, data in log.subscribe(after):
+            yield f"id: {seq}\ndata: {data}\n\n"
+    except EventsEvicted:
+        logger.warning("Chat turn %s: subscriber fell behind the event buffer", log.turn_id)
+
+
+def _sse_response(log: TurnLog, after: int = 0, replayed: bool = False) -> StreamingResponse:
+    headers = {
+        "Cache-Control": "no-cache",
+        "Connection": "keep-alive",
+        "X-Accel-Buffering": "no",  # Disable nginx buffering if proxied
+        "X-Chat-Turn-Id": log.turn_id,
+    }
+    if replayed:
+        headers["Idempotent-Replayed"] = "true"
+    return StreamingResponse(
+        _event_stream(log, after),
+        media_type="text/event-stream",
+        headers=headers,
+    )
+
+
+def _idempotency_key(
+    req: ChatRequest, user: dict | None, header_key: str | None,
+) -> tuple[str | None, str]:
+    """
+    Return (idempotency key, request fingerprint) for a chat request.
+
+    Keys are scoped to the caller.  Without an explicit key one is derived
+    from the conversation_id and the messages; guest requests without a
+    conversation_id are never deduplicated.
+    """
+    fingerprint = hashlib.sha256(
+        json.dumps(
+            [req.conversation_id, [m.model_dump() for m in req.messages]], sort_keys=True,
+        ).encode()
+    ).hexdigest()
+    caller = (user or {}).get("uid") or "guest"
+
+    if header_key:
+        return f"{caller}:key:{header_key}", fingerprint
+    if req.conversation_id:
+        return f"{caller}:conv:{req.conversation_id}:{fingerprint}", fingerprint
+    return None, fingerprint
 
 
 @router.post("/chat")
-async def chat(req: ChatRequest, user: dict | None = Depends(optional_firebase_token)) -> StreamingResponse:
+async def chat(
+    req: ChatRequest,
+    user: dict | None = Depends(optional_firebase_token),
+    idempotency_key: str | None = Header(None, alias="Idempotency-Key", max_length=255),
+) -> StreamingResponse:
     """
     Stream a recommendation response for the given conversation.
 
     Accessible to both authenticated users and guests. Authenticated users'
     conversations are persisted when a conversation_id is supplied.
+
+    Each SSE event carries an `id`; the turn id is returned in the
+    `X-Chat-Turn-Id` header so a dropped client can resume from
+    `GET /chat/turns/{turn_id}/events`.
+
+    Duplicate submissions (same `Idempotency-Key`, or same conversation_id
+    and messages when no key is sent) while the first is running or shortly
+    after it finished replay that turn instead of starting a new one.
     """
-    return StreamingResponse(
-        _event_stream(req.messages, user, req.conversation_id),
-        media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-            "X-Accel-Buffering": "no",  # Disable nginx buffering if proxied
-        },
-    )
+    key, fingerprint = _idempotency_key(req, user, idempotency_key)
+    try:
+        log, created = get_turn_store().create(key, fingerprint, owner=(user or {}).get("uid") or None)
+    except IdempotencyConflict:
+        raise HTTPException(
+            status_code=422,
+            detail="Idempotency-Key was already used for a different request",
+        )
+
+    if created:
+        log.task = asyncio.create_task(
+            _produce_turn(log, req.messages, user, req.conversation_id)
+        )
+    else:
+        logger.info("Duplicate chat submission attached to turn %s", log.turn_id)
+    return _sse_response(log, replayed=not created)
+
+
+@router.get("/chat/turns/{turn_id}/events")
+async def resume_chat_turn(
+    turn_id: str,
+    last_event_id: int | None = Query(None, ge=0),
+    last_event_id_header: int | None = Header(None, alias="Last-Event-ID", ge=0),
+    user: dict | None = Depends(optional_firebase_token),
+) -> StreamingResponse:
+    """
+    Replay a chat turn's events after `Last-Event-ID` (header, or the
+    `last_event_id` query parameter for clients that cannot set it), then
+    follow the turn live if it is still running.  The pipeline is not re-run.
+
+    A signed-in user's turn can only be resumed by that user; guest turns
+    by anyone holding the turn id.
+    """
+    log = await get_turn_store().get(turn_id)
+    if log is None or (log.owner is not None and log.owner != (user or {}).get("uid")):
+        # Someone else's turn looks the same as a missing one.
+        raise HTTPException(status_code=404, detail="Chat turn not found or expired")
+
+    after = last_event_id_header if last_event_id_header is not None else (last_event_id or 0)
+    if after + 1 < log.first_seq:
+        raise HTTPException(status_code=410, detail="Requested events are no longer buffered")
+    return _sse_response(log, after)
@@ -1,7 +1,19 @@
 from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from app.core.startup import is_ready, startup_report
 
 router = APIRouter()
 
 @router.get("/health", tags=["health"])
 def health():
-    return {"status": "ok", "message": "backend ok"}
\ No newline at end of file
+    return {"status": "ok", "message": "backend ok"}
+
+
+@router.get("/ready", tags=["health"])
+def ready():
+    """503 until startup warmup tasks finish, then 200. Both include timings."""
+    report = startup_report()
+    if not is_ready():
+        return JSONResponse(status_code=503, content={"status": "warming_up", **report})
+    return {"status": "ready", **report}
@@ -1,16 +1,28 @@
 from __future__ import annotations
 
+import asyncio
+import functools
+import json
+import logging
+import os
 import time
 import uuid
+from collections.abc import AsyncIterator
 from typing import Optional
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Body
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 
-from app.services.llm.registry import get_engine
+from app.services.llm.registry import get_engine, loaded_models, memory_report
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/llm", tags=["llm"])
 
+_BATCH_SIZE = int(os.getenv("LLM_BATCH_SIZE", "8"))
+_MAX_BATCH_REQUESTS = 1000
+
 
 class GenerateRequest(BaseModel):
     prompt: str = Field(..., min_length=1)
@@ -44,3 +56,116 @@ def generate(req: GenerateRequest) -> GenerateResponse:
         model=req.model or "default",
         output_text=output,
     )
+
+
+class BatchGenerateResult(BaseModel):
+    index: int
+    id: str
+    created: int
+    model: str
+    output_text: Optional[str] = None
+    error: Optional[str] = None
+
+
+def _plan_batches(reqs: list[GenerateRequest]) -> list[list[int]]:
+    """
+    Group request indices that can share one `model.generate` call (same
+    model, max_tokens and temperature), split into chunks of LLM_BATCH_SIZE.
+    Groups keep the order in which their first request was submitted.
+    """
+    groups: dict[tuple, list[int]] = {}
+    for i, req in enumerate(reqs):
+        key = (req.model, req.max_tokens, req.temperature)
+        groups.setdefault(key, []).append(i)
+
+    return [
+        indices[start : start + _BATCH_SIZE]
+        for indices in groups.values()
+        for start in range(0, len(indices), _BATCH_SIZE)
+    ]
+
+
+def _run_batch(reqs: list[GenerateRequest]) -> list[str]:
+    """Blocking: load the engine if needed and generate one batch."""
+    first = reqs[0]
+    engine = get_engine(first.model)
+    return engine.generate_batch(
+        [(r.prompt, r.system) for r in reqs],
+        max_new_tokens=first.max_tokens,
+        temperature=first.temperature,
+    )
+
+
+async def _ndjson_stream(reqs: list[GenerateRequest]) -> AsyncIterator[str]:
+    """Run each batch off the event loop and emit one JSON line per request."""
+    loop = asyncio.get_running_loop()
+
+    for indices in _plan_batches(reqs):
+        batch = [reqs[i] for i in indices]
+        try:
+            outputs: list[str | None] = await loop.run_in_executor(
+                None, functools.partial(_run_batch, batch),
+            )
+            error = None
+        except Exception as exc:
+            logger.exception("Batch generation failed")
+            outputs = [None] * len(batch)
+            error = str(exc)
+
+        created = int(time.time())
+        for i, output in zip(indices, outputs, strict=True):
+            result = BatchGenerateResult(
+                index=i,
+                id=f"gen_{uuid.uuid4().hex[:12]}",
+                created=created,
+                model=reqs[i].model or "default",
+                output_text=output,
+                error=error,
+            )
+            yield json.dumps(result.model_dump()) + "\n"
+
+
+@router.post("/generate/batch")
+async def generate_batch(
+    reqs: list[GenerateRequest] = Body(..., min_length=1, max_length=_MAX_BATCH_REQUESTS),
+) -> StreamingResponse:
+    """
+    Run many prompts through the local engine in batches.
+
+    Streams one NDJSON line per request as soon as its batch finishes.
+    Lines arrive grouped by batch, not in submission order; use `index`
+    to match results to requests.
+    """
+    return StreamingResponse(_ndjson_stream(reqs), media_type="application/x-ndjson")
+
+
+class MemoryResponse(BaseModel):
+    models: list[str]
+    rss_mb: float
+    pss_mb: Optional[float] = None
+    shared_mb: Optional[float] = None
+    private_mb: Optional[float] = None
+
+
+@router.get("/memory", response_model=MemoryResponse)
+def memory() -> MemoryResponse:
+    """Resident and shared memory of this worker process, with its loaded models."""
+    return MemoryResponse(models=loaded_models(), **memory_report())
+
+
+class GatewayStatsResponse(BaseModel):
+    models: dict[str, dict[str, float]]
+    usage: dict[str, dict[str, int]]
+    hedges: dict[str, dict[str, Optional[float]]]
+
+
+@router.get("/gateway", response_model=GatewayStatsResponse)
+def gateway_stats() -> GatewayStatsResponse:
+    """Provider call counters, token usage and hedging outcomes for this worker."""
+    from app.services.llm import gateway
+
+    return GatewayStatsResponse(
+        models=gateway.gateway_stats(),
+        usage=gateway.usage_stats(),
+        hedges=gateway.hedge_stats(),
+    )
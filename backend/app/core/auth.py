@@ -1,18 +1,31 @@
+import logging
 import os
+import threading
 
-import firebase_admin
-from firebase_admin import auth, credentials
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 
-# Initialize Firebase Admin once at module load.
-# On Cloud Run, Application Default Credentials work automatically via the
-# attached service account. Locally, set FIREBASE_PROJECT_ID in your .env
-# (and optionally GOOGLE_APPLICATION_CREDENTIALS for a service account key).
-if not firebase_admin._apps:
-    project_id = os.environ.get("FIREBASE_PROJECT_ID")
-    print("Firebase initial test")
-    firebase_admin.initialize_app(options={"projectId": project_id} if project_id else None)
+logger = logging.getLogger(__name__)
+
+_firebase_lock = threading.Lock()
+
+
+def init_firebase() -> None:
+    """
+    Initialize Firebase Admin once, on first use (or during startup warmup).
+
+    On Cloud Run, Application Default Credentials work automatically via the
+    attached service account. Locally, set FIREBASE_PROJECT_ID in your .env
+    (and optionally GOOGLE_APPLICATION_CREDENTIALS for a service account key).
+    """
+    import firebase_admin
+
+    with _firebase_lock:
+        if not firebase_admin._apps:
+            project_id = os.environ.get("FIREBASE_PROJECT_ID")
+            firebase_admin.initialize_app(options={"projectId": project_id} if project_id else None)
+            logger.info("Initialized Firebase Admin (project=%s)", project_id)
+
 
 bearer_scheme = HTTPBearer(auto_error=True)
 bearer_scheme_optional = HTTPBearer(auto_error=False)
@@ -27,6 +40,9 @@ async def optional_firebase_token(
     """
     if credentials is None:
         return None
+    init_firebase()
+    from firebase_admin import auth
+
     token = credentials.credentials
     try:
         return auth.verify_id_token(token)
@@ -42,6 +58,9 @@ async def verify_firebase_token(
     Returns the decoded token claims (uid, email, etc.) on success.
     Raises 401 on any failure.
     """
+    init_firebase()
+    from firebase_admin import auth
+
     token = credentials.credentials
     try:
         decoded = auth.verify_id_token(token)
@@ -65,3 +65,7 @@ def init_db(session: Session) -> None:
             is_superuser=True,
         )
         crud.create_user(session=session, user_create=user_in)
+
+
+# Registers the session hooks that refresh the part_compatibility view.
+import app.db.part_compatibility  # noqa: E402, F401
@@ -0,0 +1,91 @@
+"""
+Cold-start bookkeeping: import/init timings and warmup readiness.
+
+Heavy dependencies (torch/transformers, anthropic, firebase_admin,
+langgraph) are imported on first use rather than when `app.main` is
+imported, so a cold instance can answer health checks immediately.
+The work that would otherwise land on the first real request is done by
+warmup tasks that run in the background after the server starts;
+`GET /ready` flips to 200 once they have all finished.
+
+Timings recorded here are served by `/ready`.  For a full per-module
+breakdown of import cost run `python -X importtime -c "import app.main"`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import importlib
+import logging
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from types import ModuleType
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+_process_start = time.perf_counter()
+
+_imports: dict[str, float] = {}
+_init: dict[str, float] = {}
+_warmup: dict[str, float] = {}
+_errors: dict[str, str] = {}
+_ready = False
+
+
+@contextmanager
+def timed(name: str, section: str = "init") -> Iterator[None]:
+    """Record how long the wrapped block takes under `section` ("import" / "init")."""
+    target = _imports if section == "import" else _init
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        target[name] = time.perf_counter() - start
+
+
+def timed_import(module: str) -> ModuleType:
+    """Import `module`, recording its (cumulative, first-time) import cost."""
+    with timed(module, section="import"):
+        return importlib.import_module(module)
+
+
+async def run_warmup(tasks: list[tuple[str, Callable[[], Any]]]) -> None:
+    """
+    Run blocking warmup tasks one by one in the default executor, then mark
+    the app ready.  A failing task is logged and reported but does not keep
+    the app from becoming ready; the work is retried lazily on first use.
+    """
+    global _ready
+    loop = asyncio.get_running_loop()
+
+    for name, task in tasks:
+        start = time.perf_counter()
+        try:
+            await loop.run_in_executor(None, task)
+        except Exception as exc:
+            logger.exception("Warmup task %s failed", name)
+            _errors[name] = str(exc)
+        _warmup[name] = time.perf_counter() - start
+
+    _ready = True
+    logger.info("Warmup finished in %.2fs", sum(_warmup.values()))
+
+
+def is_ready() -> bool:
+    return _ready
+
+
+def startup_report() -> dict[str, Any]:
+    def _rounded(timings: dict[str, float]) -> dict[str, float]:
+        return {k: round(v, 4) for k, v in timings.items()}
+
+    return {
+        "ready": _ready,
+        "uptime_s": round(time.perf_counter() - _process_start, 3),
+        "imports_s": _rounded(_imports),
+        "init_s": _rounded(_init),
+        "warmup_s": _rounded(_warmup),
+        "warmup_errors": dict(_errors),
+    }
@@ -0,0 +1,37 @@
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.part_compatibility import PartCompatibility
+
+PERFORMANCE_INDEXES = {
+    "cpu": ("single_thread_index", "multi_thread_index"),
+    "gpu": ("raster_index", "rt_index", "compute_index"),
+}
+
+
+def best_under(
+    db: Session, part_type: str, max_price_cents: int, index: str, limit: int = 10,
+) -> list[PartCompatibility]:
+    """
+    Highest-`index` active parts of `part_type` priced at or under
+    `max_price_cents`, e.g. best_under(db, "gpu", 50_000, "raster_index").
+    """
+    if index not in PERFORMANCE_INDEXES.get(part_type, ()):
+        raise ValueError(f"{index!r} is not a performance index for {part_type!r}")
+    column = getattr(PartCompatibility, index)
+    return list(db.scalars(
+        select(PartCompatibility)
+        .where(
+            PartCompatibility.part_type == part_type,
+            PartCompatibility.price_cents <= max_price_cents,
+            column.is_not(None),
+        )
+        .order_by(column.desc().nulls_last(), PartCompatibility.price_cents)
+        .limit(limit)
+    ))
+
+
+def best_gpus_under(
+    db: Session, max_price_cents: int, index: str = "raster_index", limit: int = 10,
+) -> list[PartCompatibility]:
+    return best_under(db, "gpu", max_price_cents, index, limit)
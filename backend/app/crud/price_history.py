@@ -0,0 +1,148 @@
+"""
+Price-trend queries for a part, answered from `listing_price_rollups`.
+
+A part's series combines the rollups of its listings (by their current
+`part_id`, so listings moved by a catalog merge bring their history) in
+one currency (rollups are kept per currency, listings without one
+counting as USD): min of mins, max of maxes and sum / observations for the
+average.  A read touches one row per listing and bucket, however often
+the prices changed.
+
+Rollups only record price changes: a bucket without changes has no row,
+and a price set before the window but still in effect is not in it.
+`price_window` therefore also folds in the part's current prices.
+"""
+
+from __future__ import annotations
+
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.models.listing import Listing
+from app.models.listing_price_history import ListingPriceRollup
+
+GRANULARITIES = ("hour", "day")
+
+_DEFAULT_CURRENCY = "USD"
+
+
+@dataclass
+class PricePoint:
+    bucket_start: datetime
+    min_price: int
+    max_price: int
+    avg_price: float
+    observations: int
+
+
+@dataclass
+class PriceWindow:
+    since: datetime
+    currency: str
+    current_price: int | None  # lowest active listing price now
+    low: int | None
+    high: int | None
+    avg_price: float | None  # of recorded prices
+    observations: int
+
+    @property
+    def is_lowest(self) -> bool:
+        """Whether the current price is the lowest of the window (for price alerts)."""
+        return self.current_price is not None and self.current_price == self.low
+
+
+def window_start(now: datetime, granularity: str, window: timedelta) -> datetime:
+    """Start of the oldest UTC `granularity` bucket overlapping [now - window, now]."""
+    start = (now - window).astimezone(timezone.utc)
+    if granularity == "day":
+        return start.replace(hour=0, minute=0, second=0, microsecond=0)
+    return start.replace(minute=0, second=0, microsecond=0)
+
+
+def _rollups(part_id: uuid.UUID, granularity: str, since: datetime, currency: str):
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"granularity must be one of {GRANULARITIES}, not {granularity!r}")
+    R = ListingPriceRollup
+    return (
+        select(R)
+        .join(Listing, Listing.id == R.listing_id)
+        .where(
+            Listing.part_id == part_id,
+            R.currency == currency,
+            R.granularity == granularity,
+            R.bucket_start >= since,
+        )
+        .subquery()
+    )
+
+
+def price_trend(
+    db: Session, part_id: uuid.UUID, granularity: str = "day",
+    window: timedelta = timedelta(days=30), currency: str = _DEFAULT_CURRENCY,
+) -> list[PricePoint]:
+    """Per-bucket min / max / average price of the part over `window`, oldest first."""
+    since = window_start(datetime.now(timezone.utc), granularity, window)
+    r = _rollups(part_id, granularity, since, currency)
+    rows = db.execute(
+        select(
+            r.c.bucket_start,
+            func.min(r.c.min_price),
+            func.max(r.c.max_price),
+            func.sum(r.c.sum_price),
+            func.sum(r.c.observations),
+        )
+        .group_by(r.c.bucket_start)
+        .order_by(r.c.bucket_start)
+    ).all()
+    return [
+        PricePoint(bucket, low, high, float(total) / count, int(count))
+        for bucket, low, high, total, count in rows
+    ]
+
+
+def price_window(
+    db: Session, part_id: uuid.UUID, window: timedelta = timedelta(days=30),
+    currency: str = _DEFAULT_CURRENCY,
+) -> PriceWindow:
+    """Low / high / average over `window` (daily buckets), including the current prices."""
+    since = window_start(datetime.now(timezone.utc), "day", window)
+    r = _rollups(part_id, "day", since, currency)
+    low, high, total, count = db.execute(
+        select(
+            func.min(r.c.min_price),
+            func.max(r.c.max_price),
+            func.sum(r.c.sum_price),
+            func.sum(r.c.observations),
+        )
+    ).one()
+    current = db.scalar(
+        select(func.min(Listing.price_amount)).where(
+            Listing.part_id == part_id,
+            Listing.is_active.is_(True),
+            func.coalesce(Listing.currency, _DEFAULT_CURRENCY) == currency,
+        )
+    )
+    if current is not None:
+        low = current if low is None else min(low, current)
+        high = current if high is None else max(high, current)
+    return PriceWindow(
+        since=since,
+        currency=currency,
+        current_price=current,
+        low=low,
+        high=high,
+        avg_price=float(total) / count if count else None,
+        observations=int(count or 0),
+    )
+
+
+def lowest_in(
+    db: Session, part_id: uuid.UUID, window: timedelta = timedelta(days=30),
+    currency: str = _DEFAULT_CURRENCY,
+) -> int | None:
+    """Lowest price of the part over `window`, e.g. "lowest in 30 days"."""
+    return price_window(db, part_id, window, currency).low
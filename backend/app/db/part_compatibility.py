@@ -0,0 +1,82 @@
+"""
+Keeps the `part_compatibility` materialized view in step with the catalog.
+
+Sessions that flush changes to parts (any table of the `PCPart`
+hierarchy) are marked; once such a session commits, a refresh is
+scheduled.  Refreshes are debounced: every commit within
+PART_COMPAT_REFRESH_DELAY seconds (default 5) shares one
+`REFRESH MATERIALIZED VIEW CONCURRENTLY`, which does not block readers.
+
+Bulk SQL that bypasses the ORM must call `refresh_part_compatibility()`
+(or `schedule_refresh()`) itself.
+"""
+
+from __future__ import annotations
+
+import itertools
+import logging
+import os
+import threading
+
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+
+from app.models.pcparts import PCPart
+
+logger = logging.getLogger(__name__)
+
+_REFRESH_DELAY = float(os.getenv("PART_COMPAT_REFRESH_DELAY", "5"))
+_DIRTY_KEY = "part_compatibility_dirty"
+
+_timer: threading.Timer | None = None
+_timer_lock = threading.Lock()
+
+
+def refresh_part_compatibility(concurrently: bool = True) -> None:
+    from app.core.db import engine
+
+    sql = "REFRESH MATERIALIZED VIEW {}part_compatibility".format(
+        "CONCURRENTLY " if concurrently else ""
+    )
+    with engine.connect() as conn:
+        conn.execution_options(isolation_level="AUTOCOMMIT").execute(text(sql))
+    logger.info("Refreshed part_compatibility")
+
+
+def _run_scheduled_refresh() -> None:
+    global _timer
+    with _timer_lock:
+        _timer = None
+    try:
+        refresh_part_compatibility()
+    except Exception:
+        logger.exception("Failed to refresh part_compatibility")
+
+
+def schedule_refresh(delay: float = _REFRESH_DELAY) -> None:
+    """Refresh after `delay` seconds, unless a refresh is already pending."""
+    global _timer
+    with _timer_lock:
+        if _timer is not None:
+            return
+        _timer = threading.Timer(delay, _run_scheduled_refresh)
+        _timer.daemon = True
+        _timer.start()
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_part_changes(session: Session, _flush_context) -> None:
+    changed = itertools.chain(session.new, session.dirty, session.deleted)
+    if any(isinstance(obj, PCPart) for obj in changed):
+        session.info[_DIRTY_KEY] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _refresh_after_commit(session: Session) -> None:
+    if session.info.pop(_DIRTY_KEY, False):
+        schedule_refresh()
+
+
+@event.listens_for(Session, "after_rollback")
+def _clear_after_rollback(session: Session) -> None:
+    session.info.pop(_DIRTY_KEY, None)
@@ -0,0 +1,11 @@
+"""
+Bulk catalog importers.
+
+  parts          pc_parts + child tables from CSV / NDJSON / JSON dumps
+                 (python -m app.importers.parts)
+  requirements   games / software and their requirement tiers
+                 (python -m app.importers.requirements)
+
+Input is streamed record by record (see `readers`), so memory stays flat
+however large the dump is.
+"""
@@ -0,0 +1,331 @@
+"""
+Bulk importer for the parts catalog (`pc_parts` + the child part tables).
+
+Each record is one part: `part_type` (a polymorphic identity such as
+"cpu" or "cpucooler"), `manufacturer`, `model_number`, and any `pc_parts`
+or child-table columns by name.  Records are identified by
+(part_type, manufacturer, model_number); records missing any of them are
+skipped and counted.
+
+Pipeline
+--------
+1. Records are streamed from the dump (see `readers`) straight into a
+   temporary staging table with COPY, as (key columns, JSONB record).
+2. A diff table joins the staging rows (last record per key wins) to the
+   existing parts on the key, assigning new ids to unmatched rows.
+3. Per part type, set-based statements insert new parent + child rows
+   and update existing ones, typed with `jsonb_populate_record` against
+   the real tables.  Updates only touch columns present in the record and
+   only rows whose values actually change; they also reactivate parts.
+   Parts whose child columns change also get a new `updated_at`.
+4. With `deactivate_missing`, active parts of an imported part type that
+   are absent from the dump are deactivated (the dump is a full snapshot).
+
+Parts merged into another by app.services.catalog_dedupe
+(`merged_into_id` set) still match their records, so these are not
+inserted again, but they are neither updated nor reactivated; they are
+counted as `merged`.
+
+Everything runs in one transaction.  Afterwards the performance indices
+are rescored when CPUs / GPUs changed, and `part_compatibility` is
+refreshed.
+
+  python -m app.importers.parts catalog.ndjson [--format ndjson] [--deactivate-missing]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from typing import Any
+
+from sqlalchemy import Table, text
+from sqlalchemy.orm import Session
+
+from app.importers.readers import FORMATS, iter_records
+from app.models.pcparts import PCPart
+
+logger = logging.getLogger(__name__)
+
+KEY_COLUMNS = ("part_type", "manufacturer", "model_number")
+
+_STAGING = "part_import_staging"
+_DIFF = "part_import_diff"
+
+# pc_parts columns never taken from the input.
+_MANAGED_COLUMNS = {"id", "part_type", "merged_into_id", "created_at", "updated_at"}
+# Defaults for NOT NULL parent columns when a new record leaves them out.
+_INSERT_DEFAULTS = {
+    "name": "concat_ws(' ', r.manufacturer, r.model_number)",
+    "is_active": "true",
+    "used_market_viable": "false",
+}
+
+_SKIPPED_EXAMPLES = 20
+
+
+@dataclass
+class ImportStats:
+    staged: int = 0
+    skipped: int = 0
+    skipped_examples: list[str] = field(default_factory=list)
+    merged: int = 0
+    inserted: dict[str, int] = field(default_factory=dict)
+    updated: dict[str, int] = field(default_factory=dict)
+    specs_updated: dict[str, int] = field(default_factory=dict)
+    deactivated: dict[str, int] = field(default_factory=dict)
+
+
+def part_tables() -> dict[str, Table]:
+    """part_type -> child table, from the PCPart polymorphic map."""
+    return {
+        identity: mapper.local_table
+        for identity, mapper in PCPart.__mapper__.polymorphic_map.items()
+        if mapper.local_table is not PCPart.__table__
+    }
+
+
+# ---------------------------------------------------------------------------
+# Staging
+# ---------------------------------------------------------------------------
+
+def _copy_escape(value: str | None) -> str:
+    if value is None:
+        return "\\N"
+    return (
+        value.replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+    )
+
+
+def _staging_rows(
+    records: Iterable[dict[str, Any]], known_types: set[str], stats: ImportStats,
+) -> Iterator[tuple[str, str, str, str]]:
+    for number, record in enumerate(records, start=1):
+        key = [record.get(column) for column in KEY_COLUMNS]
+        if any(value in (None, "") for value in key) or key[0] not in known_types:
+            stats.skipped += 1
+            if len(stats.skipped_examples) < _SKIPPED_EXAMPLES:
+                stats.skipped_examples.append(f"record {number}: {dict(zip(KEY_COLUMNS, key, strict=True))}")
+            continue
+        stats.staged += 1
+        yield str(key[0]), str(key[1]), str(key[2]), json.dumps(record, default=str)
+
+
+class _CopyStream:
+    """File-like view of staging rows in COPY text format (for pg8000)."""
+
+    def __init__(self, rows: Iterator[tuple[str, ...]]):
+        self._rows = rows
+        self._buffer = b""
+
+    def read(self, size: int = -1) -> bytes:
+        while size < 0 or len(self._buffer) < size:
+            row = next(self._rows, None)
+            if row is None:
+                break
+            self._buffer += ("\t".join(_copy_escape(v) for v in row) + "\n").encode()
+        if size < 0:
+            size = len(self._buffer)
+        chunk, self._buffer = self._buffer[:size], self._buffer[size:]
+        return chunk
+
+
+def _copy_into_staging(db: Session, rows: Iterator[tuple[str, ...]]) -> None:
+    copy_sql = f"COPY {_STAGING} (part_type, manufacturer, model_number, data) FROM STDIN"
+    raw = db.connection().connection.dbapi_connection
+    cursor = raw.cursor()
+    try:
+        if hasattr(cursor, "copy"):  # psycopg 3
+            with cursor.copy(copy_sql) as copy:
+                for row in rows:
+                    copy.write_row(row)
+        else:  # pg8000
+            cursor.execute(copy_sql, stream=_CopyStream(rows))
+    finally:
+        cursor.close()
+
+
+# ---------------------------------------------------------------------------
+# Set-based apply
+# ---------------------------------------------------------------------------
+
+def _columns(table: Table, exclude: set[str]) -> list[str]:
+    return [c.name for c in table.columns if c.name not in exclude]
+
+
+def _assignments(columns: list[str], alias: str) -> tuple[str, str]:
+    """(SET list, changed predicate) touching only columns present in the record."""
+    values = {c: f"CASE WHEN d.data ? '{c}' THEN r.\"{c}\" ELSE {alias}.\"{c}\" END" for c in columns}
+    set_list = ", ".join(f'"{c}" = {v}' for c, v in values.items())
+    changed = " OR ".join(f'{alias}."{c}" IS DISTINCT FROM {v}' for c, v in values.items())
+    return set_list, changed or "false"
+
+
+def _apply_part_type(db: Session, part_type: str, child: Table, stats: ImportStats) -> None:
+    parent = PCPart.__table__
+    parent_cols = _columns(parent, _MANAGED_COLUMNS)
+    child_cols = _columns(child, {"id"})
+    params = {"part_type": part_type}
+
+    parent_values = ", ".join(
+        f'COALESCE(r."{c}", {_INSERT_DEFAULTS[c]})' if c in _INSERT_DEFAULTS else f'r."{c}"'
+        for c in parent_cols
+    )
+    quoted_parent = ", ".join(f'"{c}"' for c in parent_cols)
+    db.execute(text(f"""
+        INSERT INTO pc_parts (id, part_type, {quoted_parent})
+        SELECT d.id, d.part_type, {parent_values}
+        FROM {_DIFF} d, jsonb_populate_record(NULL::pc_parts, d.data) r
+        WHERE d.is_new AND d.part_type = :part_type
+    """), params)
+
+    quoted_child = ", ".join(f'"{c}"' for c in child_cols)
+    child_values = ", ".join(f'r."{c}"' for c in child_cols)
+    inserted = db.execute(text(f"""
+        INSERT INTO {child.name} (id{", " if child_cols else ""}{quoted_child})
+        SELECT d.id{", " if child_cols else ""}{child_values}
+        FROM {_DIFF} d, jsonb_populate_record(NULL::{child.name}, d.data) r
+        WHERE d.is_new AND d.part_type = :part_type
+    """), params).rowcount
+
+    # Child columns first; their parents get a fresh updated_at.
+    specs_updated = 0
+    if child_cols:
+        set_list, changed = _assignments(child_cols, "c")
+        specs_updated = db.execute(text(f"""
+            WITH changed AS (
+                UPDATE {child.name} c
+                SET {set_list}
+                FROM {_DIFF} d, jsonb_populate_record(NULL::{child.name}, d.data) r
+                WHERE c.id = d.id AND NOT d.is_new AND NOT d.merged AND d.part_type = :part_type
+                  AND ({changed})
+                RETURNING c.id
+            )
+            UPDATE pc_parts p SET updated_at = now() FROM changed WHERE p.id = changed.id
+        """), params).rowcount
+
+    # Parts in the dump are active unless the record says otherwise.
+    update_cols = [c for c in parent_cols if c != "is_active"]
+    set_list, changed = _assignments(update_cols, "p")
+    active = "COALESCE(CASE WHEN d.data ? 'is_active' THEN r.is_active END, true)"
+    updated = db.execute(text(f"""
+        UPDATE pc_parts p
+        SET {set_list}, is_active = {active}, updated_at = now()
+        FROM {_DIFF} d, jsonb_populate_record(NULL::pc_parts, d.data) r
+        WHERE p.id = d.id AND NOT d.is_new AND NOT d.merged AND d.part_type = :part_type
+          AND ({changed} OR p.is_active IS DISTINCT FROM {active})
+    """), params).rowcount
+
+    stats.inserted[part_type] = inserted
+    stats.updated[part_type] = updated
+    stats.specs_updated[part_type] = specs_updated
+
+
+def _deactivate_missing(db: Session, part_type: str, stats: ImportStats) -> None:
+    stats.deactivated[part_type] = db.execute(text(f"""
+        UPDATE pc_parts p
+        SET is_active = false, updated_at = now()
+        WHERE p.part_type = :part_type AND p.is_active AND p.merged_into_id IS NULL
+          AND p.model_number IS NOT NULL
+          AND NOT EXISTS (SELECT 1 FROM {_DIFF} d WHERE d.id = p.id)
+    """), {"part_type": part_type}).rowcount
+
+
+def import_parts(
+    db: Session, records: Iterable[dict[str, Any]], deactivate_missing: bool = False,
+) -> ImportStats:
+    """Stage, diff and apply `records` in the session's transaction, then commit."""
+    tables = part_tables()
+    stats = ImportStats()
+
+    db.execute(text(f"""
+        CREATE TEMP TABLE {_STAGING} (
+            seq bigserial,
+            part_type text NOT NULL,
+            manufacturer text NOT NULL,
+            model_number text NOT NULL,
+            data jsonb NOT NULL
+        ) ON COMMIT DROP
+    """))
+    _copy_into_staging(db, _staging_rows(records, set(tables), stats))
+
+    db.execute(text(f"""
+        CREATE TEMP TABLE {_DIFF} ON COMMIT DROP AS
+        SELECT DISTINCT ON (s.part_type, s.manufacturer, s.model_number)
+            s.part_type, s.data,
+            COALESCE(p.id, gen_random_uuid()) AS id,
+            p.id IS NULL AS is_new,
+            p.merged_into_id IS NOT NULL AS merged
+        FROM {_STAGING} s
+        LEFT JOIN pc_parts p
+          ON p.part_type = s.part_type
+         AND p.manufacturer = s.manufacturer
+         AND p.model_number = s.model_number
+        ORDER BY s.part_type, s.manufacturer, s.model_number, s.seq DESC,
+                 p.merged_into_id IS NULL DESC, p.is_active DESC
+    """))
+    db.execute(text(f"CREATE INDEX ON {_DIFF} (part_type, is_new)"))
+    db.execute(text(f"ANALYZE {_DIFF}"))
+    stats.merged = db.scalar(text(f"SELECT count(*) FROM {_DIFF} WHERE merged"))
+
+    imported_types = list(db.execute(text(f"SELECT DISTINCT part_type FROM {_DIFF}")).scalars())
+    for part_type in imported_types:
+        _apply_part_type(db, part_type, tables[part_type], stats)
+        if deactivate_missing:
+            _deactivate_missing(db, part_type, stats)
+    db.commit()
+    return stats
+
+
+def _refresh_derived(stats: ImportStats) -> None:
+    from app.db.part_compatibility import refresh_part_compatibility
+    from app.services.performance_index import score_parts
+
+    touched = {
+        part_type
+        for counts in (stats.inserted, stats.updated, stats.specs_updated, stats.deactivated)
+        for part_type, n in counts.items() if n
+    }
+    if not touched:
+        return
+    if touched & {"cpu", "gpu"}:
+        from app.core.db import SessionLocal
+
+        with SessionLocal() as db:
+            score_parts(db)  # refreshes part_compatibility too
+    else:
+        refresh_part_compatibility()
+
+
+def main() -> None:
+    from app.core.db import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Bulk-import parts into the catalog.")
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=FORMATS)
+    parser.add_argument(
+        "--deactivate-missing", action="store_true",
+        help="treat the dump as a full snapshot of its part types",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    with SessionLocal() as db:
+        stats = import_parts(db, iter_records(args.path, args.format), args.deactivate_missing)
+    _refresh_derived(stats)
+
+    logger.info(
+        "Staged %d records (%d skipped, %d of merged parts); inserted %s, updated %s (specs %s), "
+        "deactivated %s",
+        stats.staged, stats.skipped, stats.merged, stats.inserted, stats.updated, stats.specs_updated,
+        stats.deactivated,
+    )
+    for example in stats.skipped_examples:
+        logger.info("Skipped %s", example)
+
+
+if __name__ == "__main__":
+    main()
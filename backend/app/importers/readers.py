@@ -0,0 +1,115 @@
+"""
+Streaming record readers for catalog dumps.
+
+`iter_records` yields one dict per record from:
+
+  csv      header row + one record per line.  Empty cells are None and
+           cells holding a JSON array / object (e.g. `["AM4", "AM5"]`)
+           are decoded, so array and JSONB columns can be given in CSV.
+  ndjson   one JSON object per line.
+  json     a top-level JSON array of objects, decoded incrementally with
+           `JSONDecoder.raw_decode` over a sliding buffer, never loading
+           the whole document.
+
+The format is taken from the file extension unless given.
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+from collections.abc import Iterator
+from pathlib import Path
+from typing import IO, Any
+
+FORMATS = ("csv", "ndjson", "json")
+
+_CHUNK_SIZE = 1 << 16
+_EXTENSIONS = {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson", ".json": "json"}
+
+
+def detect_format(path: str | Path) -> str:
+    suffix = Path(path).suffix.lower()
+    if suffix not in _EXTENSIONS:
+        raise ValueError(f"Cannot tell the format of {path}; pass one of {FORMATS}")
+    return _EXTENSIONS[suffix]
+
+
+def _csv_value(value: str | None) -> Any:
+    if value is None or value == "":
+        return None
+    if value[0] in "[{":
+        try:
+            return json.loads(value)
+        except json.JSONDecodeError:
+            pass
+    return value
+
+
+def read_csv(stream: IO[str]) -> Iterator[dict[str, Any]]:
+    for row in csv.DictReader(stream):
+        yield {key: _csv_value(value) for key, value in row.items() if key}
+
+
+def read_ndjson(stream: IO[str]) -> Iterator[dict[str, Any]]:
+    for number, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        record = json.loads(line)
+        if not isinstance(record, dict):
+            raise ValueError(f"line {number}: expected a JSON object")
+        yield record
+
+
+def read_json_array(stream: IO[str]) -> Iterator[dict[str, Any]]:
+    decoder = json.JSONDecoder()
+    buffer = ""
+    position = 0
+    started = False
+    eof = False
+
+    while True:
+        # Skip whitespace and separators, refilling the buffer as needed.
+        while True:
+            while position < len(buffer) and buffer[position] in " \t\r\n,":
+                position += 1
+            if position < len(buffer) or eof:
+                break
+            chunk = stream.read(_CHUNK_SIZE)
+            buffer, position, eof = buffer[position:] + chunk, 0, not chunk
+
+        if position >= len(buffer):
+            raise ValueError("unexpected end of JSON array")
+        if not started:
+            if buffer[position] != "[":
+                raise ValueError("expected a top-level JSON array")
+            started = True
+            position += 1
+            continue
+        if buffer[position] == "]":
+            return
+
+        try:
+            record, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            chunk = stream.read(_CHUNK_SIZE)
+            buffer, position, eof = buffer[position:] + chunk, 0, not chunk
+            continue
+        if not isinstance(record, dict):
+            raise ValueError("expected JSON objects in the array")
+        yield record
+        buffer, position = buffer[end:], 0
+
+
+_READERS = {"csv": read_csv, "ndjson": read_ndjson, "json": read_json_array}
+
+
+def iter_records(path: str | Path, fmt: str | None = None) -> Iterator[dict[str, Any]]:
+    fmt = fmt or detect_format(path)
+    if fmt not in _READERS:
+        raise ValueError(f"Unknown format {fmt!r}; expected one of {FORMATS}")
+    with open(path, encoding="utf-8", newline="" if fmt == "csv" else None) as stream:
+        yield from _READERS[fmt](stream)
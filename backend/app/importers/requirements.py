@@ -0,0 +1,408 @@
+"""
+Streaming importer for the game and software requirement catalogs.
+
+Games (`python -m app.importers.requirements games games.json`), one
+record per game:
+
+  {"title": "Cyberpunk 2077", "slug": "cyberpunk-2077", "genre": ...,
+   "min_storage_gb": 70, "hard_requirements": [...],
+   "requirements": [
+     {"tier": "minimum", "role": "cpu", "published_name": "Core i7-6700", "min_ram_gb": 12},
+     {"tier": "minimum", "role": "gpu", "published_name": "GeForce GTX 1060 6GB"}, ...]}
+
+Software (`... software software.ndjson`), one record per software:
+
+  {"name": "DaVinci Resolve", "slug": "davinci-resolve", "category": "creative", ...,
+   "tiers": [
+     {"name": "4K editing", "slug": "4k-editing", "sort_order": 1,
+      "gpu_importance": "required", "min_ram_gb": 32, ...,
+      "minimum_parts": [{"role": "gpu", "published_name": "RTX 3060"}]}, ...]}
+
+Any other key naming a column of the target table is imported as is; in
+CSV, `requirements` / `tiers` are JSON cells.  A missing slug is derived
+from the title / name; games need a title, software a name and category,
+tiers a name.
+
+Records are read incrementally (see `readers`) and written in batches of
+`--batch-size` records, one transaction per batch, as multi-row
+INSERT ... ON CONFLICT DO UPDATE statements on the natural keys: games and
+software on `slug`, `uq_game_min_parts_game_tier_role`,
+`uq_software_tiers_software_slug` and `uq_software_min_parts_tier_role`.
+Updates only set the columns the record provides.  Rows of the catalog
+that are absent from the dump are left alone.
+
+Each `published_name` is resolved to a `pc_parts` id of the role's part
+type (cpu / gpu) only on an exact match: the normalized name (with or
+without the manufacturer) or the model number, each of which must
+identify a single part.  Hardware names differ by one digit or suffix
+between products ("RTX 4060" / "RTX 4090", "GTX 1060 3GB" / "6GB"), so
+fuzzy matches are never linked; they are reported as the closest
+candidate of an unresolved name.  The lookup tables are built once per
+run, inactive parts included (requirements often name old hardware).
+Unresolved names are imported without a `part_id` (a link set by hand is
+kept) and reported at the end with how often they occurred.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+from collections import Counter, defaultdict
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Any
+
+from sqlalchemy import Table, func
+from sqlalchemy.orm import Session
+
+from app.importers.readers import FORMATS, iter_records
+from app.services.name_index import NameIndex, normalize
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 500
+
+# Roles whose published name refers to a pc_parts row of that part type.
+RESOLVED_ROLES = ("cpu", "gpu")
+
+_MANAGED_COLUMNS = {"id", "created_at", "updated_at"}
+_UNRESOLVED_REPORTED = 50
+
+
+@dataclass
+class RequirementImportStats:
+    records: int = 0
+    skipped: int = 0
+    upserted: Counter[str] = field(default_factory=Counter)
+    resolved: int = 0
+    # (role, published name) -> occurrences
+    unresolved: Counter[tuple[str, str]] = field(default_factory=Counter)
+    # (role, published name) -> closest catalog name, never linked
+    near_misses: dict[tuple[str, str], str] = field(default_factory=dict)
+
+
+def slugify(name: str) -> str:
+    return normalize(name).replace(" ", "-")
+
+
+def _batches(records: Iterable[dict[str, Any]], size: int) -> Iterator[list[dict[str, Any]]]:
+    iterator = iter(records)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def _compact(name: str) -> str:
+    return normalize(name).replace(" ", "")
+
+
+class PartResolver:
+    """
+    published_name -> pc_parts id by exact (normalized) name or model
+    number, per role; a `NameIndex` per role only suggests near misses.
+    """
+
+    def __init__(self, parts: Iterable[tuple[Any, str, str | None, str | None, str | None]]):
+        exact: dict[str, dict[str, set[Any]]] = {role: defaultdict(set) for role in RESOLVED_ROLES}
+        entries: dict[str, list[tuple[Any, list[str]]]] = {role: [] for role in RESOLVED_ROLES}
+        self._names: dict[Any, str] = {}
+        for part_id, part_type, name, manufacturer, model_number in parts:
+            if part_type not in exact:
+                continue
+            names = [name]
+            if name and manufacturer:
+                # Publishers write both "Core i7-6700" and "Intel Core i7-6700".
+                if normalize(name).startswith(normalize(manufacturer) + " "):
+                    names.append(name[len(manufacturer):].strip())
+                else:
+                    names.append(f"{manufacturer} {name}")
+            keys = {_compact(n) for n in names if n}
+            if model_number:
+                keys.add(f"model:{_compact(model_number)}")
+            for key in keys:
+                exact[part_type][key].add(part_id)
+            entries[part_type].append((part_id, names))
+            self._names[part_id] = name
+        # Names shared by several parts identify none of them.
+        self._exact = {
+            role: {key: next(iter(ids)) for key, ids in keys.items() if len(ids) == 1}
+            for role, keys in exact.items()
+        }
+        self._indexes = {role: NameIndex(role_entries) for role, role_entries in entries.items()}
+        self._memo: dict[tuple[str, str], Any] = {}
+
+    def _candidates(self, published_name: str) -> list[str]:
+        return [published_name, *(p.strip() for p in published_name.split(" / ") if " / " in published_name)]
+
+    def resolve(self, role: str, published_name: str) -> Any | None:
+        """Part id for the name, or for the first " / "-separated alternative that matches."""
+        key = (role, published_name)
+        if key not in self._memo:
+            exact = self._exact[role]
+            part_id = None
+            for candidate in self._candidates(published_name):
+                compact = _compact(candidate)
+                part_id = exact.get(compact) or exact.get(f"model:{compact}")
+                if part_id is not None:
+                    break
+            self._memo[key] = part_id
+        return self._memo[key]
+
+    def near_miss(self, role: str, published_name: str) -> str | None:
+        """Name of the closest catalog part, for reporting an unresolved name."""
+        for candidate in self._candidates(published_name):
+            match = self._indexes[role].lookup(candidate)
+            if match is not None:
+                return self._names[match[0]]
+        return None
+
+
+def _load_part_resolver(db: Session) -> PartResolver:
+    from sqlalchemy import select
+
+    from app.models.pcparts import PCPart
+
+    rows = db.execute(
+        select(PCPart.id, PCPart.part_type, PCPart.name, PCPart.manufacturer, PCPart.model_number)
+        .where(PCPart.part_type.in_(RESOLVED_ROLES))
+    ).all()
+    return PartResolver(rows)
+
+
+# ---------------------------------------------------------------------------
+# Upserts
+# ---------------------------------------------------------------------------
+
+def _columns(table: Table, exclude: set[str]) -> set[str]:
+    return {c.name for c in table.columns if c.name not in _MANAGED_COLUMNS | exclude}
+
+
+def _upsert(
+    db: Session, table: Table, rows: list[dict[str, Any]], conflict: dict[str, Any], returning: list[str],
+) -> list[Any]:
+    """
+    Multi-row upsert of `rows` (deduplicated by the caller).  Rows are
+    grouped by the columns they provide so an update never overwrites a
+    column the record left out.
+    """
+    from sqlalchemy.dialects.postgresql import insert
+
+    groups: dict[tuple[str, ...], list[dict[str, Any]]] = {}
+    for row in rows:
+        groups.setdefault(tuple(sorted(row)), []).append(row)
+
+    results = []
+    for keys, group in groups.items():
+        statement = insert(table).values(group)
+        statement = statement.on_conflict_do_update(
+            **conflict,
+            set_={
+                **{k: statement.excluded[k] for k in keys if k not in conflict.get("index_elements", ())},
+                "updated_at": func.now(),
+            },
+        ).returning(*(table.c[c] for c in returning))
+        results.extend(db.execute(statement).all())
+    return results
+
+
+def _part_row(
+    resolver: PartResolver, stats: RequirementImportStats, role: str, published_name: Any,
+) -> dict[str, Any]:
+    if not published_name or role not in RESOLVED_ROLES:
+        return {}
+    published_name = str(published_name).strip()
+    part_id = resolver.resolve(role, published_name)
+    if part_id is None:
+        # Leave part_id out so a link made by hand survives re-imports.
+        key = (role, published_name)
+        if key not in stats.unresolved:
+            near_miss = resolver.near_miss(role, published_name)
+            if near_miss is not None:
+                stats.near_misses[key] = near_miss
+        stats.unresolved[key] += 1
+        return {"published_name": published_name}
+    stats.resolved += 1
+    return {"part_id": part_id, "published_name": published_name}
+
+
+def _import_games(
+    db: Session, batch: list[dict[str, Any]], resolver: PartResolver, stats: RequirementImportStats,
+) -> None:
+    from app.models.games_catalog import Game, GameMinimumPart, RequirementTier
+
+    games = Game.__table__
+    game_parts = GameMinimumPart.__table__
+    game_columns = _columns(games, set())
+    part_columns = _columns(game_parts, {"game_id", "tier", "role", "part_id"})
+    tiers = {tier.value for tier in RequirementTier}
+
+    # Last record per slug wins: a statement may not update a row twice.
+    rows: dict[str, dict[str, Any]] = {}
+    requirements: dict[str, list[dict[str, Any]]] = {}
+    for record in batch:
+        title = record.get("title")
+        slug = record.get("slug") or (slugify(title) if title else None)
+        if not title or not slug:
+            stats.skipped += 1
+            continue
+        rows[slug] = {c: record[c] for c in game_columns if c in record} | {"slug": slug}
+        requirements[slug] = record.get("requirements") or []
+    if not rows:
+        return
+
+    ids = {slug: game_id for game_id, slug in _upsert(
+        db, games, list(rows.values()), {"index_elements": ["slug"]}, ["id", "slug"],
+    )}
+    stats.upserted["games"] += len(ids)
+
+    part_rows: dict[tuple[Any, str, str], dict[str, Any]] = {}
+    for slug, entries in requirements.items():
+        for entry in entries:
+            tier = str(entry.get("tier") or "").lower()
+            role = str(entry.get("role") or "").lower()
+            if tier not in tiers or not role:
+                stats.skipped += 1
+                continue
+            key = (ids[slug], tier, role)
+            part_rows[key] = (
+                {c: entry[c] for c in part_columns if c in entry}
+                | _part_row(resolver, stats, role, entry.get("published_name"))
+                | {"game_id": key[0], "tier": tier, "role": role}
+            )
+    if part_rows:
+        _upsert(
+            db, game_parts, list(part_rows.values()),
+            {"constraint": "uq_game_min_parts_game_tier_role"}, ["id"],
+        )
+        stats.upserted["game_minimum_parts"] += len(part_rows)
+
+
+def _import_software(
+    db: Session, batch: list[dict[str, Any]], resolver: PartResolver, stats: RequirementImportStats,
+) -> None:
+    from app.models.software_catalog import Software, SoftwareMinimumPart, SoftwareTier
+
+    software = Software.__table__
+    software_tiers = SoftwareTier.__table__
+    software_parts = SoftwareMinimumPart.__table__
+    software_columns = _columns(software, set())
+    tier_columns = _columns(software_tiers, {"software_id"})
+    part_columns = _columns(software_parts, {"tier_id", "role", "part_id"})
+
+    rows: dict[str, dict[str, Any]] = {}
+    tiers: dict[str, list[dict[str, Any]]] = {}
+    for record in batch:
+        name = record.get("name")
+        slug = record.get("slug") or (slugify(name) if name else None)
+        if not name or not slug or not record.get("category"):
+            stats.skipped += 1
+            continue
+        rows[slug] = {c: record[c] for c in software_columns if c in record} | {"slug": slug}
+        tiers[slug] = record.get("tiers") or []
+    if not rows:
+        return
+
+    software_ids = {slug: software_id for software_id, slug in _upsert(
+        db, software, list(rows.values()), {"index_elements": ["slug"]}, ["id", "slug"],
+    )}
+    stats.upserted["software"] += len(software_ids)
+
+    tier_rows: dict[tuple[Any, str], dict[str, Any]] = {}
+    tier_parts: dict[tuple[Any, str], list[dict[str, Any]]] = {}
+    for slug, entries in tiers.items():
+        for position, entry in enumerate(entries):
+            tier_name = entry.get("name")
+            tier_slug = entry.get("slug") or (slugify(tier_name) if tier_name else None)
+            if not tier_name or not tier_slug:
+                stats.skipped += 1
+                continue
+            key = (software_ids[slug], tier_slug)
+            tier_rows[key] = (
+                {"sort_order": position}
+                | {c: entry[c] for c in tier_columns if c in entry}
+                | {"software_id": key[0], "slug": tier_slug}
+            )
+            tier_parts[key] = entry.get("minimum_parts") or []
+    if not tier_rows:
+        return
+
+    tier_ids = {
+        (software_id, tier_slug): tier_id
+        for tier_id, software_id, tier_slug in _upsert(
+            db, software_tiers, list(tier_rows.values()),
+            {"constraint": "uq_software_tiers_software_slug"}, ["id", "software_id", "slug"],
+        )
+    }
+    stats.upserted["software_tiers"] += len(tier_ids)
+
+    part_rows: dict[tuple[Any, str], dict[str, Any]] = {}
+    for key, entries in tier_parts.items():
+        for entry in entries:
+            role = str(entry.get("role") or "").lower()
+            if not role:
+                stats.skipped += 1
+                continue
+            part_rows[(tier_ids[key], role)] = (
+                {c: entry[c] for c in part_columns if c in entry}
+                | _part_row(resolver, stats, role, entry.get("published_name"))
+                | {"tier_id": tier_ids[key], "role": role}
+            )
+    if part_rows:
+        _upsert(
+            db, software_parts, list(part_rows.values()),
+            {"constraint": "uq_software_min_parts_tier_role"}, ["id"],
+        )
+        stats.upserted["software_minimum_parts"] += len(part_rows)
+
+
+_IMPORTERS = {"games": _import_games, "software": _import_software}
+
+
+def import_requirements(
+    db: Session, kind: str, records: Iterable[dict[str, Any]], batch_size: int = DEFAULT_BATCH_SIZE,
+) -> RequirementImportStats:
+    """Upsert `records` of `kind` ("games" / "software"), committing per batch."""
+    if kind not in _IMPORTERS:
+        raise ValueError(f"Unknown catalog {kind!r}; expected one of {tuple(_IMPORTERS)}")
+    import_batch = _IMPORTERS[kind]
+    resolver = _load_part_resolver(db)
+    stats = RequirementImportStats()
+
+    for batch in _batches(records, batch_size):
+        import_batch(db, batch, resolver, stats)
+        db.commit()
+        stats.records += len(batch)
+        logger.info("Imported %d %s records", stats.records, kind)
+    return stats
+
+
+def main() -> None:
+    from app.core.db import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Import game / software requirement catalogs.")
+    parser.add_argument("kind", choices=tuple(_IMPORTERS))
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=FORMATS)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    with SessionLocal() as db:
+        stats = import_requirements(db, args.kind, iter_records(args.path, args.format), args.batch_size)
+
+    logger.info(
+        "Read %d records (%d skipped entries); upserted %s; resolved %d part names, %d unresolved",
+        stats.records, stats.skipped, dict(stats.upserted), stats.resolved, len(stats.unresolved),
+    )
+    for (role, name), count in stats.unresolved.most_common(_UNRESOLVED_REPORTED):
+        near_miss = stats.near_misses.get((role, name))
+        if near_miss is None:
+            logger.info("Unresolved %s: %r (%d)", role, name, count)
+        else:
+            logger.info("Unresolved %s: %r (%d), closest %r (not linked)", role, name, count, near_miss)
+    if len(stats.unresolved) > _UNRESOLVED_REPORTED:
+        logger.info("... and %d more unresolved names", len(stats.unresolved) - _UNRESOLVED_REPORTED)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,14 @@
-import sentry_sdk
-from fastapi import FastAPI
-from fastapi.routing import APIRoute
-from starlette.middleware.cors import CORSMiddleware
+import asyncio
+import os
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+from app.core import startup
+
+with startup.timed("fastapi", section="import"):
+    from fastapi import FastAPI
+    from fastapi.routing import APIRoute
+    from starlette.middleware.cors import CORSMiddleware
 
 from app.api.main import api_router
 from app.core.config import settings
@@ -12,12 +19,63 @@ def custom_generate_unique_id(route: APIRoute) -> str:
 
 
 if settings.SENTRY_DSN and settings.ENVIRONMENT != "local":
-    sentry_sdk.init(dsn=str(settings.SENTRY_DSN), enable_tracing=True)
+    with startup.timed("sentry"):
+        import sentry_sdk
+
+        sentry_sdk.init(dsn=str(settings.SENTRY_DSN), enable_tracing=True)
+
+if os.getenv("LLM_PRELOAD_MODELS"):
+    from app.services.llm.registry import preload_engines
+
+    with startup.timed("llm_preload"):
+        preload_engines()
+
+
+def _warm_anthropic() -> None:
+    import anthropic  # noqa: F401
+
+
+def _warm_firebase() -> None:
+    from app.core.auth import init_firebase
+
+    init_firebase()
+
+
+def _warm_recommender() -> None:
+    from app.services.recommender.pipeline import _get_pipeline
+
+    _get_pipeline()
+
+
+def _warm_local_extraction() -> None:
+    from app.services.local_extraction import get_extraction_engine
+
+    get_extraction_engine()
+
+
+_WARMUP_TASKS = [
+    ("anthropic", _warm_anthropic),
+    ("firebase", _warm_firebase),
+    ("recommender_pipeline", _warm_recommender),
+]
+
+if os.getenv("PROFILE_EXTRACTION_BACKEND") == "local":
+    _WARMUP_TASKS.append(("local_extraction_model", _warm_local_extraction))
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    # Serve traffic (and health checks) right away; warm up in the background.
+    warmup = asyncio.create_task(startup.run_warmup(_WARMUP_TASKS))
+    yield
+    warmup.cancel()
+
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
     generate_unique_id_function=custom_generate_unique_id,
+    lifespan=lifespan,
 )
 
 # Set all CORS enabled origins
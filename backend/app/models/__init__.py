@@ -4,7 +4,10 @@ from .message import Message
 from .pcparts import PCPart
 from .pcbuild import PCBuild, BuildPart
 from .listing import Listing, AmazonListing, EbayListing
+from .listing_price_history import ListingPriceHistory, ListingPriceRollup
 from .benchmarks import BenchmarkType, CPUBenchmarkScores, GPUBenchmarkScores
 from app.models.reference_build import ReferenceBuild, ReferenceBuildPart
 from .software_catalog import Software, SoftwareCategory, SoftwareMinimumPart
-from .games_catalog import Game, GameMinimumPart
\ No newline at end of file
+from .games_catalog import Game, GameMinimumPart
+from .chat_turn_event import ChatTurn, ChatTurnEvent
+from .part_compatibility import PartCompatibility
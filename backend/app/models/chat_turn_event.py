@@ -0,0 +1,63 @@
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Integer,
+    String,
+    Text,
+)
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+
+from app.db.base import Base
+
+
+class ChatTurnEvent(Base):
+    """One SSE event of a chat turn; the durable tier of app.services.turn_events."""
+
+    __tablename__ = "chat_turn_events"
+
+    turn_id = Column(
+        UUID(as_uuid=True),
+        primary_key=True,
+    )
+
+    seq = Column(
+        Integer,
+        primary_key=True,
+        comment="1-based event id, sent to clients as the SSE id",
+    )
+
+    data = Column(Text, nullable=False)
+
+    created_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+        index=True,
+    )
+
+
+class ChatTurn(Base):
+    """
+    Owner and completion of a chat turn whose events are in
+    `chat_turn_events`, so another worker can authorize a resume and tell a
+    finished turn from one still being produced.
+    """
+
+    __tablename__ = "chat_turns"
+
+    turn_id = Column(
+        UUID(as_uuid=True),
+        primary_key=True,
+    )
+
+    owner_uid = Column(String(128), nullable=True, comment="Firebase uid; NULL for guest turns")
+
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    created_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+        index=True,
+    )
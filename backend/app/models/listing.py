@@ -28,7 +28,7 @@ class Listing(Base):
     fetched_at = Column(DateTime(timezone=True), nullable=True,
                         comment="When this listing was last fetched from the marketplace API")
     price_last_updated_at = Column(DateTime(timezone=True), nullable=True,
-                                   comment="When price_amount last changed")
+                                   comment="When price_amount last changed (each change is logged in listing_price_history)")
 
     created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
     updated_at = Column(DateTime(timezone=True), nullable=False,
@@ -0,0 +1,77 @@
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    DateTime,
+    ForeignKey,
+    Identity,
+    Integer,
+    String,
+)
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+
+from app.db.base import Base
+
+
+class ListingPriceHistory(Base):
+    """
+    Append-only log of listing prices, one row per change of
+    `Listing.price_amount`.  Written by the `listings_price_history`
+    triggers, never by the application.
+
+    Range-partitioned by month on `recorded_at`; partitions are created by
+    `listing_price_history_ensure_partitions()` (see
+    app.services.price_history) and are not part of the metadata (see
+    `include_object` in alembic/env.py).
+    """
+
+    __tablename__ = "listing_price_history"
+    __table_args__ = {
+        "postgresql_partition_by": "RANGE (recorded_at)",
+        "info": {"partitioned": True},
+    }
+
+    id = Column(BigInteger, Identity(), primary_key=True)
+    recorded_at = Column(
+        DateTime(timezone=True),
+        primary_key=True,
+        server_default=func.now(),
+    )
+
+    listing_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("listings.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+
+    price_amount = Column(Integer, nullable=False,
+                          comment="Price in smallest currency denomination (cents, pence, etc.)")
+    previous_amount = Column(Integer, nullable=True)
+    currency = Column(String(3), nullable=True)
+
+
+class ListingPriceRollup(Base):
+    """
+    Per-listing hourly / daily aggregates of `listing_price_history`,
+    upserted by the same trigger that writes the history row.  Buckets
+    start on UTC hour / day boundaries and are kept per currency; listings
+    without one are rolled up as USD.
+    """
+
+    __tablename__ = "listing_price_rollups"
+
+    listing_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("listings.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+
+    granularity = Column(String(5), primary_key=True)  # "hour" / "day"
+    currency = Column(String(3), primary_key=True)
+    bucket_start = Column(DateTime(timezone=True), primary_key=True)
+
+    min_price = Column(Integer, nullable=False)
+    max_price = Column(Integer, nullable=False)
+    sum_price = Column(BigInteger, nullable=False)
+    observations = Column(Integer, nullable=False)
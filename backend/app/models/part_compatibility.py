@@ -0,0 +1,78 @@
+from sqlalchemy import Boolean, Column, Float, Integer, String
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, UUID
+
+from app.db.base import Base
+
+
+class PartCompatibility(Base):
+    """
+    Read-only mapping of the `part_compatibility` materialized view: one row
+    per active part with the compatibility columns of every part table
+    flattened in, so recommender filters are single-table index scans.
+
+    Created by migration, not by metadata (see `include_object` in
+    alembic/env.py); refreshed by app.db.part_compatibility.
+    """
+
+    __tablename__ = "part_compatibility"
+    __table_args__ = {"info": {"is_view": True}}
+
+    id = Column(UUID(as_uuid=True), primary_key=True)
+    part_type = Column(String(50), nullable=False)
+    name = Column(String(255), nullable=False)
+    manufacturer = Column(String(255))
+    price_cents = Column(Integer, comment="street price, falling back to MSRP")
+
+    brand = Column(String(20))  # cpu / gpu
+    socket = Column(String(30))  # cpu / motherboard
+    cpu_ddr_generations = Column(ARRAY(String))
+    ddr_generation = Column(String(10))  # motherboard / ram
+    supported_sockets = Column(ARRAY(String))  # cooler
+    form_factor = Column(String(20))  # motherboard / storage / psu
+    supported_mobo_form_factors = Column(ARRAY(String))  # case
+
+    tdp_watts = Column(Integer)  # cpu / gpu
+    has_igpu = Column(Boolean)
+    cooler_type = Column(String(20))
+    max_tdp_watts = Column(Integer)
+    height_mm = Column(Integer)  # cooler / ram
+    radiator_size_mm = Column(Integer)
+    has_wifi = Column(Boolean)
+    memory_slots = Column(Integer)
+    m2_slots = Column(Integer)
+    m2_pcie_gen = Column(Integer)
+    capacity_gb = Column(Integer)  # ram / storage
+    speed_mhz = Column(Integer)
+    interface = Column(String(20))
+    vram_gb = Column(Integer)
+    gpu_length_mm = Column(Integer)
+    recommended_psu_watts = Column(Integer)
+    wattage = Column(Integer)
+    efficiency_rating = Column(String(30))
+    psu_depth_mm = Column(Integer)
+    max_gpu_length_mm = Column(Integer)
+    max_cooler_height_mm = Column(Integer)
+    max_radiator_front_mm = Column(Integer)
+    max_radiator_top_mm = Column(Integer)
+    max_psu_length_mm = Column(Integer)
+    included_fan_count = Column(Integer)
+    color = Column(String(50))
+    fan_size_mm = Column(Integer)
+    has_rgb = Column(Boolean)
+    benchmark_scores = Column(JSONB)
+    single_thread_index = Column(Float)  # cpu
+    multi_thread_index = Column(Float)
+    raster_index = Column(Float)  # gpu
+    rt_index = Column(Float)
+    compute_index = Column(Float)
+    cores = Column(Integer)  # cpu
+    threads = Column(Integer)
+    l3_cache_mb = Column(Integer)
+    max_memory_gb = Column(Integer)  # cpu / motherboard
+    sata_ports = Column(Integer)
+    cas_latency = Column(Integer)
+    read_speed_mbps = Column(Integer)  # storage
+    write_speed_mbps = Column(Integer)
+    endurance_tbw = Column(Integer)
+    airflow_cfm = Column(Float)
+    noise_dba = Column(Float)  # cooler / fan
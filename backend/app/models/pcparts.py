@@ -1,7 +1,7 @@
 import uuid
 import enum
 
-from sqlalchemy import Boolean, Column, DateTime, String, Text, Integer, ForeignKey, Float
+from sqlalchemy import Boolean, Column, DateTime, String, Text, Integer, ForeignKey, Float, Index
 from sqlalchemy.dialects.postgresql import UUID, ARRAY, JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -98,6 +98,14 @@ class PCPart(Base):
     used_market_viable = Column(Boolean, nullable=True, server_default="false")
 
     is_active = Column(Boolean, nullable=False, default=True, server_default="true")
+    # Set when app.services.catalog_dedupe merges this part into another;
+    # app.importers.parts then leaves the part alone.
+    merged_into_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("pc_parts.id", ondelete="SET NULL"),
+        nullable=True,
+        index=True,
+    )
 
     created_at = Column(
         DateTime(timezone=True),
@@ -116,6 +124,11 @@ class PCPart(Base):
         cascade="all, delete-orphan",
     )
 
+    __table_args__ = (
+        # Catalog identity used by app.importers.parts to diff imports
+        Index("ix_pc_parts_type_manufacturer_model", "part_type", "manufacturer", "model_number"),
+    )
+
     __mapper_args__ = {
         "polymorphic_on": part_type,
         "polymorphic_identity": "part",
@@ -145,6 +158,10 @@ class CPU(PCPart):
         doc='e.g. {"cinebench_r24_single": 2150, "cinebench_r24_multi": 14500, ...}',
     )
 
+    # Filled from benchmark_scores by app.services.performance_index (100 = median CPU)
+    single_thread_index = Column(Float, nullable=True, index=True)
+    multi_thread_index = Column(Float, nullable=True, index=True)
+
     # Other
     cores = Column(Integer, nullable=False)
     threads = Column(Integer, nullable=False)
@@ -292,6 +309,11 @@ class GPU(PCPart):
         doc='e.g. {"timespy": 22400, "port_royal": 14200, "speed_way": 5800, ...}',
     )
 
+    # Filled from benchmark_scores by app.services.performance_index (100 = median GPU)
+    raster_index = Column(Float, nullable=True, index=True)
+    rt_index = Column(Float, nullable=True, index=True)
+    compute_index = Column(Float, nullable=True, index=True)
+
     # Other
     vram_type = Column(String(20), nullable=True)
     width_slots = Column(Float, nullable=True)
@@ -0,0 +1,178 @@
+"""
+"Can it run?" checks of one build against many games.
+
+All requirement rows for the requested games (every `RequirementTier`) are
+fetched with one query and laid out as a (games, tiers, metrics) array of
+minimum values, NaN where a tier sets no requirement for that metric:
+
+  cpu_single   single_thread_index of the tier's CPU
+  cpu_multi    multi_thread_index of the tier's CPU
+  gpu_raster   raster_index of the tier's GPU
+  ram_gb       min_ram_gb
+
+The build is a vector over the same metrics, so every game × tier is
+checked in one comparison.  A tier is met when the build reaches every
+requirement it sets and every lower tier the game publishes is met too;
+the result per game is the highest tier met, plus the metrics that keep
+it from the next one.  A tier whose CPU / GPU requirement is not in the
+catalog or has no performance index (or that sets no checkable
+requirement at all) cannot be verified: it is never met, and its
+unverified roles are reported per tier.
+"""
+
+from __future__ import annotations
+
+import uuid
+from collections.abc import Sequence
+
+import numpy as np
+from pydantic import BaseModel, Field
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.games_catalog import Game, GameMinimumPart, RequirementTier
+from app.models.part_compatibility import PartCompatibility
+
+TIERS = [tier.value for tier in RequirementTier]
+METRICS = ("cpu_single", "cpu_multi", "gpu_raster", "ram_gb")
+
+_ROLE_METRICS = {"cpu": ("cpu_single", "cpu_multi"), "gpu": ("gpu_raster",)}
+
+
+class GameCheck(BaseModel):
+    slug: str
+    title: str
+    tier: str | None = Field(None, description="Highest tier the build meets, None if not even minimum")
+    limited_by: list[str] = Field(
+        default_factory=list, description="Metrics the build falls short on for the next tier up",
+    )
+    unverified: dict[str, list[str]] = Field(
+        default_factory=dict,
+        description="tier -> roles whose requirement part has no comparable index (tier not met)",
+    )
+
+
+class CanRunResult(BaseModel):
+    games: list[GameCheck]
+    unknown: list[str] = Field(default_factory=list, description="Slugs not in the catalog")
+
+
+def highest_tiers(
+    required: np.ndarray, has_tier: np.ndarray, build: np.ndarray,
+    unverifiable: np.ndarray | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    required: (games, tiers, metrics) minimums, NaN = no requirement.
+    has_tier: (games, tiers) whether the game publishes that tier.
+    build: (metrics,) the build's values, NaN = missing part.
+    unverifiable: (games, tiers) tiers with a requirement that cannot be
+    compared; tiers setting no requirement at all are unverifiable too.
+
+    Returns (highest met tier index or -1 per game, (games, tiers,
+    metrics) shortfall mask).
+    """
+    short = ~np.isnan(required) & ~(build[None, None, :] >= required)
+    checkable = ~np.isnan(required).all(axis=2)
+    if unverifiable is not None:
+        checkable &= ~unverifiable
+    met = has_tier & checkable & ~short.any(axis=2)
+    # A tier only counts when every lower published tier is met as well.
+    met &= np.logical_and.accumulate(met | ~has_tier, axis=1)
+    tier_numbers = np.arange(required.shape[1])
+    highest = np.where(met, tier_numbers[None, :], -1).max(axis=1, initial=-1)
+    return highest, short
+
+
+def _build_vector(db: Session, part_ids: Sequence[uuid.UUID]) -> np.ndarray:
+    rows = db.execute(
+        select(
+            PartCompatibility.part_type,
+            PartCompatibility.single_thread_index,
+            PartCompatibility.multi_thread_index,
+            PartCompatibility.raster_index,
+            PartCompatibility.capacity_gb,
+        ).where(PartCompatibility.id.in_(part_ids))
+    ).all()
+
+    build = np.full(len(METRICS), np.nan)
+    ram_gb = 0
+    for part_type, single, multi, raster, capacity in rows:
+        if part_type == "cpu":
+            build[0] = np.nan if single is None else single
+            build[1] = np.nan if multi is None else multi
+        elif part_type == "gpu":
+            build[2] = np.nan if raster is None else raster
+        elif part_type == "ram" and capacity:
+            ram_gb += capacity
+    if ram_gb:
+        build[3] = ram_gb
+    return build
+
+
+def check_build(db: Session, part_ids: Sequence[uuid.UUID], slugs: Sequence[str]) -> CanRunResult:
+    build = _build_vector(db, part_ids)
+
+    rows = db.execute(
+        select(
+            Game.slug, Game.title, GameMinimumPart.tier, GameMinimumPart.role,
+            GameMinimumPart.part_id, GameMinimumPart.min_ram_gb,
+            PartCompatibility.single_thread_index, PartCompatibility.multi_thread_index,
+            PartCompatibility.raster_index,
+        )
+        .outerjoin(GameMinimumPart, GameMinimumPart.game_id == Game.id)
+        .outerjoin(PartCompatibility, PartCompatibility.id == GameMinimumPart.part_id)
+        .where(Game.slug.in_(list(slugs)))
+    ).all()
+
+    titles: dict[str, str] = {}
+    for row in rows:
+        titles.setdefault(row.slug, row.title)
+    ordered = [slug for slug in dict.fromkeys(slugs) if slug in titles]
+    position = {slug: i for i, slug in enumerate(ordered)}
+
+    required = np.full((len(ordered), len(TIERS), len(METRICS)), np.nan)
+    has_tier = np.zeros((len(ordered), len(TIERS)), dtype=bool)
+    unverified: dict[str, dict[str, set[str]]] = {slug: {} for slug in ordered}
+
+    for row in rows:
+        if row.tier not in TIERS:
+            continue
+        g, t = position[row.slug], TIERS.index(row.tier)
+        has_tier[g, t] = True
+        if row.min_ram_gb is not None:
+            required[g, t, 3] = np.fmax(required[g, t, 3], row.min_ram_gb)
+        role = (row.role or "").lower()
+        values = {
+            "cpu_single": row.single_thread_index,
+            "cpu_multi": row.multi_thread_index,
+            "gpu_raster": row.raster_index,
+        }
+        metrics = _ROLE_METRICS.get(role, ())
+        if metrics and all(values[m] is None for m in metrics):
+            unverified[row.slug].setdefault(row.tier, set()).add(role)
+        for metric in metrics:
+            if values[metric] is not None:
+                m = METRICS.index(metric)
+                required[g, t, m] = np.fmax(required[g, t, m], values[metric])
+
+    unverifiable = np.array(
+        [[tier in unverified[slug] for tier in TIERS] for slug in ordered], dtype=bool,
+    ).reshape(len(ordered), len(TIERS))
+    highest, short = highest_tiers(required, has_tier, build, unverifiable)
+
+    checks = []
+    for slug in ordered:
+        g = position[slug]
+        tier = int(highest[g])
+        next_tiers = [t for t in range(tier + 1, len(TIERS)) if has_tier[g, t]]
+        limited_by = (
+            [METRICS[m] for m in np.flatnonzero(short[g, next_tiers[0]])] if next_tiers else []
+        )
+        checks.append(GameCheck(
+            slug=slug,
+            title=titles[slug],
+            tier=TIERS[tier] if tier >= 0 else None,
+            limited_by=limited_by,
+            unverified={tier: sorted(roles) for tier, roles in unverified[slug].items()},
+        ))
+    return CanRunResult(games=checks, unknown=[s for s in dict.fromkeys(slugs) if s not in titles])
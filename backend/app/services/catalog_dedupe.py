@@ -0,0 +1,374 @@
+"""
+Near-duplicate detection for the parts catalog.
+
+Parts created by exact-name matching (e.g. the reference-build seeds)
+drift into duplicates such as "RTX 5070" vs "NVIDIA GeForce RTX 5070
+12GB", which split listings and prices.  This job finds them per part
+type among active parts:
+
+1. Shingles: the normalized tokens of `name` without the manufacturer's
+   own words (so "NVIDIA GeForce RTX 5070" and "GeForce RTX 5070" agree),
+   plus the compacted `model_number`.
+2. MinHash: _BANDS × _ROWS universal hashes (a·x + b mod 2³¹−1) over the
+   shingle hashes, computed with numpy in chunks of parts.
+3. LSH: every band of the signature is hashed to a bucket; parts sharing
+   a bucket in any band are candidate pairs.  With 42 bands of 3 rows a
+   pair is almost surely a candidate from a Jaccard similarity of ~0.5
+   and rarely below ~0.15, without comparing all pairs.
+4. Scoring: a candidate pair is a duplicate when manufacturer and model
+   number (where both are set) agree and at least `min_spec_agreement` of
+   the child-table spec columns set on both are equal (_MIN_COMPARED or
+   more of them).  Benchmarks and the derived performance indices are not
+   compared.
+5. Duplicates are clustered; each cluster keeps its most complete part
+   (most spec columns set, then oldest) and proposes merging the others
+   into it.
+
+Applying a proposal repoints `listings`, `pc_build_parts`,
+`reference_build_parts`, `game_minimum_parts` and
+`software_minimum_parts` from the duplicate to the kept part and
+deactivates the duplicate (it is not deleted) with `merged_into_id` set to
+the kept part, so app.importers.parts does not revive it; parts merged
+into the duplicate before follow it.  `part_compatibility` is refreshed
+afterwards.
+
+  python -m app.services.catalog_dedupe [--part-type gpu] [--output proposals.ndjson]
+  python -m app.services.catalog_dedupe --apply                      # detect and merge
+  python -m app.services.catalog_dedupe --proposals reviewed.ndjson  # merge a reviewed file
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import sys
+import zlib
+from collections import defaultdict
+from collections.abc import Iterable, Sequence
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Any
+
+import numpy as np
+
+from app.services.name_index import normalize
+
+logger = logging.getLogger(__name__)
+
+_BANDS = 42
+_ROWS = 3
+_PRIME = (1 << 31) - 1
+_SEED = 20240501
+# Parts whose shingles are hashed at once (memory is parts × shingles × hashes).
+_CHUNK = 2048
+# Buckets larger than this are generic names ("Corsair Vengeance DDR5") and skipped.
+_MAX_BUCKET = 64
+
+_MIN_COMPARED = 3
+DEFAULT_MIN_SPEC_AGREEMENT = 0.9
+
+# Child columns that are not identifying specs.
+_IGNORED_COLUMNS = {
+    "id", "benchmark_scores",
+    "single_thread_index", "multi_thread_index", "raster_index", "rt_index", "compute_index",
+}
+
+
+@dataclass
+class CatalogPart:
+    id: Any
+    part_type: str
+    name: str
+    manufacturer: str | None = None
+    model_number: str | None = None
+    created_at: datetime | None = None
+    specs: dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def completeness(self) -> int:
+        return sum(v is not None for v in self.specs.values()) + (self.model_number is not None)
+
+
+@dataclass
+class MergeProposal:
+    part_type: str
+    keep_id: str
+    keep_name: str
+    duplicate_id: str
+    duplicate_name: str
+    similarity: float
+    spec_agreement: float
+    compared: int
+
+
+def shingles(part: CatalogPart) -> set[str]:
+    maker = set(normalize(part.manufacturer or "").split())
+    tokens = {t for t in normalize(part.name).split() if t not in maker}
+    if part.model_number:
+        model = normalize(part.model_number).replace(" ", "")
+        if model:
+            tokens.add(f"model:{model}")
+    return tokens
+
+
+def minhash_signatures(shingle_sets: Sequence[set[str]], num_hashes: int = _BANDS * _ROWS) -> np.ndarray:
+    """(parts, num_hashes) MinHash signatures; rows of empty sets stay at the prime."""
+    rng = np.random.default_rng(_SEED)
+    a = rng.integers(1, _PRIME, num_hashes, dtype=np.uint64)
+    b = rng.integers(0, _PRIME, num_hashes, dtype=np.uint64)
+
+    signatures = np.full((len(shingle_sets), num_hashes), _PRIME, dtype=np.uint64)
+    for start in range(0, len(shingle_sets), _CHUNK):
+        chunk = shingle_sets[start:start + _CHUNK]
+        lengths = np.array([len(s) for s in chunk])
+        if not lengths.sum():
+            continue
+        hashes = np.fromiter(
+            (zlib.crc32(s.encode()) % _PRIME for shingle_set in chunk for s in shingle_set),
+            dtype=np.uint64, count=int(lengths.sum()),
+        )
+        permuted = (hashes[:, None] * a[None, :] + b[None, :]) % _PRIME
+        nonempty = np.flatnonzero(lengths)
+        offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))[nonempty]
+        signatures[start + nonempty] = np.minimum.reduceat(permuted, offsets, axis=0)
+    return signatures
+
+
+def candidate_pairs(signatures: np.ndarray, bands: int = _BANDS, rows: int = _ROWS) -> set[tuple[int, int]]:
+    """Index pairs sharing an LSH bucket in at least one band."""
+    rng = np.random.default_rng(_SEED + 1)
+    mix = rng.integers(1, 1 << 32, rows, dtype=np.uint64)
+    valid = signatures[:, 0] != _PRIME
+
+    pairs: set[tuple[int, int]] = set()
+    for band in range(bands):
+        keys = (signatures[:, band * rows:(band + 1) * rows] * mix[None, :]).sum(axis=1)
+        keys = keys[valid]
+        positions = np.flatnonzero(valid)
+        order = np.argsort(keys, kind="stable")
+        boundaries = np.flatnonzero(np.diff(keys[order])) + 1
+        for bucket in np.split(positions[order], boundaries):
+            if len(bucket) < 2:
+                continue
+            if len(bucket) > _MAX_BUCKET:
+                logger.debug("Skipping LSH bucket of %d parts", len(bucket))
+                continue
+            members = sorted(int(i) for i in bucket)
+            pairs.update(
+                (members[i], members[j])
+                for i in range(len(members)) for j in range(i + 1, len(members))
+            )
+    return pairs
+
+
+def _same(left: str | None, right: str | None) -> bool:
+    if left is None or right is None:
+        return True
+    return normalize(left).replace(" ", "") == normalize(right).replace(" ", "")
+
+
+def spec_agreement(left: CatalogPart, right: CatalogPart) -> tuple[float, int]:
+    """(share of equal columns, columns set on both)."""
+    compared = [
+        column for column, value in left.specs.items()
+        if value is not None and right.specs.get(column) is not None
+    ]
+    if not compared:
+        return 0.0, 0
+    equal = sum(left.specs[c] == right.specs[c] for c in compared)
+    return equal / len(compared), len(compared)
+
+
+def _is_duplicate(left: CatalogPart, right: CatalogPart, min_spec_agreement: float) -> tuple[float, int] | None:
+    if not _same(left.manufacturer, right.manufacturer) or not _same(left.model_number, right.model_number):
+        return None
+    agreement, compared = spec_agreement(left, right)
+    if compared < _MIN_COMPARED or agreement < min_spec_agreement:
+        return None
+    return agreement, compared
+
+
+def find_duplicates(
+    parts: Sequence[CatalogPart], min_spec_agreement: float = DEFAULT_MIN_SPEC_AGREEMENT,
+) -> list[MergeProposal]:
+    """Merge proposals among `parts` (all of one part type)."""
+    signatures = minhash_signatures([shingles(p) for p in parts])
+
+    parent = list(range(len(parts)))
+
+    def root(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i, j in candidate_pairs(signatures):
+        if _is_duplicate(parts[i], parts[j], min_spec_agreement) is not None:
+            parent[root(i)] = root(j)
+
+    clusters: dict[int, list[int]] = defaultdict(list)
+    for i in range(len(parts)):
+        clusters[root(i)].append(i)
+
+    proposals = []
+    for members in clusters.values():
+        if len(members) < 2:
+            continue
+        keep = min(
+            members,
+            key=lambda i: (-parts[i].completeness, parts[i].created_at or datetime.max, str(parts[i].id)),
+        )
+        for i in members:
+            if i == keep:
+                continue
+            # Only merge parts that match the kept one directly, not through a chain.
+            match = _is_duplicate(parts[keep], parts[i], min_spec_agreement)
+            if match is None:
+                continue
+            proposals.append(MergeProposal(
+                part_type=parts[i].part_type,
+                keep_id=str(parts[keep].id),
+                keep_name=parts[keep].name,
+                duplicate_id=str(parts[i].id),
+                duplicate_name=parts[i].name,
+                similarity=round(float(np.mean(signatures[keep] == signatures[i])), 3),
+                spec_agreement=round(match[0], 3),
+                compared=match[1],
+            ))
+    return proposals
+
+
+# ---------------------------------------------------------------------------
+# Database
+# ---------------------------------------------------------------------------
+
+def load_parts(db, part_type: str) -> list[CatalogPart]:
+    from sqlalchemy import select
+
+    from app.importers.parts import part_tables
+    from app.models.pcparts import PCPart
+
+    child = part_tables()[part_type]
+    spec_columns = [c for c in child.columns if c.name not in _IGNORED_COLUMNS]
+    rows = db.execute(
+        select(
+            PCPart.id, PCPart.name, PCPart.manufacturer, PCPart.model_number, PCPart.created_at,
+            *spec_columns,
+        )
+        .join(child, child.c.id == PCPart.id)
+        .where(
+            PCPart.part_type == part_type,
+            PCPart.is_active.is_(True),
+            PCPart.merged_into_id.is_(None),
+        )
+    ).all()
+    return [
+        CatalogPart(
+            id=row[0], part_type=part_type, name=row[1], manufacturer=row[2],
+            model_number=row[3], created_at=row[4],
+            specs={c.name: value for c, value in zip(spec_columns, row[5:], strict=True)},
+        )
+        for row in rows
+    ]
+
+
+def detect(db, part_types: Iterable[str] | None = None,
+           min_spec_agreement: float = DEFAULT_MIN_SPEC_AGREEMENT) -> list[MergeProposal]:
+    from app.importers.parts import part_tables
+
+    proposals = []
+    for part_type in part_types or sorted(part_tables()):
+        parts = load_parts(db, part_type)
+        found = find_duplicates(parts, min_spec_agreement)
+        logger.info("%s: %d parts, %d merge proposals", part_type, len(parts), len(found))
+        proposals.extend(found)
+    return proposals
+
+
+def apply_merges(db, proposals: Sequence[MergeProposal]) -> int:
+    """Repoint every reference from each duplicate to its kept part, deactivate it and mark it merged."""
+    import uuid
+
+    from sqlalchemy import bindparam, func, update
+
+    from app.db.part_compatibility import refresh_part_compatibility
+    from app.models import (
+        BuildPart,
+        GameMinimumPart,
+        Listing,
+        PCPart,
+        ReferenceBuildPart,
+        SoftwareMinimumPart,
+    )
+
+    # A part kept by one proposal may not be merged away by another.
+    duplicates = {p.duplicate_id for p in proposals}
+    merges = [
+        {"keep": uuid.UUID(p.keep_id), "duplicate": uuid.UUID(p.duplicate_id)}
+        for p in proposals if p.keep_id not in duplicates and p.keep_id != p.duplicate_id
+    ]
+    if len(merges) < len(proposals):
+        logger.warning("Skipped %d chained proposals", len(proposals) - len(merges))
+    if not merges:
+        return 0
+
+    for model in (Listing, BuildPart, ReferenceBuildPart, GameMinimumPart, SoftwareMinimumPart):
+        table = model.__table__
+        db.execute(
+            update(table)
+            .where(table.c.part_id == bindparam("duplicate"))
+            .values(part_id=bindparam("keep")),
+            merges,
+        )
+    parts = PCPart.__table__
+    db.execute(
+        update(parts)
+        .where(parts.c.merged_into_id == bindparam("duplicate"))
+        .values(merged_into_id=bindparam("keep")),
+        merges,
+    )
+    db.execute(
+        update(parts)
+        .where(parts.c.id == bindparam("duplicate"))
+        .values(is_active=False, merged_into_id=bindparam("keep"), updated_at=func.now()),
+        merges,
+    )
+    db.commit()
+
+    refresh_part_compatibility()
+    return len(merges)
+
+
+def main() -> None:
+    from app.core.db import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Find (and merge) near-duplicate catalog parts.")
+    parser.add_argument("--part-type", action="append", dest="part_types")
+    parser.add_argument("--min-spec-agreement", type=float, default=DEFAULT_MIN_SPEC_AGREEMENT)
+    parser.add_argument("--output", help="write proposals as NDJSON here instead of stdout")
+    parser.add_argument("--apply", action="store_true", help="merge the detected proposals")
+    parser.add_argument("--proposals", help="merge the proposals in this NDJSON file instead of detecting")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    with SessionLocal() as db:
+        if args.proposals:
+            with open(args.proposals, encoding="utf-8") as stream:
+                proposals = [MergeProposal(**json.loads(line)) for line in stream if line.strip()]
+        else:
+            proposals = detect(db, args.part_types, args.min_spec_agreement)
+            output = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+            try:
+                for proposal in proposals:
+                    output.write(json.dumps(asdict(proposal)) + "\n")
+            finally:
+                if output is not sys.stdout:
+                    output.close()
+
+        if args.apply or args.proposals:
+            logger.info("Merged %d duplicate parts", apply_merges(db, proposals))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,35 +1,44 @@
 from __future__ import annotations
  
+import asyncio
 import json
-import os
 import logging
 from typing import AsyncIterator
  
-import anthropic
- 
 from app.data.refbuilds import BUILDS, Build
 from app.schemas.chat import BuildProfile, ChatMessage
 from app.services.resolver import resolve_build
 from app.core.db import SessionLocal
+from app.services import local_extraction
+from app.services.llm import gateway
 
  
 logger = logging.getLogger(__name__)
  
 # ---------------------------------------------------------------------------
-# Client
+# Model
 # ---------------------------------------------------------------------------
  
-_client: anthropic.AsyncAnthropic | None = None
+# All calls go through app.services.llm.gateway (pooled client, per-model
+# concurrency limit, retries with backoff).
+_MODEL = "claude-haiku-4-5-20251001"
  
  
-def _get_client() -> anthropic.AsyncAnthropic:
-    global _client
-    if _client is None:
-        api_key = os.getenv("ANTHROPIC_API_KEY")
-        if not api_key:
-            raise EnvironmentError("ANTHROPIC_API_KEY is not set.")
-        _client = anthropic.AsyncAnthropic(api_key=api_key)
-    return _client
+def _to_api_messages(messages: list[ChatMessage]) -> list[dict]:
+    """
+    Convert chat history to API messages, marking the last one as a
+    prompt-cache breakpoint: next turn's request starts with this exact
+    history, so it is read back from the cache instead of re-processed.
+    """
+    api_messages: list[dict] = []
+    for msg in messages:
+        api_messages.append({
+            "role": msg.role if msg.role in ("user", "assistant") else "user",
+            "content": msg.content,
+        })
+    if api_messages:
+        api_messages[-1]["content"] = [gateway.cached_text(api_messages[-1]["content"])]
+    return api_messages
  
  
 # ---------------------------------------------------------------------------
@@ -68,23 +77,26 @@ async def extract_profile(messages: list[ChatMessage]) -> BuildProfile:
     """
     Call Claude to extract a BuildProfile from the conversation so far.
     Uses a small, fast model (Haiku) since this is a structured extraction task.
-    """
-    client = _get_client()
- 
-    # Build the messages for the extraction call
-    api_messages = []
-    for msg in messages:
-        api_messages.append({
-            "role": msg.role if msg.role in ("user", "assistant") else "user",
-            "content": msg.content,
-        })
  
-    response = await client.messages.create(
-        model="claude-haiku-4-5-20251001",
+    With PROFILE_EXTRACTION_BACKEND=local a small local model is tried
+    first; Haiku is only called when its result is low-confidence or
+    unparseable.
+    """
+    if local_extraction.EXTRACTION_BACKEND == "local":
+        loop = asyncio.get_running_loop()
+        profile = await loop.run_in_executor(
+            None, local_extraction.extract_profile_local, messages,
+        )
+        if profile is not None:
+            return profile
+ 
+    response = await gateway.create_message(
+        step="extract",
+        model=_MODEL,
         max_tokens=512,
         temperature=0.0,
-        system=_EXTRACT_SYSTEM,
-        messages=api_messages,
+        system=[gateway.cached_text(_EXTRACT_SYSTEM)],
+        messages=_to_api_messages(messages),
     )
  
     raw = response.content[0].text.strip()
@@ -172,25 +184,19 @@ async def stream_recommendation(
     Stream the recommendation response token-by-token.
     Yields raw text chunks (not SSE-formatted — the route handles that).
     """
-    client = _get_client()
- 
     context = _format_build_context(profile, build_key, build)
  
     # Include conversation history so the LLM can reference what the user said,
     # then append the build context as a final user message.
-    api_messages: list[dict] = []
-    for msg in messages:
-        api_messages.append({
-            "role": msg.role if msg.role in ("user", "assistant") else "user",
-            "content": msg.content,
-        })
+    api_messages = _to_api_messages(messages)
     api_messages.append({"role": "user", "content": context})
  
-    async with client.messages.stream(
-        model="claude-haiku-4-5-20251001",
+    async with gateway.stream_message(
+        step="recommend",
+        model=_MODEL,
         max_tokens=1024,
         temperature=0.5,
-        system=_RECOMMEND_SYSTEM,
+        system=[gateway.cached_text(_RECOMMEND_SYSTEM)],
         messages=api_messages,
     ) as stream:
         async for text in stream.text_stream:
@@ -225,21 +231,13 @@ async def stream_elicitation(
     Stream a conversational response that gathers more info from the user.
     If the LLM determines there's enough info, it returns "READY_TO_RECOMMEND".
     """
-    client = _get_client()
- 
-    api_messages = []
-    for msg in messages:
-        api_messages.append({
-            "role": msg.role if msg.role in ("user", "assistant") else "user",
-            "content": msg.content,
-        })
- 
-    async with client.messages.stream(
-        model="claude-haiku-4-5-20251001",
+    async with gateway.stream_message(
+        step="elicit",
+        model=_MODEL,
         max_tokens=256,
         temperature=0.6,
-        system=_ELICIT_SYSTEM,
-        messages=api_messages,
+        system=[gateway.cached_text(_ELICIT_SYSTEM)],
+        messages=_to_api_messages(messages),
     ) as stream:
         async for text in stream.text_stream:
             yield text
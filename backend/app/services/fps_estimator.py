@@ -0,0 +1,401 @@
+"""
+Vectorized FPS estimates for games × resolution × CPU × GPU.
+
+Model
+-----
+A game's frame rate is limited by whichever of the CPU and GPU is slower:
+
+  gpu_fps = game.gpu_fps · resolution_scale · gpu_perf ** game.gpu_exponent
+  cpu_fps = game.cpu_fps · st ** game.single_weight · mt ** (1 - single_weight)
+  fps     = (cpu_fps ** -k + gpu_fps ** -k) ** (-1 / k)      (soft minimum)
+
+where st / mt / raster / rt are the performance indices from
+`performance_index` divided by 100 (1.0 = median part), and gpu_perf
+blends raster and RT by the genre's `rt_weight`.  `game.gpu_fps` and
+`game.cpu_fps` are the 1080p frame rates of a median part; they start
+from the genre profile (`Game.genre`) and are calibrated per game so the
+`GameMinimumPart` CPU / GPU of its highest tier hit that tier's target
+frame rate at 1080p.  When both are published they are a pair, so it is
+their combined (soft-minimum) frame rate that is calibrated.
+
+The recommender uses `gpu_fps_with_cpu` to show each GPU option's
+estimated frame rate with the chosen CPU for the genres, resolution and
+target in the configurator's gaming answers (see `gaming_target`).
+
+All CPUs, GPUs and games are held as NumPy arrays, so one `estimate`
+call evaluates every pair at every resolution in a single broadcast:
+thousands of combinations take milliseconds.
+
+  FPS_ESTIMATOR_TTL_SECONDS   how long the loaded catalog is reused (default 600)
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import TypeVar
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_TTL_SECONDS = float(os.getenv("FPS_ESTIMATOR_TTL_SECONDS", "600"))
+
+_T = TypeVar("_T")
+
+RESOLUTIONS = ("1080p", "1440p", "4k")
+
+# GPU-bound frame rate relative to 1080p (fps scales a little better than
+# 1 / pixel count because per-frame work is not all per-pixel).
+_RESOLUTION_SCALE = np.array([1.0, 0.63, 0.31])
+
+# Soft-minimum sharpness: higher → closer to a hard min(cpu, gpu).
+_BOTTLENECK_K = 4.0
+
+# 1080p fps a tier's minimum parts are expected to reach.
+_TIER_TARGET_FPS = {"minimum": 30.0, "recommended": 60.0, "ultra": 90.0}
+_TIER_ORDER = ("minimum", "recommended", "ultra")
+
+# Per-game calibration is clamped to this factor of the genre baseline.
+_CALIBRATION_LIMITS = (0.25, 4.0)
+
+# Configurator answers (gaming.gameTypes / resolution / fps), matched by
+# prefix, to genres, RESOLUTIONS and target fps.  Ultrawide 1440p is
+# estimated as 1440p; "uncapped" has no target.
+_GAME_TYPE_GENRES = {
+    "aaa open world": ["aaa_open_world"],
+    "competitive fps": ["competitive_fps"],
+    "strategy / simulation": ["strategy", "simulation"],
+    "mmos": ["simulation"],
+    "indie / retro": ["indie"],
+    "vr gaming": ["aaa_action"],
+}
+_RESOLUTION_ANSWERS = {"1080p": "1080p", "1440p": "1440p", "4k": "4k", "ultrawide": "1440p"}
+_FPS_ANSWERS = {"60": 60.0, "120": 120.0, "144": 144.0}
+
+
+@dataclass(frozen=True)
+class GenreProfile:
+    gpu_fps: float          # 1080p fps of a median GPU when GPU-bound
+    cpu_fps: float          # fps of a median CPU when CPU-bound
+    single_weight: float    # share of CPU scaling from single-thread perf
+    rt_weight: float = 0.0  # share of GPU perf from the RT index
+    gpu_exponent: float = 1.0
+
+
+_GENRES: dict[str, GenreProfile] = {
+    "competitive_fps": GenreProfile(gpu_fps=260, cpu_fps=300, single_weight=0.8, gpu_exponent=0.9),
+    "esports_moba": GenreProfile(gpu_fps=320, cpu_fps=280, single_weight=0.85, gpu_exponent=0.8),
+    "aaa_open_world": GenreProfile(gpu_fps=75, cpu_fps=110, single_weight=0.6, rt_weight=0.3),
+    "aaa_action": GenreProfile(gpu_fps=90, cpu_fps=140, single_weight=0.6, rt_weight=0.2),
+    "strategy": GenreProfile(gpu_fps=120, cpu_fps=80, single_weight=0.5),
+    "simulation": GenreProfile(gpu_fps=90, cpu_fps=70, single_weight=0.7),
+    "racing": GenreProfile(gpu_fps=130, cpu_fps=170, single_weight=0.7, rt_weight=0.1),
+    "indie": GenreProfile(gpu_fps=220, cpu_fps=240, single_weight=0.7, gpu_exponent=0.7),
+}
+_DEFAULT_GENRE = GenreProfile(gpu_fps=110, cpu_fps=150, single_weight=0.65, rt_weight=0.1)
+
+
+def genre_profile(genre: str | None) -> GenreProfile:
+    return _GENRES.get(genre or "", _DEFAULT_GENRE)
+
+
+@dataclass(frozen=True)
+class GamingTarget:
+    genres: list[str]
+    resolution: str
+    target_fps: float | None
+
+
+def _by_prefix(value: object, table: dict[str, _T]) -> _T | None:
+    text = str(value or "").strip().lower()
+    return next((mapped for prefix, mapped in table.items() if text.startswith(prefix)), None)
+
+
+def gaming_target(answers: dict) -> GamingTarget:
+    """Genres, resolution and fps target of the gaming answers (defaults: any genre, 1080p, no target)."""
+    game_types = answers.get("gaming.gameTypes") or []
+    if isinstance(game_types, str):
+        game_types = [game_types]
+    genres: list[str] = []
+    for game_type in game_types:
+        for genre in _by_prefix(game_type, _GAME_TYPE_GENRES) or []:
+            if genre not in genres:
+                genres.append(genre)
+    return GamingTarget(
+        genres=genres or ["default"],
+        resolution=_by_prefix(answers.get("gaming.resolution"), _RESOLUTION_ANSWERS) or "1080p",
+        target_fps=_by_prefix(answers.get("gaming.fps"), _FPS_ANSWERS),
+    )
+
+
+@dataclass
+class PartIndices:
+    """Catalog parts and their performance indices (NaN when unknown)."""
+    ids: list[str]
+    price_cents: np.ndarray     # float, NaN when unpriced
+    primary: np.ndarray         # CPU: single-thread index, GPU: raster index
+    secondary: np.ndarray       # CPU: multi-thread index,  GPU: RT index
+
+
+@dataclass
+class GameProfiles:
+    ids: list[str]
+    gpu_fps: np.ndarray
+    cpu_fps: np.ndarray
+    single_weight: np.ndarray
+    rt_weight: np.ndarray
+    gpu_exponent: np.ndarray
+
+
+def _ratio(index: np.ndarray) -> np.ndarray:
+    return np.asarray(index, dtype=float) / 100.0
+
+
+def _gpu_perf(gpus: PartIndices, rt_weight: np.ndarray) -> np.ndarray:
+    """(games, gpus) blended raster / RT ratio; RT falls back to raster."""
+    raster = _ratio(gpus.primary)
+    rt = np.where(np.isnan(gpus.secondary), raster, _ratio(gpus.secondary))
+    w = rt_weight[:, None]
+    return (1 - w) * raster[None, :] + w * rt[None, :]
+
+
+def _cpu_perf(cpus: PartIndices, single_weight: np.ndarray) -> np.ndarray:
+    """(games, cpus) geometric blend of single- and multi-thread ratios."""
+    st = _ratio(cpus.primary)
+    mt = np.where(np.isnan(cpus.secondary), st, _ratio(cpus.secondary))
+    w = single_weight[:, None]
+    return st[None, :] ** w * mt[None, :] ** (1 - w)
+
+
+def build_game_profiles(
+    games: list[tuple[str, str | None]],
+    anchors: dict[str, dict[str, tuple[float, float, float]]] | None = None,
+) -> GameProfiles:
+    """
+    games: [(game id, genre)].  anchors, if given, calibrate the genre
+    baselines per game (see `calibrate`).
+    """
+    profiles = [genre_profile(genre) for _, genre in games]
+    result = GameProfiles(
+        ids=[game_id for game_id, _ in games],
+        gpu_fps=np.array([p.gpu_fps for p in profiles], dtype=float),
+        cpu_fps=np.array([p.cpu_fps for p in profiles], dtype=float),
+        single_weight=np.array([p.single_weight for p in profiles], dtype=float),
+        rt_weight=np.array([p.rt_weight for p in profiles], dtype=float),
+        gpu_exponent=np.array([p.gpu_exponent for p in profiles], dtype=float),
+    )
+    if anchors:
+        calibrate(result, anchors)
+    return result
+
+
+def _soft_min(cpu_fps: np.ndarray, gpu_fps: np.ndarray) -> np.ndarray:
+    k = _BOTTLENECK_K
+    return (cpu_fps ** -k + gpu_fps ** -k) ** (-1 / k)
+
+
+def calibrate(games: GameProfiles, anchors: dict[str, dict[str, tuple[float, float, float]]]) -> None:
+    """
+    Scale each game's baseline so its published parts hit the tier target.
+    anchors: game id -> {"cpu" | "gpu": (primary, secondary, target fps)}.
+
+    Each anchored limit is first set to its target.  With both anchors the
+    two limits are then scaled together so the pair's combined fps hits
+    the lower of the two targets (the pair cannot beat its weaker tier).
+    """
+    lo, hi = _CALIBRATION_LIMITS
+    for i, game_id in enumerate(games.ids):
+        game_anchors = anchors.get(game_id, {})
+        baseline = games.gpu_fps[i], games.cpu_fps[i]
+        gpu_perf = cpu_perf = None
+        targets = []
+        if "gpu" in game_anchors:
+            primary, secondary, target = game_anchors["gpu"]
+            part = PartIndices([game_id], np.array([np.nan]), np.array([primary]), np.array([secondary]))
+            perf = _gpu_perf(part, games.rt_weight[i:i + 1])[0, 0]
+            if np.isfinite(perf) and perf > 0:
+                gpu_perf = perf ** games.gpu_exponent[i]
+                games.gpu_fps[i] = target / gpu_perf
+                targets.append(target)
+        if "cpu" in game_anchors:
+            primary, secondary, target = game_anchors["cpu"]
+            part = PartIndices([game_id], np.array([np.nan]), np.array([primary]), np.array([secondary]))
+            perf = _cpu_perf(part, games.single_weight[i:i + 1])[0, 0]
+            if np.isfinite(perf) and perf > 0:
+                cpu_perf = perf
+                games.cpu_fps[i] = target / cpu_perf
+                targets.append(target)
+        if gpu_perf is not None and cpu_perf is not None:
+            combined = _soft_min(games.cpu_fps[i] * cpu_perf, games.gpu_fps[i] * gpu_perf)
+            scale = min(targets) / combined
+            games.gpu_fps[i] *= scale
+            games.cpu_fps[i] *= scale
+        games.gpu_fps[i] = np.clip(games.gpu_fps[i], baseline[0] * lo, baseline[0] * hi)
+        games.cpu_fps[i] = np.clip(games.cpu_fps[i], baseline[1] * lo, baseline[1] * hi)
+
+
+class FpsEstimator:
+    """Estimates fps for every game × resolution × CPU × GPU combination."""
+
+    def __init__(self, cpus: PartIndices, gpus: PartIndices, games: GameProfiles):
+        self.cpus = cpus
+        self.gpus = gpus
+        self.games = games
+        self._game_pos = {game_id: i for i, game_id in enumerate(games.ids)}
+
+    def _game_rows(self, game_ids: list[str] | None) -> np.ndarray:
+        if game_ids is None:
+            return np.arange(len(self.games.ids))
+        return np.array([self._game_pos[g] for g in game_ids if g in self._game_pos], dtype=int)
+
+    def estimate(
+        self, game_ids: list[str] | None = None, resolutions: list[str] | None = None,
+    ) -> np.ndarray:
+        """
+        fps array shaped (games, resolutions, cpus, gpus), in the order of
+        `game_ids` (unknown ids are dropped), `resolutions` (default
+        RESOLUTIONS), self.cpus.ids and self.gpus.ids.  NaN where a part
+        has no performance index.
+        """
+        rows = self._game_rows(game_ids)
+        scale = _RESOLUTION_SCALE[[RESOLUTIONS.index(r) for r in resolutions or RESOLUTIONS]]
+        g = self.games
+        gpu_fps = (
+            g.gpu_fps[rows, None, None]
+            * scale[None, :, None]
+            * _gpu_perf(self.gpus, g.rt_weight[rows])[:, None, :] ** g.gpu_exponent[rows, None, None]
+        )
+        cpu_fps = g.cpu_fps[rows, None] * _cpu_perf(self.cpus, g.single_weight[rows])
+        return _soft_min(cpu_fps[:, None, :, None], gpu_fps[:, :, None, :])
+
+    def gpu_fps_with_cpu(self, cpu_id: str, genres: list[str], resolution: str) -> dict[str, float]:
+        """
+        Worst-case fps over `genres` (genre baselines, uncalibrated) of each
+        GPU paired with `cpu_id` at `resolution`; GPUs without a performance
+        index, or an unknown CPU, are left out.
+        """
+        try:
+            pos = self.cpus.ids.index(cpu_id)
+        except ValueError:
+            return {}
+        cpu = PartIndices(
+            [cpu_id], self.cpus.price_cents[pos:pos + 1],
+            self.cpus.primary[pos:pos + 1], self.cpus.secondary[pos:pos + 1],
+        )
+        games = build_game_profiles([(genre, genre) for genre in genres])
+        fps = FpsEstimator(cpu, self.gpus, games).estimate(None, [resolution])[:, 0, 0, :].min(axis=0)
+        return {gpu_id: float(value) for gpu_id, value in zip(self.gpus.ids, fps, strict=True) if np.isfinite(value)}
+
+    def rank_pairs(
+        self,
+        game_ids: list[str] | None,
+        resolution: str,
+        target_fps: float,
+        max_price_cents: int | None = None,
+        limit: int = 20,
+    ) -> list[dict]:
+        """
+        Cheapest CPU × GPU pairs whose worst-case fps across `game_ids` at
+        `resolution` reaches `target_fps`, best fps first on equal price.
+        """
+        fps = self.estimate(game_ids, [resolution])[:, 0]
+        if fps.shape[0] == 0:
+            return []
+        worst = fps.min(axis=0)  # NaN (unknown) stays NaN and is filtered out
+        cost = self.cpus.price_cents[:, None] + self.gpus.price_cents[None, :]
+
+        ok = np.isfinite(worst) & np.isfinite(cost) & (worst >= target_fps)
+        if max_price_cents is not None:
+            ok &= cost <= max_price_cents
+        cpu_idx, gpu_idx = np.nonzero(ok)
+        order = np.lexsort((-worst[cpu_idx, gpu_idx], cost[cpu_idx, gpu_idx]))[:limit]
+        return [
+            {
+                "cpu_id": self.cpus.ids[c],
+                "gpu_id": self.gpus.ids[gp],
+                "fps": round(float(worst[c, gp]), 1),
+                "price_cents": int(cost[c, gp]),
+            }
+            for c, gp in zip(cpu_idx[order], gpu_idx[order], strict=True)
+        ]
+
+
+# ---------------------------------------------------------------------------
+# Catalog loading
+# ---------------------------------------------------------------------------
+
+def _load(db) -> FpsEstimator:
+    from sqlalchemy import select
+
+    from app.models.games_catalog import Game, GameMinimumPart
+    from app.models.part_compatibility import PartCompatibility as PC
+
+    def parts(part_type: str, primary, secondary) -> PartIndices:
+        rows = db.execute(
+            select(PC.id, PC.price_cents, primary, secondary)
+            .where(PC.part_type == part_type, primary.is_not(None))
+        ).all()
+        return PartIndices(
+            ids=[str(r[0]) for r in rows],
+            price_cents=np.array([np.nan if r[1] is None else r[1] for r in rows], dtype=float),
+            primary=np.array([r[2] for r in rows], dtype=float),
+            secondary=np.array([np.nan if r[3] is None else r[3] for r in rows], dtype=float),
+        )
+
+    cpus = parts("cpu", PC.single_thread_index, PC.multi_thread_index)
+    gpus = parts("gpu", PC.raster_index, PC.rt_index)
+
+    games = [(str(game_id), genre) for game_id, genre in db.execute(select(Game.id, Game.genre)).all()]
+
+    # Anchor on each game's highest published tier per role.
+    anchors: dict[str, dict[str, tuple[float, float, float]]] = {}
+    anchor_tier: dict[tuple[str, str], int] = {}
+    rows = db.execute(
+        select(
+            GameMinimumPart.game_id, GameMinimumPart.tier, GameMinimumPart.role,
+            PC.single_thread_index, PC.multi_thread_index, PC.raster_index, PC.rt_index,
+        )
+        .join(PC, PC.id == GameMinimumPart.part_id)
+        .where(GameMinimumPart.role.in_(["cpu", "gpu"]), GameMinimumPart.tier.in_(_TIER_ORDER))
+    ).all()
+    for game_id, tier, role, st, mt, raster, rt in rows:
+        primary, secondary = (st, mt) if role == "cpu" else (raster, rt)
+        rank = _TIER_ORDER.index(tier)
+        key = (str(game_id), role)
+        if primary is None or anchor_tier.get(key, -1) >= rank:
+            continue
+        anchor_tier[key] = rank
+        anchors.setdefault(key[0], {})[role] = (
+            float(primary), np.nan if secondary is None else float(secondary), _TIER_TARGET_FPS[tier],
+        )
+
+    return FpsEstimator(cpus, gpus, build_game_profiles(games, anchors))
+
+
+_estimator: FpsEstimator | None = None
+_loaded_at = 0.0
+_lock = threading.Lock()
+
+
+def get_fps_estimator(db=None) -> FpsEstimator:
+    """Shared estimator over the current catalog, reloaded after the TTL."""
+    global _estimator, _loaded_at
+    with _lock:
+        if _estimator is None or time.monotonic() - _loaded_at > _TTL_SECONDS:
+            if db is None:
+                from app.core.db import SessionLocal
+
+                with SessionLocal() as session:
+                    _estimator = _load(session)
+            else:
+                _estimator = _load(db)
+            _loaded_at = time.monotonic()
+            logger.info(
+                "FPS estimator loaded: %d CPUs, %d GPUs, %d games",
+                len(_estimator.cpus.ids), len(_estimator.gpus.ids), len(_estimator.games.ids),
+            )
+        return _estimator
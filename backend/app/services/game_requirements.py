@@ -0,0 +1,241 @@
+"""
+Combined hardware requirements for a profile's game list.
+
+`resolve_game_requirements` resolves every free-text title in one pass
+against a `NameIndex` over `Game.title` / `slug`, loads the minimum parts
+of every tier for the games not already cached with a single query, and
+folds the requested tier into the element-wise maximum:
+
+  cpu / gpu   the most demanding part, compared by single-thread / raster
+              performance index (parts without an index only win when
+              nothing is indexed)
+  ram         the largest `min_ram_gb`
+  storage     the sum of `Game.min_storage_gb` (every game is installed)
+
+A game without the requested tier falls back to its nearest lower tier,
+then the nearest higher one.
+
+Caches
+------
+The name index and per-game requirements (all tiers) are kept in memory;
+the latter is an LRU so popular titles never reach the database.
+
+  GAME_REQUIREMENTS_CACHE_SIZE    games kept in the LRU (default 512)
+  GAME_REQUIREMENTS_TTL_SECONDS   lifetime of cached entries and the name
+                                  index (default 3600)
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+from pydantic import BaseModel, Field
+
+from app.services.name_index import NameIndex
+
+logger = logging.getLogger(__name__)
+
+_CACHE_SIZE = int(os.getenv("GAME_REQUIREMENTS_CACHE_SIZE", "512"))
+_TTL_SECONDS = float(os.getenv("GAME_REQUIREMENTS_TTL_SECONDS", "3600"))
+
+TIERS = ("minimum", "recommended", "ultra")
+
+_BUDGET_TIERS = {"entry": "minimum", "mid": "recommended", "high": "recommended", "elite": "ultra"}
+
+
+class PartRequirement(BaseModel):
+    part_id: str | None = None
+    name: str | None = Field(None, description="Catalog name, else the published name")
+    performance_index: float | None = Field(
+        None, description="single_thread_index for CPUs, raster_index for GPUs",
+    )
+    game: str = Field(..., description="Title that sets this requirement")
+
+
+class GameRequirements(BaseModel):
+    tier: str
+    games: list[str] = Field(default_factory=list, description="Resolved catalog titles")
+    unresolved: list[str] = Field(default_factory=list, description="Titles not in the catalog")
+    cpu: PartRequirement | None = None
+    gpu: PartRequirement | None = None
+    min_ram_gb: int | None = None
+    min_storage_gb: int | None = None
+    hard_requirements: list[str] = Field(default_factory=list)
+
+
+@dataclass
+class _TierRow:
+    part_id: str | None
+    name: str | None
+    performance_index: float | None
+    min_ram_gb: int | None
+
+
+@dataclass
+class _GameEntry:
+    title: str
+    min_storage_gb: int | None
+    hard_requirements: list[str]
+    # tier -> role -> row
+    tiers: dict[str, dict[str, _TierRow]] = field(default_factory=dict)
+    loaded_at: float = field(default_factory=time.monotonic)
+
+
+def tier_for_profile(budget_tier: str) -> str:
+    return _BUDGET_TIERS.get(budget_tier, "recommended")
+
+
+def _pick_tier(available: dict[str, dict[str, _TierRow]], tier: str) -> dict[str, _TierRow]:
+    if tier in available:
+        return available[tier]
+    position = TIERS.index(tier) if tier in TIERS else 1
+    for candidate in list(reversed(TIERS[:position])) + list(TIERS[position + 1:]):
+        if candidate in available:
+            return available[candidate]
+    return {}
+
+
+def _more_demanding(current: PartRequirement | None, candidate: PartRequirement) -> bool:
+    if current is None:
+        return True
+    if candidate.performance_index is None:
+        return False
+    return current.performance_index is None or candidate.performance_index > current.performance_index
+
+
+def combine(entries: list[_GameEntry], tier: str) -> GameRequirements:
+    """Element-wise maximum of `tier` across the given games."""
+    result = GameRequirements(tier=tier, games=[e.title for e in entries])
+    storage = 0
+    hard: list[str] = []
+    for entry in entries:
+        rows = _pick_tier(entry.tiers, tier)
+        for role in ("cpu", "gpu"):
+            row = rows.get(role)
+            if row is None or (row.part_id is None and row.name is None):
+                continue
+            candidate = PartRequirement(
+                part_id=row.part_id, name=row.name,
+                performance_index=row.performance_index, game=entry.title,
+            )
+            if _more_demanding(getattr(result, role), candidate):
+                setattr(result, role, candidate)
+        for row in rows.values():
+            if row.min_ram_gb is not None:
+                result.min_ram_gb = max(result.min_ram_gb or 0, row.min_ram_gb)
+        storage += entry.min_storage_gb or 0
+        hard.extend(r for r in entry.hard_requirements if r not in hard)
+    result.min_storage_gb = storage or None
+    result.hard_requirements = hard
+    return result
+
+
+class GameRequirementResolver:
+    """Name index + LRU of per-game requirements over the games catalog."""
+
+    def __init__(self, cache_size: int = _CACHE_SIZE, ttl_seconds: float = _TTL_SECONDS):
+        self.cache_size = cache_size
+        self.ttl_seconds = ttl_seconds
+        self._index: NameIndex | None = None
+        self._index_loaded_at = 0.0
+        self._cache: OrderedDict[str, _GameEntry] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _name_index(self, db) -> NameIndex:
+        if self._index is None or time.monotonic() - self._index_loaded_at > self.ttl_seconds:
+            from sqlalchemy import select
+
+            from app.models.games_catalog import Game
+
+            rows = db.execute(select(Game.id, Game.title, Game.slug)).all()
+            self._index = NameIndex((str(game_id), [title, slug]) for game_id, title, slug in rows)
+            self._index_loaded_at = time.monotonic()
+        return self._index
+
+    def _load(self, db, game_ids: list[str]) -> dict[str, _GameEntry]:
+        """Every tier's minimum parts for `game_ids`, in one query."""
+        import uuid
+
+        from sqlalchemy import select
+
+        from app.models.games_catalog import Game
+        from app.models.games_catalog import GameMinimumPart as GMP
+        from app.models.part_compatibility import PartCompatibility as PC
+
+        rows = db.execute(
+            select(
+                Game.id, Game.title, Game.min_storage_gb, Game.hard_requirements,
+                GMP.tier, GMP.role, GMP.part_id, GMP.published_name, GMP.min_ram_gb,
+                PC.name, PC.single_thread_index, PC.raster_index,
+            )
+            .outerjoin(GMP, GMP.game_id == Game.id)
+            .outerjoin(PC, PC.id == GMP.part_id)
+            .where(Game.id.in_([uuid.UUID(g) for g in game_ids]))
+        ).all()
+
+        entries: dict[str, _GameEntry] = {}
+        for (game_id, title, storage, hard, tier, role, part_id, published,
+             ram, part_name, st_index, raster_index) in rows:
+            entry = entries.setdefault(str(game_id), _GameEntry(title, storage, list(hard or [])))
+            if tier is None:
+                continue
+            role = role.lower()
+            entry.tiers.setdefault(tier, {})[role] = _TierRow(
+                part_id=str(part_id) if part_id else None,
+                name=part_name or published,
+                performance_index=st_index if role == "cpu" else raster_index if role == "gpu" else None,
+                min_ram_gb=ram,
+            )
+        return entries
+
+    def _entries(self, db, game_ids: list[str]) -> dict[str, _GameEntry]:
+        now = time.monotonic()
+        found: dict[str, _GameEntry] = {}
+        with self._lock:
+            for game_id in game_ids:
+                entry = self._cache.get(game_id)
+                if entry is not None and now - entry.loaded_at <= self.ttl_seconds:
+                    self._cache.move_to_end(game_id)
+                    found[game_id] = entry
+
+        missing = [g for g in game_ids if g not in found]
+        if missing:
+            loaded = self._load(db, missing)
+            with self._lock:
+                for game_id, entry in loaded.items():
+                    self._cache[game_id] = entry
+                    self._cache.move_to_end(game_id)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+            found.update(loaded)
+        return found
+
+    def resolve(self, db, titles: list[str], tier: str = "recommended") -> GameRequirements:
+        matches = self._name_index(db).lookup_many(titles)
+        game_ids = list(dict.fromkeys(g for g in matches.values() if g is not None))
+        entries = self._entries(db, game_ids) if game_ids else {}
+
+        result = combine([entries[g] for g in game_ids if g in entries], tier)
+        result.unresolved = [title for title, game_id in matches.items() if game_id is None]
+        if result.unresolved:
+            logger.info("Unresolved game titles: %s", result.unresolved)
+        return result
+
+
+_resolver = GameRequirementResolver()
+
+
+def resolve_game_requirements(titles: list[str], tier: str = "recommended", db=None) -> GameRequirements:
+    """Combined `tier` requirements for free-text game titles."""
+    if db is not None:
+        return _resolver.resolve(db, titles, tier)
+
+    from app.core.db import SessionLocal
+
+    with SessionLocal() as session:
+        return _resolver.resolve(session, titles, tier)
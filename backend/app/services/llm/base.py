@@ -16,3 +16,15 @@ class LLMEngine(ABC):
         temperature: float = 0.7,
     ) -> str:
         ...
+
+    def generate_batch(
+        self,
+        prompts: list[tuple[str, Optional[str]]],
+        max_new_tokens: int = 256,
+        temperature: float = 0.7,
+    ) -> list[str]:
+        """Generate for several (prompt, system) pairs sharing the same settings."""
+        return [
+            self.generate(prompt, system, max_new_tokens, temperature)
+            for prompt, system in prompts
+        ]
@@ -0,0 +1,96 @@
+"""
+Tokens/sec benchmark for the local engine's inference profiles.
+
+Loads the model once per profile on the current machine, runs a warmup
+generation, then reports load time and decode throughput:
+
+    python -m app.services.llm.benchmark --model Qwen/Qwen2.5-0.5B-Instruct
+    python -m app.services.llm.benchmark --profiles cpu_fp32 cpu_int8 --threads 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import logging
+import time
+
+from .huggingface import HuggingFaceEngine
+from .profiles import CPU_PROFILES, get_profile
+from .registry import _DEFAULT_MODEL
+
+logger = logging.getLogger(__name__)
+
+_PROMPT = (
+    "Recommend a CPU, GPU and amount of RAM for a 1440p gaming PC "
+    "and explain each choice in one sentence."
+)
+
+
+def benchmark_profile(
+    model_id: str,
+    profile_name: str,
+    max_new_tokens: int,
+    runs: int,
+    num_threads: int | None = None,
+) -> dict:
+    profile = get_profile(profile_name)
+    if num_threads:
+        profile = profile.model_copy(update={"num_threads": num_threads})
+
+    engine = HuggingFaceEngine(model_id, profile=profile)
+
+    start = time.perf_counter()
+    engine.load()
+    load_s = time.perf_counter() - start
+
+    # Warmup (also triggers torch.compile tracing for compiled profiles)
+    engine._generate(_PROMPT, max_new_tokens=8, temperature=0.0)
+
+    tokens = 0
+    elapsed = 0.0
+    for _ in range(runs):
+        start = time.perf_counter()
+        _, n_tokens = engine._generate(_PROMPT, max_new_tokens=max_new_tokens, temperature=0.0)
+        elapsed += time.perf_counter() - start
+        tokens += n_tokens
+
+    del engine
+    gc.collect()
+
+    return {
+        "profile": profile_name,
+        "load_s": load_s,
+        "tokens": tokens,
+        "tokens_per_s": tokens / elapsed if elapsed else 0.0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--model", default=_DEFAULT_MODEL)
+    parser.add_argument("--profiles", nargs="+", default=CPU_PROFILES)
+    parser.add_argument("--max-new-tokens", type=int, default=64)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--threads", type=int, default=None)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    logger.info("Model: %s", args.model)
+    logger.info("%-20s %10s %8s %10s", "profile", "load (s)", "tokens", "tok/s")
+    for name in args.profiles:
+        try:
+            result = benchmark_profile(
+                args.model, name, args.max_new_tokens, args.runs, args.threads,
+            )
+        except Exception:
+            logger.exception("%-20s failed", name)
+            continue
+        logger.info(
+            "%-20s %10.1f %8d %10.2f",
+            result["profile"], result["load_s"], result["tokens"], result["tokens_per_s"],
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,497 @@
+"""
+Gateway for every call to the hosted LLM provider (Anthropic).
+
+Both the chat pipeline (async SDK) and the LangGraph recommender (sync
+LangChain `ChatAnthropic`) route through here so that they share:
+
+  * pooled clients — one AsyncAnthropic with a bounded httpx pool, and one
+    cached ChatAnthropic per (model, temperature, max_tokens);
+  * admission control — a per-model concurrency limit shared by async and
+    sync calls.  Calls over the limit queue (first come, first served) for
+    up to LLM_GATEWAY_QUEUE_TIMEOUT seconds and then fail with
+    `GatewayBusyError` instead of piling onto the provider;
+  * retries — 429 / 529 (overloaded) / 5xx / connection errors are retried
+    with full-jitter exponential backoff, honouring `retry-after`;
+  * request timeouts;
+  * usage accounting — input/output and prompt-cache read/write token
+    counts per call, aggregated per (model, step) in `usage_stats()`;
+  * hedging — for steps listed in LLM_HEDGE_STEPS, `create_message` fires
+    a second identical request when the first has not returned by the
+    step's observed latency percentile, takes whichever finishes first and
+    cancels the other, whose elapsed time is recorded as a censored latency
+    sample.  Only enable it for idempotent, short calls (e.g. "extract").
+    Hedges are capped at LLM_HEDGE_BUDGET of the step's calls and reported
+    in `hedge_stats()`.
+
+  LLM_GATEWAY_MAX_CONCURRENCY   in-flight calls per model (default 8)
+  LLM_GATEWAY_QUEUE_TIMEOUT     max seconds to wait for a slot (default 30)
+  LLM_GATEWAY_TIMEOUT           per-request timeout in seconds (default 60)
+  LLM_GATEWAY_MAX_RETRIES       retries after the first attempt (default 4)
+  LLM_HEDGE_STEPS               comma-separated steps to hedge (default none)
+  LLM_HEDGE_PERCENTILE          latency percentile used as the deadline (default 95)
+  LLM_HEDGE_BUDGET              max fraction of calls that may hedge (default 0.1)
+  LLM_HEDGE_MIN_SAMPLES         latencies observed before hedging starts (default 20)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import random
+import threading
+import time
+from collections import defaultdict, deque
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterator
+from contextlib import AsyncExitStack, asynccontextmanager, contextmanager
+from typing import TYPE_CHECKING, Any, TypeVar
+
+if TYPE_CHECKING:
+    import anthropic
+    from langchain_anthropic import ChatAnthropic
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_MAX_CONCURRENCY = int(os.getenv("LLM_GATEWAY_MAX_CONCURRENCY", "8"))
+_QUEUE_TIMEOUT = float(os.getenv("LLM_GATEWAY_QUEUE_TIMEOUT", "30"))
+_REQUEST_TIMEOUT = float(os.getenv("LLM_GATEWAY_TIMEOUT", "60"))
+_MAX_RETRIES = int(os.getenv("LLM_GATEWAY_MAX_RETRIES", "4"))
+
+_HEDGE_STEPS = {s.strip() for s in os.getenv("LLM_HEDGE_STEPS", "").split(",") if s.strip()}
+_HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", "95"))
+_HEDGE_BUDGET = float(os.getenv("LLM_HEDGE_BUDGET", "0.1"))
+_HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+_LATENCY_WINDOW = 500
+
+_BACKOFF_BASE = 0.5
+_BACKOFF_CAP = 20.0
+_RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504, 529}
+
+
+class GatewayBusyError(RuntimeError):
+    """No concurrency slot for the model freed up within the queue timeout."""
+
+
+# ---------------------------------------------------------------------------
+# Clients
+# ---------------------------------------------------------------------------
+
+_async_client: anthropic.AsyncAnthropic | None = None
+_chat_models: dict[tuple[str, float, int], ChatAnthropic] = {}
+_client_lock = threading.Lock()
+
+
+def _api_key() -> str:
+    api_key = os.getenv("ANTHROPIC_API_KEY")
+    if not api_key:
+        raise OSError("ANTHROPIC_API_KEY is not set.")
+    return api_key
+
+
+def get_async_client() -> anthropic.AsyncAnthropic:
+    global _async_client
+    if _async_client is None:
+        import anthropic
+        import httpx
+
+        _async_client = anthropic.AsyncAnthropic(
+            api_key=_api_key(),
+            # Retries are handled here so they respect admission control.
+            max_retries=0,
+            timeout=_REQUEST_TIMEOUT,
+            http_client=anthropic.DefaultAsyncHttpxClient(
+                limits=httpx.Limits(
+                    max_connections=_MAX_CONCURRENCY * 4,
+                    max_keepalive_connections=_MAX_CONCURRENCY * 2,
+                ),
+            ),
+        )
+    return _async_client
+
+
+def get_chat_model(model: str, temperature: float, max_tokens: int) -> ChatAnthropic:
+    """Return a shared LangChain chat model (and its HTTP pool) for these settings."""
+    key = (model, temperature, max_tokens)
+    with _client_lock:
+        if key not in _chat_models:
+            from langchain_anthropic import ChatAnthropic
+
+            _api_key()
+            _chat_models[key] = ChatAnthropic(
+                model=model,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                max_retries=0,
+                default_request_timeout=_REQUEST_TIMEOUT,
+            )
+        return _chat_models[key]
+
+
+# ---------------------------------------------------------------------------
+# Admission control
+# ---------------------------------------------------------------------------
+
+class _Waiter:
+    __slots__ = ("granted", "wake")
+
+    def __init__(self, wake: Callable[[], None]):
+        self.granted = False
+        self.wake = wake
+
+
+class _Slots:
+    """
+    One model's concurrency budget, shared by async and sync callers.
+
+    A released slot is handed straight to the oldest waiter.  Waiters are
+    woken through `wake` (an asyncio future set thread-safely, or a
+    threading.Event), but `granted`, read under the lock, decides whether
+    they got the slot, so a wake-up racing a timeout never loses one.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self._in_use = 0
+        self._waiters: deque[_Waiter] = deque()
+        self._lock = threading.Lock()
+
+    @property
+    def in_use(self) -> int:
+        return self._in_use
+
+    def _take_or_queue(self, wake: Callable[[], None]) -> _Waiter | None:
+        """Take a free slot (returns None) or queue a waiter."""
+        with self._lock:
+            if self._in_use < self.limit and not self._waiters:
+                self._in_use += 1
+                return None
+            waiter = _Waiter(wake)
+            self._waiters.append(waiter)
+            return waiter
+
+    def _stop_waiting(self, waiter: _Waiter) -> bool:
+        """Dequeue `waiter`; True if it was granted a slot first (and now holds it)."""
+        with self._lock:
+            if waiter.granted:
+                return True
+            self._waiters.remove(waiter)
+            return False
+
+    def release(self) -> None:
+        with self._lock:
+            if not self._waiters:
+                self._in_use -= 1
+                return
+            waiter = self._waiters.popleft()
+            waiter.granted = True
+        waiter.wake()
+
+    async def acquire(self, timeout: float) -> bool:
+        loop = asyncio.get_running_loop()
+        woken: asyncio.Future[None] = loop.create_future()
+
+        def wake() -> None:
+            loop.call_soon_threadsafe(lambda: woken.done() or woken.set_result(None))
+
+        waiter = self._take_or_queue(wake)
+        if waiter is None:
+            return True
+        try:
+            await asyncio.wait({woken}, timeout=timeout)
+        except BaseException:  # cancelled while queued
+            if self._stop_waiting(waiter):
+                self.release()
+            raise
+        return self._stop_waiting(waiter)
+
+    def acquire_sync(self, timeout: float) -> bool:
+        woken = threading.Event()
+        waiter = self._take_or_queue(woken.set)
+        if waiter is None:
+            return True
+        woken.wait(timeout)
+        return self._stop_waiting(waiter)
+
+
+_slots: dict[str, _Slots] = {}
+_stats: dict[str, dict[str, float]] = defaultdict(
+    lambda: {"calls": 0, "retries": 0, "rejected": 0, "failures": 0, "queue_wait_s": 0.0}
+)
+
+
+def gateway_stats() -> dict[str, dict[str, float]]:
+    return {model: dict(counters) for model, counters in _stats.items()}
+
+
+def _model_slots(model: str) -> _Slots:
+    with _client_lock:
+        return _slots.setdefault(model, _Slots(_MAX_CONCURRENCY))
+
+
+@asynccontextmanager
+async def _admit(model: str) -> AsyncIterator[None]:
+    slots = _model_slots(model)
+    start = time.perf_counter()
+    if not await slots.acquire(_QUEUE_TIMEOUT):
+        _stats[model]["rejected"] += 1
+        raise GatewayBusyError(f"No capacity for {model} after {_QUEUE_TIMEOUT}s")
+    _stats[model]["queue_wait_s"] += time.perf_counter() - start
+    try:
+        yield
+    finally:
+        slots.release()
+
+
+@contextmanager
+def _admit_sync(model: str) -> Iterator[None]:
+    slots = _model_slots(model)
+    start = time.perf_counter()
+    if not slots.acquire_sync(_QUEUE_TIMEOUT):
+        _stats[model]["rejected"] += 1
+        raise GatewayBusyError(f"No capacity for {model} after {_QUEUE_TIMEOUT}s")
+    _stats[model]["queue_wait_s"] += time.perf_counter() - start
+    try:
+        yield
+    finally:
+        slots.release()
+
+
+# ---------------------------------------------------------------------------
+# Usage accounting
+# ---------------------------------------------------------------------------
+
+_usage: dict[tuple[str, str], dict[str, int]] = defaultdict(
+    lambda: {"calls": 0, "input_tokens": 0, "output_tokens": 0, "cache_read_tokens": 0, "cache_write_tokens": 0}
+)
+
+
+def cached_text(text: str) -> dict[str, Any]:
+    """A text content block marked as a prompt-cache breakpoint."""
+    return {"type": "text", "text": text, "cache_control": {"type": "ephemeral"}}
+
+
+def record_usage(model: str, step: str, usage: Any) -> None:
+    """
+    Record token usage for one call.  Accepts an Anthropic SDK `Usage`
+    object or a LangChain `usage_metadata` dict.
+    """
+    if usage is None:
+        return
+
+    if isinstance(usage, dict):
+        details = usage.get("input_token_details") or {}
+        counts = {
+            "input_tokens": usage.get("input_tokens") or 0,
+            "output_tokens": usage.get("output_tokens") or 0,
+            "cache_read_tokens": details.get("cache_read") or 0,
+            "cache_write_tokens": details.get("cache_creation") or 0,
+        }
+    else:
+        counts = {
+            "input_tokens": getattr(usage, "input_tokens", 0) or 0,
+            "output_tokens": getattr(usage, "output_tokens", 0) or 0,
+            "cache_read_tokens": getattr(usage, "cache_read_input_tokens", 0) or 0,
+            "cache_write_tokens": getattr(usage, "cache_creation_input_tokens", 0) or 0,
+        }
+
+    totals = _usage[(model, step)]
+    totals["calls"] += 1
+    for key, value in counts.items():
+        totals[key] += value
+
+    logger.info(
+        "LLM usage model=%s step=%s input=%d output=%d cache_read=%d cache_write=%d",
+        model, step, counts["input_tokens"], counts["output_tokens"],
+        counts["cache_read_tokens"], counts["cache_write_tokens"],
+    )
+
+
+def usage_stats() -> dict[str, dict[str, int]]:
+    return {f"{model}:{step}": dict(totals) for (model, step), totals in _usage.items()}
+
+
+# ---------------------------------------------------------------------------
+# Retries
+# ---------------------------------------------------------------------------
+
+def _retry_delay(exc: Exception, attempt: int) -> float | None:
+    """Seconds to wait before retrying `exc`, or None if it is not retryable."""
+    import anthropic
+
+    if isinstance(exc, (anthropic.APIConnectionError, anthropic.APITimeoutError)):
+        retry_after = 0.0
+    elif isinstance(exc, anthropic.APIStatusError) and exc.status_code in _RETRYABLE_STATUS:
+        try:
+            retry_after = float(exc.response.headers.get("retry-after", 0))
+        except ValueError:
+            retry_after = 0.0
+    else:
+        return None
+
+    backoff = random.uniform(0, min(_BACKOFF_CAP, _BACKOFF_BASE * 2**attempt))
+    return max(backoff, min(retry_after, _BACKOFF_CAP))
+
+
+async def _call_with_retries(model: str, fn: Callable[[], Awaitable[T]]) -> T:
+    for attempt in range(_MAX_RETRIES + 1):
+        try:
+            return await fn()
+        except Exception as exc:
+            delay = _retry_delay(exc, attempt)
+            if delay is None or attempt == _MAX_RETRIES:
+                _stats[model]["failures"] += 1
+                raise
+            _stats[model]["retries"] += 1
+            logger.warning("%s call failed (%s); retry %d in %.2fs", model, exc, attempt + 1, delay)
+            await asyncio.sleep(delay)
+    raise AssertionError("unreachable")
+
+
+# ---------------------------------------------------------------------------
+# Hedging
+# ---------------------------------------------------------------------------
+
+_latencies: dict[str, deque[float]] = defaultdict(lambda: deque(maxlen=_LATENCY_WINDOW))
+_hedges: dict[str, dict[str, int]] = defaultdict(
+    lambda: {"calls": 0, "hedged": 0, "hedge_wins": 0, "primary_wins": 0, "over_budget": 0}
+)
+
+
+def hedge_stats() -> dict[str, dict[str, Any]]:
+    return {
+        step: {**counters, "deadline_s": _hedge_deadline(step)}
+        for step, counters in _hedges.items()
+    }
+
+
+def _hedge_deadline(step: str) -> float | None:
+    """The step's latency percentile, or None until enough calls were seen."""
+    samples = _latencies[step]
+    if len(samples) < _HEDGE_MIN_SAMPLES:
+        return None
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(len(ordered) * _HEDGE_PERCENTILE / 100))
+    return ordered[index]
+
+
+async def _timed(step: str, fn: Callable[[], Awaitable[T]]) -> T:
+    start = time.perf_counter()
+    try:
+        result = await fn()
+    except asyncio.CancelledError:
+        # The losing call of a hedge took at least this long (a censored
+        # sample); leaving it out would keep only the fast calls and pull
+        # the deadline down.
+        _latencies[step].append(time.perf_counter() - start)
+        raise
+    _latencies[step].append(time.perf_counter() - start)
+    return result
+
+
+async def _hedged(step: str, fn: Callable[[], Awaitable[T]]) -> T:
+    """
+    Run `fn`; if it has not finished by the step's deadline, run it again
+    concurrently and return the first successful result.
+    """
+    counters = _hedges[step]
+    counters["calls"] += 1
+    deadline = _hedge_deadline(step)
+
+    primary = asyncio.ensure_future(_timed(step, fn))
+    tasks = {primary}
+    try:
+        if deadline is None:
+            return await primary
+        done, _ = await asyncio.wait(tasks, timeout=deadline)
+        if done:
+            return primary.result()
+        if counters["hedged"] >= _HEDGE_BUDGET * counters["calls"]:
+            counters["over_budget"] += 1
+            return await primary
+
+        counters["hedged"] += 1
+        hedge = asyncio.ensure_future(_timed(step, fn))
+        tasks.add(hedge)
+        error: BaseException | None = None
+        while tasks:
+            done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    counters["hedge_wins" if task is hedge else "primary_wins"] += 1
+                    return task.result()
+                error = task.exception()
+        assert error is not None
+        raise error
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+# ---------------------------------------------------------------------------
+# Public API
+# ---------------------------------------------------------------------------
+
+async def create_message(*, step: str, **kwargs: Any) -> anthropic.types.Message:
+    """
+    `client.messages.create(**kwargs)` with admission control and retries,
+    hedged when `step` is in LLM_HEDGE_STEPS.
+    """
+    model = kwargs["model"]
+    client = get_async_client()
+
+    async def _attempt() -> anthropic.types.Message:
+        _stats[model]["calls"] += 1
+        async with _admit(model):
+            return await _call_with_retries(model, lambda: client.messages.create(**kwargs))
+
+    if step in _HEDGE_STEPS:
+        response = await _hedged(step, _attempt)
+    else:
+        response = await _attempt()
+    record_usage(model, step, response.usage)
+    return response
+
+
+@asynccontextmanager
+async def stream_message(*, step: str, **kwargs: Any) -> AsyncIterator[Any]:
+    """
+    `client.messages.stream(**kwargs)` with admission control.  Opening the
+    stream is retried; once tokens have started flowing errors propagate.
+    The concurrency slot is held until the stream is closed.
+    """
+    model = kwargs["model"]
+    client = get_async_client()
+    _stats[model]["calls"] += 1
+    async with _admit(model), AsyncExitStack() as stack:
+
+        async def _open() -> Any:
+            return await stack.enter_async_context(client.messages.stream(**kwargs))
+
+        stream = await _call_with_retries(model, _open)
+        try:
+            yield stream
+        finally:
+            # The snapshot carries message_start usage (incl. cache counts)
+            # even when the caller stops reading early.
+            snapshot = getattr(stream, "current_message_snapshot", None)
+            record_usage(model, step, getattr(snapshot, "usage", None))
+
+
+def invoke_sync(model: str, fn: Callable[[], T]) -> T:
+    """Run a blocking provider call (e.g. a LangChain `.invoke`) through the gateway."""
+    _stats[model]["calls"] += 1
+    with _admit_sync(model):
+        for attempt in range(_MAX_RETRIES + 1):
+            try:
+                return fn()
+            except Exception as exc:
+                delay = _retry_delay(exc, attempt)
+                if delay is None or attempt == _MAX_RETRIES:
+                    _stats[model]["failures"] += 1
+                    raise
+                _stats[model]["retries"] += 1
+                logger.warning("%s call failed (%s); retry %d in %.2fs", model, exc, attempt + 1, delay)
+                time.sleep(delay)
+    raise AssertionError("unreachable")
@@ -1,37 +1,245 @@
 from __future__ import annotations
 
+import copy
+import logging
 import os
 import threading
 from typing import Optional
 
 import torch
-from transformers import AutoModelForCausalLM, AutoTokenizer
+from transformers import AutoModelForCausalLM, AutoTokenizer, DynamicCache
 
 from .base import LLMEngine
+from .prefix_cache import PrefixCache
+from .profiles import InferenceProfile, get_profile, resolve_profile
+from .result_cache import cache_key, get_result_cache
+
+logger = logging.getLogger(__name__)
+
+_PREFIX_CACHE_MB = int(os.getenv("LLM_PREFIX_CACHE_MB", "512"))
 
 
 class HuggingFaceEngine(LLMEngine):
-    def __init__(self, model_id: str):
+    def __init__(self, model_id: str, profile: InferenceProfile | None = None):
         self.model_id = model_id
+        self.profile = profile or resolve_profile(model_id)
         self._lock = threading.Lock()
         self._model = None
         self._tokenizer = None
+        self._prefix_cache = PrefixCache(_PREFIX_CACHE_MB * 1024 * 1024)
+
+    def _resolve_auto_profile(self) -> InferenceProfile:
+        if self.profile.device != "auto":
+            return self.profile
+        base = get_profile("gpu_fp16" if torch.cuda.is_available() else "cpu_fp32")
+        return base.model_copy(
+            update={
+                "num_threads": self.profile.num_threads,
+                "compile": self.profile.compile,
+                "mmap_weights": self.profile.mmap_weights,
+            }
+        )
 
     def load(self) -> None:
         if self._model is not None:
             return
 
+        self.profile = self._resolve_auto_profile()
+        profile = self.profile
+
+        if profile.num_threads:
+            # Process-wide setting: the last loaded profile wins.
+            torch.set_num_threads(profile.num_threads)
+
         self._tokenizer = AutoTokenizer.from_pretrained(self.model_id, use_fast=True)
 
         if self._tokenizer.pad_token is None and self._tokenizer.eos_token is not None:
             self._tokenizer.pad_token = self._tokenizer.eos_token
+        # Decoder-only models must be left-padded for batched generation.
+        self._tokenizer.padding_side = "left"
 
-        self._model = AutoModelForCausalLM.from_pretrained(
-            self.model_id,
-            torch_dtype=torch.float16,
-            device_map="auto",
-        )
-        self._model.eval()
+        if profile.device == "cuda":
+            model = AutoModelForCausalLM.from_pretrained(
+                self.model_id,
+                torch_dtype=getattr(torch, profile.dtype),
+                device_map="auto",
+            )
+        elif profile.mmap_weights:
+            from .shared_weights import load_shared_model
+
+            model = load_shared_model(self.model_id, getattr(torch, profile.dtype))
+        else:
+            model = AutoModelForCausalLM.from_pretrained(
+                self.model_id,
+                torch_dtype=getattr(torch, profile.dtype),
+                low_cpu_mem_usage=True,
+            )
+        model.eval()
+
+        if profile.quantize == "int8":
+            model = torch.ao.quantization.quantize_dynamic(
+                model, {torch.nn.Linear}, dtype=torch.qint8,
+            )
+
+        if profile.compile:
+            # dynamic=True avoids a recompile for every new prompt length.
+            model.forward = torch.compile(model.forward, dynamic=True)
+
+        self._model = model
+        logger.info("Loaded %s with inference profile %s", self.model_id, profile.name)
+
+    def _generate(
+        self,
+        prompt: str,
+        system: Optional[str] = None,
+        max_new_tokens: int = 256,
+        temperature: float = 0.7,
+    ) -> tuple[str, int]:
+        """Run generation and return (text, number of generated tokens)."""
+        if self._model is None:
+            self.load()
+
+        with self._lock:
+            if system and self._prefix_cache.enabled:
+                inputs = self._encode_with_prefix(f"{system}\n\n", prompt)
+            else:
+                full_prompt = prompt if not system else f"{system}\n\n{prompt}"
+                inputs = self._tokenizer(full_prompt, return_tensors="pt")
+                inputs = {k: v.to(self._model.device) for k, v in inputs.items()}
+
+            with torch.no_grad():
+                output_ids = self._model.generate(
+                    **inputs,
+                    max_new_tokens=max_new_tokens,
+                    do_sample=temperature > 0,
+                    temperature=temperature,
+                    pad_token_id=self._tokenizer.pad_token_id,
+                    eos_token_id=self._tokenizer.eos_token_id,
+                )
+
+        generated = output_ids[0][inputs["input_ids"].shape[-1]:]
+        text = self._tokenizer.decode(generated, skip_special_tokens=True).strip()
+        return text, int(generated.shape[-1])
+
+    def _encode_with_prefix(self, prefix: str, prompt: str) -> dict:
+        """
+        Tokenize `prefix` and `prompt` separately and attach a copy of the
+        prefix's cached KV state, prefilling and caching it on a miss.
+
+        Encoding the two halves separately keeps the prefix token ids stable
+        across prompts, so generation only has to prefill the prompt tokens.
+        Must be called with `self._lock` held.
+        """
+        device = self._model.device
+        suffix_ids = self._tokenizer(
+            prompt, add_special_tokens=False, return_tensors="pt",
+        )["input_ids"].to(device)
+
+        cached = self._prefix_cache.get(prefix)
+        if cached is None:
+            prefix_ids = self._tokenizer(prefix, return_tensors="pt")["input_ids"].to(device)
+            with torch.no_grad():
+                past = self._model(input_ids=prefix_ids, use_cache=True).past_key_values
+            if not isinstance(past, DynamicCache):
+                past = DynamicCache.from_legacy_cache(past)
+            self._prefix_cache.put(prefix, prefix_ids, past)
+        else:
+            prefix_ids, past = cached
+
+        input_ids = torch.cat([prefix_ids, suffix_ids], dim=-1)
+        inputs = {
+            "input_ids": input_ids,
+            "attention_mask": torch.ones_like(input_ids),
+        }
+        if suffix_ids.shape[-1] > 0:
+            # generate() extends the cache in place, so never hand it the shared copy.
+            inputs["past_key_values"] = copy.deepcopy(past)
+        return inputs
+
+    # ------------------------------------------------------------------
+    # Constrained decoding helpers (used by app.services.local_extraction)
+    # ------------------------------------------------------------------
+
+    def chat_prompt(self, system: str, user: str) -> str:
+        """Render a system + user turn with the model's chat template, ready for the reply."""
+        if self._model is None:
+            self.load()
+        messages = [{"role": "system", "content": system}, {"role": "user", "content": user}]
+        if getattr(self._tokenizer, "chat_template", None):
+            return self._tokenizer.apply_chat_template(
+                messages, tokenize=False, add_generation_prompt=True,
+            )
+        return f"{system}\n\n{user}\n\n"
+
+    def score_choices(self, prefix: str, choices: list[str], per_token: bool = False) -> list[float]:
+        """
+        Log-likelihood of each choice as the continuation of `prefix`, or
+        with `per_token` its mean over the choice's tokens, so choices that
+        take more tokens are not penalized for their length.
+
+        The prefix is prefilled once; each choice then only runs its own
+        few tokens on a copy of the prefix's KV cache.
+        """
+        if self._model is None:
+            self.load()
+
+        device = self._model.device
+        with self._lock, torch.no_grad():
+            prefix_ids = self._tokenizer(prefix, return_tensors="pt")["input_ids"].to(device)
+            out = self._model(input_ids=prefix_ids, use_cache=True)
+            first_logprobs = torch.log_softmax(out.logits[0, -1].float(), dim=-1)
+            past = out.past_key_values
+
+            scores: list[float] = []
+            for choice in choices:
+                choice_ids = self._tokenizer(
+                    choice, add_special_tokens=False, return_tensors="pt",
+                )["input_ids"].to(device)
+                score = first_logprobs[choice_ids[0, 0]].item()
+                if choice_ids.shape[-1] > 1:
+                    logits = self._model(
+                        input_ids=choice_ids[:, :-1],
+                        past_key_values=copy.deepcopy(past),
+                        use_cache=True,
+                    ).logits
+                    logprobs = torch.log_softmax(logits[0].float(), dim=-1)
+                    score += logprobs.gather(-1, choice_ids[0, 1:, None]).sum().item()
+                scores.append(score / choice_ids.shape[-1] if per_token else score)
+        return scores
+
+    def complete_until(self, prefix: str, stop: str, max_new_tokens: int = 64) -> str | None:
+        """
+        Greedily continue `prefix` until `stop` is generated.  Returns the
+        text before the stop string, or None if it never appeared.
+        """
+        if self._model is None:
+            self.load()
+
+        with self._lock:
+            inputs = self._tokenizer(prefix, return_tensors="pt")
+            inputs = {k: v.to(self._model.device) for k, v in inputs.items()}
+            with torch.no_grad():
+                output_ids = self._model.generate(
+                    **inputs,
+                    max_new_tokens=max_new_tokens,
+                    do_sample=False,
+                    stop_strings=[stop],
+                    tokenizer=self._tokenizer,
+                    pad_token_id=self._tokenizer.pad_token_id,
+                    eos_token_id=self._tokenizer.eos_token_id,
+                )
+
+        generated = output_ids[0][inputs["input_ids"].shape[-1]:]
+        text = self._tokenizer.decode(generated, skip_special_tokens=True)
+        if stop not in text:
+            return None
+        return text[: text.index(stop)]
+
+    def _cache_key(self, system: str | None, prompt: str, max_new_tokens: int) -> str:
+        # Keyed on the concrete profile: "auto" only becomes one in load().
+        if self._model is None:
+            self.load()
+        return cache_key(self.model_id, self.profile.name, system, prompt, max_new_tokens)
 
     def generate(
         self,
@@ -40,13 +248,57 @@ class HuggingFaceEngine(LLMEngine):
         max_new_tokens: int = 256,
         temperature: float = 0.7,
     ) -> str:
+        cache = get_result_cache()
+        if temperature == 0 and cache.enabled:
+            key = self._cache_key(system, prompt, max_new_tokens)
+            cached = cache.get(key)
+            if cached is not None:
+                return cached
+            text, _ = self._generate(prompt, system, max_new_tokens, temperature)
+            cache.put(key, text)
+            return text
+
+        text, _ = self._generate(prompt, system, max_new_tokens, temperature)
+        return text
+
+    def generate_batch(
+        self,
+        prompts: list[tuple[str, Optional[str]]],
+        max_new_tokens: int = 256,
+        temperature: float = 0.7,
+    ) -> list[str]:
+        cache = get_result_cache()
+        if temperature == 0 and cache.enabled:
+            keys = [self._cache_key(system, prompt, max_new_tokens) for prompt, system in prompts]
+            results = [cache.get(key) for key in keys]
+            missing = [i for i, r in enumerate(results) if r is None]
+            if missing:
+                outputs = self._generate_batch(
+                    [prompts[i] for i in missing], max_new_tokens, temperature,
+                )
+                for i, output in zip(missing, outputs, strict=True):
+                    cache.put(keys[i], output)
+                    results[i] = output
+            return results
+
+        return self._generate_batch(prompts, max_new_tokens, temperature)
+
+    def _generate_batch(
+        self,
+        prompts: list[tuple[str, Optional[str]]],
+        max_new_tokens: int,
+        temperature: float,
+    ) -> list[str]:
         if self._model is None:
             self.load()
 
-        full_prompt = prompt if not system else f"{system}\n\n{prompt}"
+        full_prompts = [
+            prompt if not system else f"{system}\n\n{prompt}"
+            for prompt, system in prompts
+        ]
 
         with self._lock:
-            inputs = self._tokenizer(full_prompt, return_tensors="pt")
+            inputs = self._tokenizer(full_prompts, return_tensors="pt", padding=True)
             inputs = {k: v.to(self._model.device) for k, v in inputs.items()}
 
             with torch.no_grad():
@@ -59,5 +311,9 @@ class HuggingFaceEngine(LLMEngine):
                     eos_token_id=self._tokenizer.eos_token_id,
                 )
 
-        generated = output_ids[0][inputs["input_ids"].shape[-1]:]
-        return self._tokenizer.decode(generated, skip_special_tokens=True).strip()
+        # Left padding puts every prompt's last token at the same column.
+        generated = output_ids[:, inputs["input_ids"].shape[-1]:]
+        return [
+            text.strip()
+            for text in self._tokenizer.batch_decode(generated, skip_special_tokens=True)
+        ]
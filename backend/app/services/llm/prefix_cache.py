@@ -0,0 +1,74 @@
+"""
+LRU cache of prefilled past-key-values for system-prompt prefixes.
+
+Callers reuse a handful of long system prompts, so the engine prefills
+each prefix once, keeps the resulting KV cache here, and starts every
+later generation from a copy of it.  Entries are evicted least-recently
+used first once the total tensor size exceeds the byte budget.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Any
+
+
+def cache_nbytes(past_key_values: Any) -> int:
+    """Total bytes held by the key/value tensors of a transformers Cache."""
+    layers = getattr(past_key_values, "layers", None)
+    if layers is not None:
+        tensors = [t for layer in layers for t in (layer.keys, layer.values) if t is not None]
+    else:
+        tensors = [*past_key_values.key_cache, *past_key_values.value_cache]
+    return sum(t.numel() * t.element_size() for t in tensors)
+
+
+class PrefixCache:
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, tuple[Any, Any, int]] = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    def get(self, prefix: str) -> tuple[Any, Any] | None:
+        """Return (prefix_input_ids, past_key_values) and mark it recently used."""
+        with self._lock:
+            entry = self._entries.get(prefix)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(prefix)
+            self.hits += 1
+            return entry[0], entry[1]
+
+    def put(self, prefix: str, input_ids: Any, past_key_values: Any) -> None:
+        nbytes = cache_nbytes(past_key_values)
+        if nbytes > self.max_bytes:
+            return
+
+        with self._lock:
+            old = self._entries.pop(prefix, None)
+            if old is not None:
+                self._total_bytes -= old[2]
+            self._entries[prefix] = (input_ids, past_key_values, nbytes)
+            self._total_bytes += nbytes
+
+            while self._total_bytes > self.max_bytes:
+                _, (_, _, evicted) = self._entries.popitem(last=False)
+                self._total_bytes -= evicted
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
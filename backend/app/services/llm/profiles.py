@@ -0,0 +1,96 @@
+"""
+Inference profiles for the local HuggingFace engine.
+
+A profile bundles the knobs that decide how a model is loaded and run:
+target device, weight dtype, optional dynamic int8 quantization,
+`torch.compile`, and the intra-op thread count.  Profiles are plain data
+(no torch import) so the registry can resolve them without paying for
+torch until a model is actually loaded.
+
+Selection
+---------
+  LLM_INFERENCE_PROFILE   default profile for every model (default "auto")
+  LLM_MODEL_PROFILES      per-model overrides, e.g.
+                          "mistralai/Mistral-7B-Instruct-v0.2=cpu_int8,Qwen/Qwen2.5-0.5B-Instruct=cpu_bf16"
+  LLM_NUM_THREADS         overrides `num_threads` on the resolved profile
+  LLM_TORCH_COMPILE       "1" / "0" overrides `compile` on the resolved profile
+  LLM_MMAP_WEIGHTS        "1" / "0" overrides `mmap_weights` (CPU only): load
+                          safetensors via mmap so worker processes share pages
+
+"auto" picks `gpu_fp16` when CUDA is available and `cpu_fp32` otherwise;
+it is resolved by the engine at load time.
+"""
+
+from __future__ import annotations
+
+import os
+from typing import Literal, Optional
+
+from pydantic import BaseModel
+
+
+class InferenceProfile(BaseModel):
+    name: str
+    device: Literal["auto", "cuda", "cpu"] = "cpu"
+    dtype: Literal["float16", "bfloat16", "float32"] = "float32"
+    quantize: Optional[Literal["int8"]] = None
+    compile: bool = False
+    num_threads: Optional[int] = None
+    mmap_weights: bool = False
+
+
+PROFILES: dict[str, InferenceProfile] = {
+    "auto": InferenceProfile(name="auto", device="auto"),
+    # Original behaviour: half precision, layers placed by accelerate.
+    "gpu_fp16": InferenceProfile(name="gpu_fp16", device="cuda", dtype="float16"),
+    "cpu_fp32": InferenceProfile(name="cpu_fp32", device="cpu", dtype="float32"),
+    # Fast on CPUs with AVX512-BF16 / AMX, emulated (slow) elsewhere.
+    "cpu_bf16": InferenceProfile(name="cpu_bf16", device="cpu", dtype="bfloat16"),
+    # Dynamic quantization only applies to fp32 nn.Linear modules.
+    "cpu_int8": InferenceProfile(name="cpu_int8", device="cpu", dtype="float32", quantize="int8"),
+    "cpu_bf16_compile": InferenceProfile(
+        name="cpu_bf16_compile", device="cpu", dtype="bfloat16", compile=True,
+    ),
+}
+
+# Profiles the benchmark runs by default on a CPU-only host.
+CPU_PROFILES = ["cpu_fp32", "cpu_bf16", "cpu_int8", "cpu_bf16_compile"]
+
+
+def get_profile(name: str) -> InferenceProfile:
+    try:
+        return PROFILES[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown inference profile '{name}'. Choose one of: {', '.join(PROFILES)}"
+        )
+
+
+def _model_overrides() -> dict[str, str]:
+    raw = os.getenv("LLM_MODEL_PROFILES", "")
+    overrides: dict[str, str] = {}
+    for item in raw.split(","):
+        if "=" not in item:
+            continue
+        model_id, profile_name = item.rsplit("=", 1)
+        overrides[model_id.strip()] = profile_name.strip()
+    return overrides
+
+
+def resolve_profile(model_id: str) -> InferenceProfile:
+    """Return the profile configured for `model_id`, with env overrides applied."""
+    name = _model_overrides().get(model_id) or os.getenv("LLM_INFERENCE_PROFILE", "auto")
+    profile = get_profile(name)
+
+    updates: dict[str, object] = {}
+    num_threads = os.getenv("LLM_NUM_THREADS")
+    if num_threads:
+        updates["num_threads"] = int(num_threads)
+    compile_flag = os.getenv("LLM_TORCH_COMPILE")
+    if compile_flag:
+        updates["compile"] = compile_flag == "1"
+    mmap_flag = os.getenv("LLM_MMAP_WEIGHTS")
+    if mmap_flag:
+        updates["mmap_weights"] = mmap_flag == "1"
+
+    return profile.model_copy(update=updates) if updates else profile
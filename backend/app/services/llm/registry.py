@@ -1,9 +1,11 @@
+import gc
+import logging
 import os
 from typing import Dict
 
 from .base import LLMEngine
-from .huggingface import HuggingFaceEngine
 
+logger = logging.getLogger(__name__)
 
 _DEFAULT_MODEL = os.getenv(
     "LLM_DEFAULT_MODEL",
@@ -17,7 +19,63 @@ def get_engine(model_name: str | None) -> LLMEngine:
     name = model_name or _DEFAULT_MODEL
 
     if name not in _engines:
+        # Deferred: importing the engine pulls in torch + transformers.
+        from .huggingface import HuggingFaceEngine
+
         _engines[name] = HuggingFaceEngine(name)
         _engines[name].load()
 
     return _engines[name]
+
+
+def loaded_models() -> list[str]:
+    return list(_engines)
+
+
+def preload_engines() -> None:
+    """
+    Load the models listed in LLM_PRELOAD_MODELS ("default" = LLM_DEFAULT_MODEL)
+    in the current process.
+
+    Call this in the parent before workers are forked (e.g. gunicorn
+    --preload with uvicorn workers) so they inherit the loaded weights
+    copy-on-write instead of each loading their own.
+    """
+    names = [n.strip() for n in os.getenv("LLM_PRELOAD_MODELS", "").split(",") if n.strip()]
+    for name in names:
+        get_engine(None if name == "default" else name)
+        logger.info("Preloaded LLM engine %s", name)
+
+    if names:
+        # Move everything allocated so far out of the GC's tracked generations,
+        # so collections in the forked workers don't touch (and un-share) it.
+        gc.freeze()
+
+
+def memory_report() -> dict[str, float]:
+    """Resident / proportional / shared / private memory of this process in MB."""
+    fields = {
+        "Rss": "rss_mb",
+        "Pss": "pss_mb",
+        "Shared_Clean": "shared_clean_mb",
+        "Shared_Dirty": "shared_dirty_mb",
+        "Private_Clean": "private_clean_mb",
+        "Private_Dirty": "private_dirty_mb",
+    }
+    report: dict[str, float] = {}
+    try:
+        with open(f"/proc/{os.getpid()}/smaps_rollup") as fh:
+            for line in fh:
+                key, _, rest = line.partition(":")
+                if key in fields:
+                    report[fields[key]] = int(rest.split()[0]) / 1024
+    except OSError:
+        import resource
+
+        # Linux reports KB, macOS bytes; only peak RSS is available here.
+        report["rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        return report
+
+    report["shared_mb"] = report.get("shared_clean_mb", 0.0) + report.get("shared_dirty_mb", 0.0)
+    report["private_mb"] = report.get("private_clean_mb", 0.0) + report.get("private_dirty_mb", 0.0)
+    return report
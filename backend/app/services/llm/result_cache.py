@@ -0,0 +1,153 @@
+"""
+Result cache for greedy (temperature == 0) generations.
+
+Greedy output is a pure function of (model, profile, system, prompt,
+max_new_tokens), so it is cached under a SHA-256 of those inputs in a
+bounded in-process LRU.  Set LLM_RESULT_CACHE_PATH to also persist
+entries in a SQLite file so they survive restarts; disk hits are promoted
+back into memory.  The file is bounded too: entries older than the TTL
+are ignored and deleted, and the oldest beyond the disk size go first
+(pruned on open and every few hundred writes).
+
+  LLM_RESULT_CACHE_SIZE       max in-memory entries (default 1024, 0 disables)
+  LLM_RESULT_CACHE_PATH       optional SQLite file for persistence
+  LLM_RESULT_CACHE_DISK_SIZE  max entries in the SQLite file (default 100000)
+  LLM_RESULT_CACHE_TTL_DAYS   lifetime of SQLite entries (default 30)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Disk entries are pruned after this many writes.
+_PRUNE_EVERY = 256
+
+
+def cache_key(
+    model_id: str,
+    profile: str,
+    system: Optional[str],
+    prompt: str,
+    max_new_tokens: int,
+) -> str:
+    payload = json.dumps([model_id, profile, system, prompt, max_new_tokens])
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class GenerationCache:
+    def __init__(
+        self,
+        max_entries: int,
+        path: str | None = None,
+        max_disk_entries: int = 100_000,
+        ttl_days: float = 30.0,
+    ):
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self.ttl_days = ttl_days
+        self._entries: OrderedDict[str, str] = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: sqlite3.Connection | None = None
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+
+        if path and max_entries > 0:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS generations ("
+                " key TEXT PRIMARY KEY,"
+                " output TEXT NOT NULL,"
+                " created_at REAL NOT NULL DEFAULT (julianday('now'))"
+                ")"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS ix_generations_created_at ON generations (created_at)"
+            )
+            self._prune()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            output = self._entries.get(key)
+            if output is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return output
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT output FROM generations WHERE key = ? AND created_at > julianday('now') - ?",
+                    (key, self.ttl_days),
+                ).fetchone()
+                if row is not None:
+                    self._remember(key, row[0])
+                    self.hits += 1
+                    return row[0]
+
+            self.misses += 1
+            return None
+
+    def put(self, key: str, output: str) -> None:
+        with self._lock:
+            self._remember(key, output)
+            if self._db is not None:
+                try:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO generations (key, output) VALUES (?, ?)",
+                        (key, output),
+                    )
+                    self._writes += 1
+                    if self._writes % _PRUNE_EVERY == 0:
+                        self._prune()
+                    else:
+                        self._db.commit()
+                except sqlite3.Error:
+                    logger.exception("Failed to persist generation cache entry")
+
+    def _prune(self) -> None:
+        """Delete expired disk entries, then the oldest beyond `max_disk_entries`."""
+        assert self._db is not None
+        self._db.execute(
+            "DELETE FROM generations WHERE created_at <= julianday('now') - ?", (self.ttl_days,),
+        )
+        self._db.execute(
+            "DELETE FROM generations WHERE key IN ("
+            " SELECT key FROM generations ORDER BY created_at DESC LIMIT -1 OFFSET ?"
+            ")",
+            (self.max_disk_entries,),
+        )
+        self._db.commit()
+
+    def _remember(self, key: str, output: str) -> None:
+        self._entries[key] = output
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+_cache: GenerationCache | None = None
+
+
+def get_result_cache() -> GenerationCache:
+    global _cache
+    if _cache is None:
+        _cache = GenerationCache(
+            max_entries=int(os.getenv("LLM_RESULT_CACHE_SIZE", "1024")),
+            path=os.getenv("LLM_RESULT_CACHE_PATH") or None,
+            max_disk_entries=int(os.getenv("LLM_RESULT_CACHE_DISK_SIZE", "100000")),
+            ttl_days=float(os.getenv("LLM_RESULT_CACHE_TTL_DAYS", "30")),
+        )
+    return _cache
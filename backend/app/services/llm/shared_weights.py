@@ -0,0 +1,114 @@
+"""
+Memory-mapped safetensors loading so worker processes share weight pages.
+
+`from_pretrained` copies every tensor into private, anonymous memory, so
+each worker process holds its own copy of the model.  Here the model is
+built on the meta device and its parameters are assigned tensors that
+point straight into a private (copy-on-write) mmap of the safetensors
+shards.  Pages stay backed by the OS page cache and are shared by every
+process that maps the same files until something writes to them.
+
+Sharing only holds when the on-disk dtype matches the profile dtype;
+anything that converts or rewrites weights (dtype casts, int8
+quantization) produces private copies again.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import mmap
+import struct
+from pathlib import Path
+
+import torch
+from accelerate import init_empty_weights
+from transformers import AutoConfig, AutoModelForCausalLM
+
+logger = logging.getLogger(__name__)
+
+_SAFETENSORS_DTYPES = {
+    "F64": torch.float64,
+    "F32": torch.float32,
+    "F16": torch.float16,
+    "BF16": torch.bfloat16,
+    "I64": torch.int64,
+    "I32": torch.int32,
+    "I16": torch.int16,
+    "I8": torch.int8,
+    "U8": torch.uint8,
+    "BOOL": torch.bool,
+}
+
+# Keep the mmaps alive for as long as the tensors that view them.
+_open_maps: list[mmap.mmap] = []
+
+
+def resolve_weight_files(model_id: str) -> list[Path]:
+    """Return the safetensors shards for a local path or a Hub model id."""
+    path = Path(model_id)
+    if not path.is_dir():
+        from huggingface_hub import snapshot_download
+
+        path = Path(snapshot_download(model_id, allow_patterns=["*.safetensors", "*.json"]))
+
+    files = sorted(path.glob("*.safetensors"))
+    if not files:
+        raise FileNotFoundError(f"No .safetensors weights found for {model_id}")
+    return files
+
+
+def mmap_safetensors(path: Path) -> dict[str, torch.Tensor]:
+    """Map one safetensors file and return zero-copy tensor views into it."""
+    with open(path, "rb") as fh:
+        mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_COPY)
+    _open_maps.append(mm)
+
+    (header_len,) = struct.unpack("<Q", mm[:8])
+    header = json.loads(mm[8 : 8 + header_len])
+    data_start = 8 + header_len
+
+    tensors: dict[str, torch.Tensor] = {}
+    for name, info in header.items():
+        if name == "__metadata__":
+            continue
+        dtype = _SAFETENSORS_DTYPES[info["dtype"]]
+        begin, end = info["data_offsets"]
+        if end == begin:
+            tensors[name] = torch.empty(info["shape"], dtype=dtype)
+            continue
+        count = (end - begin) // torch.empty((), dtype=dtype).element_size()
+        flat = torch.frombuffer(mm, dtype=dtype, count=count, offset=data_start + begin)
+        tensors[name] = flat.view(info["shape"])
+    return tensors
+
+
+def load_shared_model(model_id: str, dtype: torch.dtype):
+    """Build `model_id` with parameters backed by shared, mmapped weight files."""
+    config = AutoConfig.from_pretrained(model_id)
+    with init_empty_weights():
+        model = AutoModelForCausalLM.from_config(config, torch_dtype=dtype)
+
+    state_dict: dict[str, torch.Tensor] = {}
+    converted = 0
+    for path in resolve_weight_files(model_id):
+        for name, tensor in mmap_safetensors(path).items():
+            if tensor.is_floating_point() and tensor.dtype != dtype:
+                tensor = tensor.to(dtype)
+                converted += 1
+            state_dict[name] = tensor
+
+    if converted:
+        logger.warning(
+            "%s: %d tensors were cast to %s and are not shared between processes",
+            model_id, converted, dtype,
+        )
+
+    model.load_state_dict(state_dict, strict=False, assign=True)
+    model.tie_weights()
+
+    still_meta = [n for n, p in model.named_parameters() if p.is_meta]
+    if still_meta:
+        raise RuntimeError(f"{model_id}: weights missing for {still_meta[:5]}")
+    return model
+
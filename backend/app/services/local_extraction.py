@@ -0,0 +1,168 @@
+"""
+Local BuildProfile extraction with a small instruct model.
+
+Instead of asking the model for free-form JSON, the JSON object is
+assembled field by field so the result is always well-formed:
+
+  * enum fields (primary_use, gaming_resolution, budget_tier) are chosen
+    by scoring every allowed value's mean per-token log-likelihood as the
+    continuation of the skeleton so far (so "video_editing" is not
+    penalized for taking more tokens than "gaming"); the softmax
+    probability of the winner is that field's confidence;
+  * list fields (games, workloads) and notes are generated greedily up to
+    their closing delimiter and parsed as JSON.
+
+`extract_profile_local` returns None when any enum field's confidence is
+below LOCAL_EXTRACTION_MIN_CONFIDENCE or a free-text field fails to
+parse; the caller then falls back to the remote model.
+
+  PROFILE_EXTRACTION_BACKEND        "remote" (default) or "local"
+  LOCAL_EXTRACTION_MODEL            model id (default Qwen/Qwen2.5-0.5B-Instruct)
+  LOCAL_EXTRACTION_MIN_CONFIDENCE   minimum enum-field probability (default 0.6)
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import math
+import os
+import time
+from typing import TYPE_CHECKING, Optional
+
+from app.schemas.chat import BuildProfile, ChatMessage
+
+if TYPE_CHECKING:
+    from app.services.llm.huggingface import HuggingFaceEngine
+
+logger = logging.getLogger(__name__)
+
+EXTRACTION_BACKEND = os.getenv("PROFILE_EXTRACTION_BACKEND", "remote")
+_MODEL = os.getenv("LOCAL_EXTRACTION_MODEL", "Qwen/Qwen2.5-0.5B-Instruct")
+_MIN_CONFIDENCE = float(os.getenv("LOCAL_EXTRACTION_MIN_CONFIDENCE", "0.6"))
+
+_PRIMARY_USES = ["gaming", "video_editing", "local_llm", "general"]
+_RESOLUTIONS = ["1080p", "1440p", "4k"]
+_BUDGET_TIERS = ["entry", "mid", "high", "elite"]
+
+_SYSTEM = """\
+You extract a PC build profile from a conversation as JSON with the fields:
+primary_use (gaming | video_editing | local_llm | general),
+gaming_resolution (1080p | 1440p | 4k | null, only for gaming),
+budget_tier (entry ~$450-700 | mid ~$800-1300 | high ~$1300-1900 | elite ~$2000+),
+games (list of game titles), workloads (list of workloads), notes (extra context).
+If several uses are mentioned pick the most demanding one. Infer the budget tier
+from context when no amount is given.
+"""
+
+
+def _transcript(messages: list[ChatMessage]) -> str:
+    lines = [
+        f"{'Assistant' if msg.role == 'assistant' else 'User'}: {msg.content}"
+        for msg in messages
+    ]
+    return "Conversation:\n" + "\n".join(lines)
+
+
+def _choose(
+    engine: HuggingFaceEngine, prefix: str, options: list[str],
+) -> tuple[str, float]:
+    """Pick the most likely option; returns (option, softmax probability)."""
+    scores = engine.score_choices(prefix, options, per_token=True)
+    top = max(scores)
+    weights = [math.exp(s - top) for s in scores]
+    best = scores.index(top)
+    return options[best], weights[best] / sum(weights)
+
+
+def _complete_json(
+    engine: HuggingFaceEngine, prefix: str, opener: str, closer: str, max_new_tokens: int,
+) -> object:
+    """Generate a JSON value's body up to `closer`; raises ValueError if unparseable."""
+    body = engine.complete_until(prefix, closer, max_new_tokens=max_new_tokens)
+    if body is None:
+        raise ValueError(f"no closing {closer!r} within {max_new_tokens} tokens")
+    return json.loads(opener + body + closer)
+
+
+def _extract(engine: HuggingFaceEngine, messages: list[ChatMessage]) -> Optional[BuildProfile]:
+    text = engine.chat_prompt(_SYSTEM, _transcript(messages))
+    confidences: dict[str, float] = {}
+
+    # Options carry the leading space so the prefix never ends in one,
+    # which BPE tokenizers would otherwise split unnaturally.
+    text += '{"primary_use":'
+    primary_use, confidences["primary_use"] = _choose(
+        engine, text, [f" {json.dumps(o)}" for o in _PRIMARY_USES],
+    )
+    text += primary_use
+    primary_use = json.loads(primary_use)
+
+    text += ', "gaming_resolution":'
+    if primary_use == "gaming":
+        resolution, confidences["gaming_resolution"] = _choose(
+            engine, text, [f" {json.dumps(o)}" for o in _RESOLUTIONS] + [" null"],
+        )
+    else:
+        resolution = " null"
+    text += resolution
+
+    text += ', "budget_tier":'
+    budget_tier, confidences["budget_tier"] = _choose(
+        engine, text, [f" {json.dumps(o)}" for o in _BUDGET_TIERS],
+    )
+    text += budget_tier
+
+    # Bail out before generating free text if the enum picks are uncertain.
+    low = {k: round(v, 3) for k, v in confidences.items() if v < _MIN_CONFIDENCE}
+    if low:
+        logger.info("Local extraction confidence too low: %s", low)
+        return None
+
+    fields: dict[str, object] = {}
+    try:
+        for name in ("games", "workloads"):
+            text += f', "{name}": ['
+            values = _complete_json(engine, text, "[", "]", max_new_tokens=64)
+            if not all(isinstance(v, str) for v in values):
+                raise ValueError(f"{name} must be a list of strings")
+            fields[name] = values
+            text += json.dumps(values)[1:]
+
+        text += ', "notes": "'
+        fields["notes"] = _complete_json(engine, text, '"', '"', max_new_tokens=96)
+    except ValueError as exc:
+        logger.info("Local extraction failed to parse free-text fields: %s", exc)
+        return None
+
+    return BuildProfile(
+        primary_use=primary_use,
+        gaming_resolution=json.loads(resolution),
+        budget_tier=json.loads(budget_tier),
+        **fields,
+    )
+
+
+def get_extraction_engine() -> HuggingFaceEngine:
+    from app.services.llm.registry import get_engine
+
+    return get_engine(_MODEL)
+
+
+def extract_profile_local(messages: list[ChatMessage]) -> Optional[BuildProfile]:
+    """
+    Extract a BuildProfile with the local model, or return None if the
+    result should not be trusted.  Blocking; run it in an executor.
+    """
+    start = time.perf_counter()
+    try:
+        profile = _extract(get_extraction_engine(), messages)
+    except Exception:
+        logger.exception("Local profile extraction failed")
+        return None
+    logger.info(
+        "Local extraction %s in %.2fs",
+        "succeeded" if profile is not None else "fell back",
+        time.perf_counter() - start,
+    )
+    return profile
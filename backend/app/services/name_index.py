@@ -0,0 +1,119 @@
+"""
+Normalized / fuzzy name index for resolving free-text titles to catalog ids.
+
+`normalize` folds the differences users and catalogs disagree on: case,
+accents, trademark signs, punctuation, "&" vs "and" and roman numerals
+("Baldur's Gate III" → "baldurs gate 3").  `NameIndex` first tries an
+exact match on the normalized name (and on it with spaces removed, so
+"Counter-Strike 2" matches "counterstrike 2"); otherwise candidates
+sharing character trigrams are scored with difflib and the best one at
+or above `cutoff` wins.
+
+Tokens with digits (sequel numbers, roman numerals once normalized, model
+numbers such as "4060" or "i7") are not fuzzy: a candidate is only scored
+when its set of such tokens equals the query's, so "Battlefield 4" never
+resolves to "Battlefield 1".
+"""
+
+from __future__ import annotations
+
+import difflib
+import re
+import unicodedata
+from collections import defaultdict
+from collections.abc import Hashable, Iterable
+
+_ROMAN = {
+    "ii": "2", "iii": "3", "iv": "4", "v": "5", "vi": "6",
+    "vii": "7", "viii": "8", "ix": "9", "x": "10",
+}
+_TRADEMARKS = re.compile(r"[™®©]")
+_APOSTROPHES = re.compile(r"['’`]")
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+# Trigrams a candidate must share with the query to be scored at all.
+_MIN_SHARED_TRIGRAMS = 2
+
+
+def normalize(name: str) -> str:
+    text = unicodedata.normalize("NFKD", name)
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    text = _TRADEMARKS.sub("", text).lower().replace("&", " and ")
+    text = _APOSTROPHES.sub("", text)
+    tokens = _NON_ALNUM.sub(" ", text).split()
+    return " ".join(_ROMAN.get(token, token) for token in tokens)
+
+
+def numeric_tokens(normalized: str) -> frozenset[str]:
+    return frozenset(token for token in normalized.split() if any(c.isdigit() for c in token))
+
+
+def _trigrams(text: str) -> set[str]:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class NameIndex:
+    """Maps names (several per key, e.g. title and slug) to keys."""
+
+    def __init__(self, entries: Iterable[tuple[Hashable, Iterable[str]]], cutoff: float = 0.85):
+        self.cutoff = cutoff
+        self._exact: dict[str, Hashable] = {}
+        self._names: list[tuple[str, Hashable]] = []
+        self._numbers: list[frozenset[str]] = []
+        self._by_trigram: dict[str, list[int]] = defaultdict(list)
+        for key, names in entries:
+            for name in names:
+                if not name:
+                    continue
+                normalized = normalize(name)
+                if not normalized:
+                    continue
+                self._exact.setdefault(normalized, key)
+                self._exact.setdefault(normalized.replace(" ", ""), key)
+                position = len(self._names)
+                self._names.append((normalized, key))
+                self._numbers.append(numeric_tokens(normalized))
+                for gram in _trigrams(normalized):
+                    self._by_trigram[gram].append(position)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def lookup(self, query: str) -> tuple[Hashable, float] | None:
+        """(key, score) of the best match, score 1.0 for exact; None below cutoff."""
+        normalized = normalize(query)
+        if not normalized:
+            return None
+        for form in (normalized, normalized.replace(" ", "")):
+            if form in self._exact:
+                return self._exact[form], 1.0
+
+        shared: dict[int, int] = defaultdict(int)
+        for gram in _trigrams(normalized):
+            for position in self._by_trigram.get(gram, ()):
+                shared[position] += 1
+
+        best: tuple[Hashable, float] | None = None
+        numbers = numeric_tokens(normalized)
+        matcher = difflib.SequenceMatcher(b=normalized, autojunk=False)
+        for position, count in shared.items():
+            if count < _MIN_SHARED_TRIGRAMS or self._numbers[position] != numbers:
+                continue
+            name, key = self._names[position]
+            matcher.set_seq1(name)
+            if matcher.real_quick_ratio() < self.cutoff or matcher.quick_ratio() < self.cutoff:
+                continue
+            score = matcher.ratio()
+            if score >= self.cutoff and (best is None or score > best[1]):
+                best = (key, score)
+        return best
+
+    def lookup_many(self, queries: Iterable[str]) -> dict[str, Hashable | None]:
+        """query -> key (None when unresolved)."""
+        results: dict[str, Hashable | None] = {}
+        for query in queries:
+            if query not in results:
+                match = self.lookup(query)
+                results[query] = match[0] if match else None
+        return results
@@ -0,0 +1,178 @@
+"""
+Performance index job: fills the typed index columns on `cpus` / `gpus`
+from their free-form `benchmark_scores`.
+
+  cpus  single_thread_index  cinebench_r24_single, geekbench_6_single
+        multi_thread_index   cinebench_r24_multi, geekbench_6_multi
+  gpus  raster_index         timespy
+        rt_index             port_royal, speed_way
+        compute_index        geekbench_6_compute
+
+Scoring
+-------
+Scores are oriented so bigger is better (`BenchmarkType.higher_is_better`
+false → reciprocal) and divided by the benchmark's median across the part
+type, so every benchmark is a ratio to a typical part.  A benchmark a part
+is missing is imputed from the ones it has: for each other benchmark with
+at least _MIN_SHARED parts in common and a positive correlation (of the
+log ratios), the estimate is that benchmark's ratio times the median
+ratio between the two; estimates are averaged weighted by r².  An index
+is the geometric mean of its benchmarks' ratios × 100 (100 = median
+part), or NULL when none of them is known or imputable.
+
+Run after importing benchmarks:  python -m app.services.performance_index
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import statistics
+from collections.abc import Mapping
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+INDEX_BENCHMARKS: dict[str, dict[str, list[str]]] = {
+    "cpu": {
+        "single_thread_index": ["cinebench_r24_single", "geekbench_6_single"],
+        "multi_thread_index": ["cinebench_r24_multi", "geekbench_6_multi"],
+    },
+    "gpu": {
+        "raster_index": ["timespy"],
+        "rt_index": ["port_royal", "speed_way"],
+        "compute_index": ["geekbench_6_compute"],
+    },
+}
+
+# Parts two benchmarks must share before one is used to impute the other.
+_MIN_SHARED = 3
+
+
+def _log_ratios(
+    scores: Mapping[Any, Mapping[str, Any]], higher_is_better: Mapping[str, bool],
+) -> dict[Any, dict[str, float]]:
+    """part -> {slug: log(oriented score / median oriented score)}."""
+    oriented: dict[Any, dict[str, float]] = {}
+    for part, raw in scores.items():
+        values = {}
+        for slug, value in (raw or {}).items():
+            if isinstance(value, bool) or not isinstance(value, (int, float)) or value <= 0:
+                continue
+            values[slug] = float(value) if higher_is_better.get(slug, True) else 1.0 / value
+        oriented[part] = values
+
+    slugs = {slug for values in oriented.values() for slug in values}
+    medians = {
+        slug: statistics.median(v[slug] for v in oriented.values() if slug in v)
+        for slug in slugs
+    }
+    return {
+        part: {slug: math.log(value / medians[slug]) for slug, value in values.items()}
+        for part, values in oriented.items()
+    }
+
+
+def _links(logs: dict[Any, dict[str, float]]) -> dict[tuple[str, str], tuple[float, float]]:
+    """(target, predictor) -> (log offset, r) for positively correlated pairs."""
+    slugs = sorted({slug for values in logs.values() for slug in values})
+    links = {}
+    for target in slugs:
+        for predictor in slugs:
+            if target == predictor:
+                continue
+            shared = [v for v in logs.values() if target in v and predictor in v]
+            if len(shared) < _MIN_SHARED:
+                continue
+            xs = [v[predictor] for v in shared]
+            ys = [v[target] for v in shared]
+            try:
+                r = statistics.correlation(xs, ys)
+            except statistics.StatisticsError:  # constant column
+                continue
+            if r > 0:
+                links[(target, predictor)] = (statistics.median(y - x for x, y in zip(xs, ys, strict=True)), r)
+    return links
+
+
+def compute_indices(
+    scores: Mapping[Any, Mapping[str, Any]],
+    indices: Mapping[str, list[str]],
+    higher_is_better: Mapping[str, bool] | None = None,
+) -> dict[Any, dict[str, float | None]]:
+    """
+    scores: part id -> raw benchmark_scores.  indices: index column ->
+    benchmark slugs.  Returns part id -> {index column: value or None}.
+    """
+    logs = _log_ratios(scores, higher_is_better or {})
+    links = _links(logs)
+    targets = {slug for slugs in indices.values() for slug in slugs}
+
+    result: dict[Any, dict[str, float | None]] = {}
+    for part, known in logs.items():
+        values = dict(known)
+        for target in targets - known.keys():
+            estimates = [
+                (known[predictor] + links[(target, predictor)][0], links[(target, predictor)][1] ** 2)
+                for predictor in known
+                if (target, predictor) in links
+            ]
+            if estimates:
+                total = sum(weight for _, weight in estimates)
+                values[target] = sum(value * weight for value, weight in estimates) / total
+
+        result[part] = {}
+        for column, slugs in indices.items():
+            present = [values[slug] for slug in slugs if slug in values]
+            result[part][column] = (
+                round(100 * math.exp(sum(present) / len(present)), 1) if present else None
+            )
+    return result
+
+
+def score_parts(db: Session) -> dict[str, int]:
+    """Recompute every CPU / GPU index.  Returns {part_type: rows scored}."""
+    from sqlalchemy import bindparam, select, update
+
+    from app.db.part_compatibility import refresh_part_compatibility
+    from app.models.benchmarks import BenchmarkType
+    from app.models.pcparts import CPU, GPU
+
+    higher_is_better = dict(db.execute(select(BenchmarkType.slug, BenchmarkType.higher_is_better)).all())
+
+    counts: dict[str, int] = {}
+    for model, part_type in ((CPU, "cpu"), (GPU, "gpu")):
+        table = model.__table__
+        scores = dict(db.execute(select(table.c.id, table.c.benchmark_scores)).all())
+        if not scores:
+            counts[part_type] = 0
+            continue
+        indices = INDEX_BENCHMARKS[part_type]
+        result = compute_indices(scores, indices, higher_is_better)
+        db.execute(
+            update(table)
+            .where(table.c.id == bindparam("part_id"))
+            .values({column: bindparam(column) for column in indices}),
+            [{"part_id": part_id, **values} for part_id, values in result.items()],
+        )
+        counts[part_type] = len(result)
+    db.commit()
+
+    refresh_part_compatibility()
+    return counts
+
+
+def main() -> None:
+    from app.core.db import SessionLocal
+
+    logging.basicConfig(level=logging.INFO)
+    with SessionLocal() as db:
+        counts = score_parts(db)
+    logger.info("Scored %s", ", ".join(f"{n} {t}s" for t, n in counts.items()))
+
+
+if __name__ == "__main__":
+    main()
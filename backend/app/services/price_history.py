@@ -0,0 +1,67 @@
+"""
+Maintenance job for listing price history.
+
+History rows and their hour / day rollups are written by database
+triggers whenever `listings.price_amount` changes (see migration
+a7b3c9d1e5f8); queries live in app.crud.price_history.  This job keeps
+the monthly partitions of `listing_price_history` created ahead of time
+(rows with no partition go to the default one and are moved out when
+their month is partitioned) and prunes hourly rollups past their
+retention; daily rollups are kept.  Pruning runs in its own transaction,
+so it still happens if partitioning fails.
+
+  PRICE_HISTORY_MONTHS_AHEAD          partitions created ahead (default 3)
+  PRICE_HOURLY_ROLLUP_RETENTION_DAYS  hourly rollups kept (default 90)
+
+Run daily:  python -m app.services.price_history
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+_MONTHS_AHEAD = int(os.getenv("PRICE_HISTORY_MONTHS_AHEAD", "3"))
+_HOURLY_RETENTION_DAYS = int(os.getenv("PRICE_HOURLY_ROLLUP_RETENTION_DAYS", "90"))
+
+
+def ensure_partitions(db, months_ahead: int = _MONTHS_AHEAD) -> int:
+    """Create missing monthly partitions through `months_ahead`; returns how many."""
+    return db.scalar(
+        text("SELECT listing_price_history_ensure_partitions(:months)"), {"months": months_ahead},
+    )
+
+
+def prune_hourly_rollups(db, retention_days: int = _HOURLY_RETENTION_DAYS) -> int:
+    return db.execute(
+        text("""
+            DELETE FROM listing_price_rollups
+            WHERE granularity = 'hour' AND bucket_start < now() - make_interval(days => :days)
+        """),
+        {"days": retention_days},
+    ).rowcount
+
+
+def main() -> None:
+    from app.core.db import SessionLocal
+
+    logging.basicConfig(level=logging.INFO)
+    created = 0
+    with SessionLocal() as db:
+        try:
+            created = ensure_partitions(db)
+            db.commit()
+        except Exception:
+            db.rollback()
+            logger.exception("Could not create price history partitions")
+        pruned = prune_hourly_rollups(db)
+        db.commit()
+    logger.info("Created %d price history partitions, pruned %d hourly rollups", created, pruned)
+
+
+if __name__ == "__main__":
+    main()
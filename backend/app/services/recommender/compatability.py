@@ -1 +1,300 @@
-# TODO: This is where I check compatability
\ No newline at end of file
+"""
+Compatibility queries for the recommender's pick steps.
+
+Every query reads the flattened `part_compatibility` materialized view, so
+each filter is a single-table scan on its (part_type, ...) indexes rather
+than a join across the part hierarchy.  Prior picks arrive as the
+`PartOption`s the pipeline resolved them to and are looked up by id; a
+prior pick that did not resolve to a catalog part is None, and its
+constraints are simply not applied.
+
+Each query returns `PartOption`s with the spec columns worth showing the
+model for that part type; ranking and trimming happen in `ranking`.
+
+Software named in the configurator answers sets a hardware floor (see
+`software_requirements`), resolved once per request by `software_floor`:
+CPUs, RAM, storage and GPUs below it are pruned, unless that would leave
+no options at all.
+"""
+
+from __future__ import annotations
+
+import logging
+import uuid
+from typing import TYPE_CHECKING
+
+from sqlalchemy import or_, select
+from sqlalchemy.orm import Session
+
+from app.models.part_compatibility import PartCompatibility
+from app.services.recommender.schemas import PartOption
+from app.services.software_requirements import SoftwareRequirements, resolve_answers
+
+if TYPE_CHECKING:
+    from app.services.recommender.pipeline import BuildRequest
+
+logger = logging.getLogger(__name__)
+
+# Spec columns shown to the model, per part_type.
+_SPEC_COLUMNS: dict[str, list[str]] = {
+    "cpu": [
+        "socket", "tdp_watts", "has_igpu", "cpu_ddr_generations", "cores", "threads", "l3_cache_mb",
+        "max_memory_gb", "single_thread_index", "multi_thread_index",
+    ],
+    "cpucooler": ["cooler_type", "max_tdp_watts", "height_mm", "radiator_size_mm", "noise_dba", "has_rgb"],
+    "motherboard": [
+        "socket", "form_factor", "ddr_generation", "memory_slots", "max_memory_gb", "m2_slots", "m2_pcie_gen",
+        "sata_ports", "has_wifi",
+    ],
+    "ram": ["ddr_generation", "capacity_gb", "speed_mhz", "cas_latency", "has_rgb"],
+    "storage": ["interface", "form_factor", "capacity_gb", "read_speed_mbps", "write_speed_mbps", "endurance_tbw"],
+    "gpu": [
+        "vram_gb", "tdp_watts", "gpu_length_mm", "recommended_psu_watts", "raster_index", "rt_index", "compute_index",
+    ],
+    "psu": ["wattage", "efficiency_rating", "form_factor"],
+    "case": ["supported_mobo_form_factors", "max_gpu_length_mm", "max_cooler_height_mm", "included_fan_count", "color"],
+    "fan": ["fan_size_mm", "airflow_cfm", "noise_dba", "has_rgb"],
+}
+
+# Tallest air cooler / largest radiator that fits a typical ITX build.
+_ITX_MAX_COOLER_HEIGHT_MM = 70
+_ITX_MAX_RADIATOR_MM = 240
+
+# Rough system draw on top of CPU + GPU TDP, and PSU headroom.
+_BASE_SYSTEM_WATTS = 75
+_PSU_HEADROOM = 1.25
+
+
+def _to_option(row: PartCompatibility) -> PartOption:
+    specs = {
+        column: getattr(row, column)
+        for column in _SPEC_COLUMNS.get(row.part_type, [])
+        if getattr(row, column) is not None
+    }
+    benchmarks = {
+        slug: float(score) for slug, score in (row.benchmark_scores or {}).items()
+        if isinstance(score, (int, float)) and not isinstance(score, bool)
+    }
+    return PartOption(
+        id=str(row.id),
+        name=row.name,
+        manufacturer=row.manufacturer,
+        price_cents=row.price_cents,
+        specs=specs,
+        benchmarks=benchmarks,
+    )
+
+
+def _options(db: Session, part_type: str, *conditions, preferred: list | None = None) -> list[PartOption]:
+    """Matching parts, cheapest first.  `preferred` conditions are dropped if nothing meets them."""
+    def query(extra: list) -> list[PartCompatibility]:
+        return db.scalars(
+            select(PartCompatibility)
+            .where(PartCompatibility.part_type == part_type, *conditions, *extra)
+            .order_by(PartCompatibility.price_cents.asc().nulls_last())
+        ).all()
+
+    rows = query(preferred) if preferred else []
+    if not rows:
+        rows = query([])
+    return [_to_option(row) for row in rows]
+
+
+def _at_least(column, floor: float | None) -> list:
+    """`column >= floor` (parts with an unknown value pass), or nothing without a floor."""
+    if floor is None:
+        return []
+    return [or_(column.is_(None), column >= floor)]
+
+
+def software_floor(db: Session, request: BuildRequest) -> SoftwareRequirements:
+    """
+    Hardware floor of the software named in the answers, or no floor if it
+    cannot be resolved.  Runs in a savepoint so a failure leaves `db` usable.
+    """
+    try:
+        with db.begin_nested():
+            return resolve_answers(request.answers, db)
+    except Exception:
+        logger.exception("Failed to resolve software requirements")
+        return SoftwareRequirements()
+
+
+def resolve_pick(db: Session, part_type: str, pick: PartOption | None) -> PartCompatibility | None:
+    """Catalog row of a prior pick, by its part id."""
+    if pick is None:
+        return None
+    row = db.scalars(
+        select(PartCompatibility)
+        .where(PartCompatibility.part_type == part_type, PartCompatibility.id == uuid.UUID(pick.id))
+    ).first()
+    if row is None:
+        logger.info("%s %s (%r) is no longer in the catalog; skipping its constraints", part_type, pick.id, pick.name)
+    return row
+
+
+def _wants(preference: str) -> bool:
+    return preference != "no_preference"
+
+
+def compatible_cpus(db: Session, request: BuildRequest, floor: SoftwareRequirements) -> list[PartOption]:
+    conditions = []
+    brand = request.preferences.preferred_brand_cpu
+    if _wants(brand):
+        conditions.append(PartCompatibility.brand == brand)
+    preferred = (
+        _at_least(PartCompatibility.single_thread_index, floor.min_single_thread_index)
+        + _at_least(PartCompatibility.multi_thread_index, floor.min_multi_thread_index)
+    )
+    return _options(db, "cpu", *conditions, preferred=preferred)
+
+
+def compatible_cpu_coolers(
+    db: Session, cpu: PartOption | None, form_factor: str, request: BuildRequest,
+) -> list[PartOption]:
+    conditions = []
+    cpu_row = resolve_pick(db, "cpu", cpu)
+    if cpu_row is not None:
+        if cpu_row.socket:
+            conditions.append(PartCompatibility.supported_sockets.contains([cpu_row.socket]))
+        if cpu_row.tdp_watts:
+            conditions.append(or_(
+                PartCompatibility.max_tdp_watts.is_(None),
+                PartCompatibility.max_tdp_watts >= cpu_row.tdp_watts,
+            ))
+    if form_factor == "itx":
+        conditions.append(or_(
+            PartCompatibility.height_mm <= _ITX_MAX_COOLER_HEIGHT_MM,
+            PartCompatibility.radiator_size_mm <= _ITX_MAX_RADIATOR_MM,
+        ))
+    preferred = [PartCompatibility.has_rgb.is_(True)] if request.preferences.rgb_lighting else None
+    return _options(db, "cpucooler", *conditions, preferred=preferred)
+
+
+def compatible_motherboards(
+    db: Session, cpu: PartOption | None, form_factor: str, request: BuildRequest,
+) -> list[PartOption]:
+    conditions = []
+    cpu_row = resolve_pick(db, "cpu", cpu)
+    if cpu_row is not None:
+        if cpu_row.socket:
+            conditions.append(PartCompatibility.socket == cpu_row.socket)
+        if cpu_row.cpu_ddr_generations:
+            conditions.append(PartCompatibility.ddr_generation.in_(cpu_row.cpu_ddr_generations))
+    if _wants(form_factor):
+        conditions.append(PartCompatibility.form_factor == form_factor)
+    if request.preferences.wifi_required:
+        conditions.append(PartCompatibility.has_wifi.is_(True))
+    return _options(db, "motherboard", *conditions)
+
+
+def compatible_ram(
+    db: Session, motherboard: PartOption | None, floor: SoftwareRequirements,
+) -> list[PartOption]:
+    conditions = []
+    board = resolve_pick(db, "motherboard", motherboard)
+    if board is not None and board.ddr_generation:
+        conditions.append(PartCompatibility.ddr_generation == board.ddr_generation)
+    preferred = _at_least(PartCompatibility.capacity_gb, floor.recommended_ram_gb or floor.min_ram_gb)
+    return _options(db, "ram", *conditions, preferred=preferred)
+
+
+def compatible_storage(
+    db: Session, motherboard: PartOption | None, floor: SoftwareRequirements,
+) -> list[PartOption]:
+    conditions = []
+    board = resolve_pick(db, "motherboard", motherboard)
+    if board is not None and board.m2_slots == 0:
+        conditions.append(PartCompatibility.interface == "sata3")
+    preferred = _at_least(PartCompatibility.capacity_gb, floor.min_storage_gb)
+    return _options(db, "storage", *conditions, preferred=preferred)
+
+
+def compatible_gpus(db: Session, request: BuildRequest, floor: SoftwareRequirements) -> list[PartOption]:
+    conditions = []
+    brand = request.preferences.preferred_brand_gpu
+    if _wants(brand):
+        conditions.append(PartCompatibility.brand == brand)
+    preferred = (
+        _at_least(PartCompatibility.vram_gb, floor.min_vram_gb)
+        + _at_least(PartCompatibility.raster_index, floor.min_raster_index)
+    )
+    return _options(db, "gpu", *conditions, preferred=preferred)
+
+
+def compatible_psus(
+    db: Session, cpu: PartOption | None, gpu: PartOption | None, request: BuildRequest,
+) -> list[PartOption]:
+    cpu_row = resolve_pick(db, "cpu", cpu)
+    gpu_row = resolve_pick(db, "gpu", gpu)
+    draw = _BASE_SYSTEM_WATTS
+    draw += (cpu_row.tdp_watts or 0) if cpu_row is not None else 0
+    draw += (gpu_row.tdp_watts or 0) if gpu_row is not None else 0
+    required = int(draw * _PSU_HEADROOM)
+    if gpu_row is not None and gpu_row.recommended_psu_watts:
+        required = max(required, gpu_row.recommended_psu_watts)
+
+    conditions = [PartCompatibility.wattage >= required]
+    if request.preferences.form_factor == "itx":
+        conditions.append(PartCompatibility.form_factor.in_(["sfx", "sfx_l"]))
+    return _options(db, "psu", *conditions)
+
+
+def compatible_cases(
+    db: Session, motherboard: PartOption | None, cpu_cooler: PartOption | None,
+    gpu: PartOption | None, request: BuildRequest,
+) -> list[PartOption]:
+    conditions = []
+    board = resolve_pick(db, "motherboard", motherboard)
+    if board is not None and board.form_factor:
+        conditions.append(PartCompatibility.supported_mobo_form_factors.contains([board.form_factor]))
+
+    gpu_row = resolve_pick(db, "gpu", gpu)
+    if gpu_row is not None and gpu_row.gpu_length_mm:
+        conditions.append(or_(
+            PartCompatibility.max_gpu_length_mm.is_(None),
+            PartCompatibility.max_gpu_length_mm >= gpu_row.gpu_length_mm,
+        ))
+
+    cooler = resolve_pick(db, "cpucooler", cpu_cooler)
+    if cooler is not None and cooler.radiator_size_mm:
+        conditions.append(or_(
+            PartCompatibility.max_radiator_front_mm >= cooler.radiator_size_mm,
+            PartCompatibility.max_radiator_top_mm >= cooler.radiator_size_mm,
+        ))
+    elif cooler is not None and cooler.height_mm:
+        conditions.append(or_(
+            PartCompatibility.max_cooler_height_mm.is_(None),
+            PartCompatibility.max_cooler_height_mm >= cooler.height_mm,
+        ))
+
+    if request.preferences.color_theme:
+        color = request.preferences.color_theme.split()[0].lower()
+        conditions.append(or_(
+            PartCompatibility.color.is_(None),
+            PartCompatibility.color.ilike(f"%{color}%"),
+        ))
+    return _options(db, "case", *conditions)
+
+
+def case_fan_sizes(case_row: PartCompatibility) -> list[int]:
+    """
+    Fan sizes (mm) the case mounts, going by its radiator mounts: every
+    mount takes 120 mm fans, and one sized in multiples of 140 mm (a 280 mm
+    front, say) also takes 140 mm fans.  Empty when the mounts are unknown.
+    """
+    mounts = [m for m in (case_row.max_radiator_front_mm, case_row.max_radiator_top_mm) if m]
+    if not mounts:
+        return []
+    return [120, 140] if any(m % 140 == 0 for m in mounts) else [120]
+
+
+def compatible_fans(db: Session, case: PartOption | None, request: BuildRequest) -> list[PartOption]:
+    conditions = []
+    case_row = resolve_pick(db, "case", case)
+    sizes = case_fan_sizes(case_row) if case_row is not None else []
+    if sizes:
+        conditions.append(or_(PartCompatibility.fan_size_mm.is_(None), PartCompatibility.fan_size_mm.in_(sizes)))
+    if request.preferences.rgb_lighting:
+        conditions.append(PartCompatibility.has_rgb.is_(True))
+    return _options(db, "fan", *conditions)
@@ -4,9 +4,10 @@ PC Build Recommender Pipeline  (Sequential Architecture)
 LangGraph-based pipeline that recommends PC parts one at a time in
 dependency order.  Each step:
 
-  1. Queries a compatibility database to get valid options (TODO/stub).
+  1. Queries the part_compatibility view for valid options.
   2. Calls the LLM with the filtered options + prior selections.
-  3. Stores the chosen part in pipeline state.
+  3. Stores the chosen part in pipeline state, resolved to its catalog row
+     through the option table's row ids.
 
 Dependency chain
 ----------------
@@ -26,22 +27,45 @@ only when every part has been priced.
 
 Progress
 --------
-A caller-supplied `progress_callback(step_name, message)` is invoked at
-the start of each node so the frontend can display live status updates
-like "Choosing your CPU…".
+Each node emits a progress event ("Choosing your CPU…") at its start.
+`astream_build_phase1/phase2` stream those events, each pick as its node
+finishes, and the final build; the sync `recommend_build_phase1/phase2`
+forward progress to a caller-supplied `progress_callback(step, message)`.
+
+Sessions
+--------
+The graph is compiled with a checkpointer so a session can pause at the
+case selection and be resumed by its `thread_id`.  Checkpoints live in
+memory unless RECOMMENDER_CHECKPOINT_DB_URI (a psycopg conninfo/URL) is
+set, in which case the streaming API keeps them in Postgres.  In memory,
+a session is dropped once it has not been written for
+RECOMMENDER_SESSION_TTL_SECONDS (default 3600), and the least recently
+written ones go first beyond RECOMMENDER_MAX_SESSIONS (default 1000).
 """
 
 from __future__ import annotations
 
+import asyncio
+import functools
+import logging
 import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import AsyncIterator
 from typing import Any, Callable, Literal
 
-from dotenv import load_dotenv
-from langchain_core.messages import HumanMessage, SystemMessage
-from langgraph.graph import END, StateGraph
 from pydantic import BaseModel, Field
 
-load_dotenv()
+from app.services import fps_estimator
+from app.services.llm import gateway
+from app.services.recommender import compatability
+from app.services.recommender.ranking import compact_options
+from app.services.recommender.schemas import PartOption
+from app.services.software_requirements import SoftwareRequirements
+
+logger = logging.getLogger(__name__)
 
 
 # Structured Input
@@ -81,6 +105,9 @@ class LLMPartPick(BaseModel):
     """Schema the LLM fills for a single component. No price fields exist."""
     name: str = Field(..., description="Full official product name, e.g. 'AMD Ryzen 7 7800X3D'")
     reason: str = Field(..., description="1-2 sentence justification for this choice")
+    option_id: str | None = Field(
+        None, description="Row id of the chosen part when options were given as a table, e.g. 'o3'",
+    )
 
 
 class LLMMultiPartPick(BaseModel):
@@ -168,9 +195,20 @@ class PipelineState(BaseModel):
 
     fans: LLMPartPick | None = None        # None means case fans are sufficient
 
+    # Option table row ids ("o1", ...) shown at each step, per component key,
+    # mapped to their catalog parts; picks are resolved through them
+    option_ids: dict[str, dict[str, PartOption]] = Field(default_factory=dict)
+
+    # Hardware floor of the software in `request.answers`; resolved by the
+    # first step that needs it and reused by the others
+    software_floor: SoftwareRequirements | None = None
+
     build_notes: str = ""
     gpu_required: bool = True              # determined during the GPU step
 
+    # Incremental re-planning: when set, only these nodes run (see replan)
+    dirty: list[str] | None = None
+
     # Error tracking
     error: str | None = None
 
@@ -190,17 +228,38 @@ def _get_provider() -> LLMProvider:
     )
 
 
+_MODEL = "claude-sonnet-4-20250514"
+
+
 def _get_chat_model():
-    """Return a raw LangChain chat model (no structured output binding)."""
+    """Return the shared LangChain chat model (no structured output binding)."""
     provider = _get_provider()
-    from langchain_anthropic import ChatAnthropic
-    return ChatAnthropic(model="claude-sonnet-4-20250514", temperature=0.3, max_tokens=4096)
+    return gateway.get_chat_model(_MODEL, temperature=0.3, max_tokens=4096)
 
 
-def _call_llm_structured(system: str, user: str, schema: type[BaseModel]) -> BaseModel:
-    """Call the LLM and parse the response into `schema`."""
-    llm = _get_chat_model().with_structured_output(schema)
-    return llm.invoke([SystemMessage(content=system), HumanMessage(content=user)])
+def _call_llm_structured(
+    system: str, user: str, schema: type[BaseModel], step: str = "recommender",
+) -> BaseModel:
+    """
+    Call the LLM through the gateway and parse the response into `schema`.
+
+    The static per-component system prompt is sent as a prompt-cache
+    breakpoint, and the call's token usage (incl. cache reads/writes) is
+    recorded under `step`.
+    """
+    from langchain_core.messages import HumanMessage, SystemMessage
+
+    llm = _get_chat_model().with_structured_output(schema, include_raw=True)
+    messages = [
+        SystemMessage(content=[gateway.cached_text(system)]),
+        HumanMessage(content=user),
+    ]
+    result = gateway.invoke_sync(_MODEL, lambda: llm.invoke(messages))
+
+    gateway.record_usage(_MODEL, step, getattr(result["raw"], "usage_metadata", None))
+    if result.get("parsing_error") is not None:
+        raise result["parsing_error"]
+    return result["parsed"]
 
 
 # Helpers
@@ -209,6 +268,15 @@ def _emit_progress(state: PipelineState, step: str, message: str) -> None:
     if state.progress_callback:
         state.progress_callback(step, message)
 
+    from langgraph.config import get_stream_writer
+
+    try:
+        writer = get_stream_writer()
+    except RuntimeError:
+        # Called outside a graph run (e.g. a node invoked directly).
+        return
+    writer({"type": "progress", "step": step, "message": message})
+
 
 def _format_request_context(req: BuildRequest) -> str:
     """Render the user's use-cases, preferences, and answers into a text block."""
@@ -238,92 +306,176 @@ def _format_request_context(req: BuildRequest) -> str:
     return "\n\n".join(sections)
 
 
-def _format_prior_selections(state: PipelineState) -> str:
-    """Render parts chosen so far into a text block for LLM context."""
+# Prior picks each step's prompt shows and its compatibility query reads,
+# by step key.  The re-plan dependencies (_NODE_UPSTREAM) are derived from
+# this, so a step is re-run whenever a pick it saw changes.
+_STEP_READS: dict[str, list[str]] = {
+    "cpu": [],
+    "cpu_cooler": ["cpu"],
+    "motherboard": ["cpu"],
+    "ram": ["cpu", "motherboard"],
+    "storage": ["motherboard"],
+    "gpu": ["cpu"],
+    "psu": ["cpu", "gpu"],
+    "case": ["motherboard", "cpu_cooler", "gpu", "psu"],
+    "fans": ["cpu", "gpu", "case_selection"],
+}
+
+_PICK_LABELS = {
+    "cpu": "CPU",
+    "cpu_cooler": "CPU Cooler",
+    "motherboard": "Motherboard",
+    "ram": "RAM",
+    "storage": "Storage",
+    "gpu": "GPU",
+    "psu": "PSU",
+    "case_selection": "Case",
+}
+
+
+def _format_prior_selections(state: PipelineState, fields: list[str]) -> str:
+    """Render the chosen parts among `fields` into a text block for LLM context."""
     lines: list[str] = []
-    for label, pick in [
-        ("CPU", state.cpu),
-        ("CPU Cooler", state.cpu_cooler),
-        ("Motherboard", state.motherboard),
-        ("RAM", state.ram),
-        ("Storage", state.storage),
-        ("GPU", state.gpu),
-        ("PSU", state.psu),
-        ("Case", state.case_selection),
-    ]:
+    for field in fields:
+        pick = getattr(state, field)
         if pick is not None:
-            lines.append(f"  {label}: {pick.name}")
+            lines.append(f"  {_PICK_LABELS[field]}: {pick.name}")
     if not lines:
         return ""
     return "PARTS ALREADY SELECTED:\n" + "\n".join(lines)
 
 
 # ╔═══════════════════════════════════════════════════════════════════════════╗
-# ║  COMPATIBILITY DB STUBS                                                  ║
+# ║  COMPATIBILITY QUERIES                                                   ║
 # ║                                                                          ║
-# ║  Each function below will eventually query your parts database and       ║
-# ║  return a filtered list of compatible products.  For now they return     ║
-# ║  None (meaning "no filter — let the LLM pick freely").                   ║
+# ║  Each function below returns the catalog parts compatible with the       ║
+# ║  request and prior picks (see compatability.py).  None means "no         ║
+# ║  filter — let the LLM pick freely": nothing matched, or the catalog is   ║
+# ║  unavailable.                                                            ║
 # ╚═══════════════════════════════════════════════════════════════════════════╝
 
-def _db_get_compatible_cpus(request: BuildRequest) -> list[str] | None:
-    """TODO: Query DB for CPUs matching use-case requirements + brand preference."""
-    return None
+def _picked_option(state: PipelineState, key: str, pick: LLMPartPick | None) -> PartOption | None:
+    """Catalog part of a resolved pick (see `_resolve_pick`), or None."""
+    if pick is None or pick.option_id is None:
+        return None
+    return state.option_ids.get(key, {}).get(pick.option_id)
+
+
+def _query_compatible(query: Callable[..., list[PartOption]], *args: Any) -> list[PartOption] | None:
+    from app.core.db import SessionLocal
+
+    try:
+        with SessionLocal() as db:
+            options = query(db, *args)
+    except Exception:
+        logger.exception("Compatibility query %s failed", query.__name__)
+        return None
+    return options or None
+
+
+def _db_get_software_floor(request: BuildRequest) -> SoftwareRequirements:
+    """Hardware floor of the software in the answers (no floor on failure)."""
+    from app.core.db import SessionLocal
+
+    try:
+        with SessionLocal() as db:
+            return compatability.software_floor(db, request)
+    except Exception:
+        logger.exception("Software floor query failed")
+        return SoftwareRequirements()
+
+
+def _software_floor(state: PipelineState) -> SoftwareRequirements:
+    if state.software_floor is not None:
+        return state.software_floor
+    return _db_get_software_floor(state.request)
+
+
+def _db_get_compatible_cpus(
+    request: BuildRequest, floor: SoftwareRequirements,
+) -> list[PartOption] | None:
+    """CPUs matching the brand preference and the software floor."""
+    return _query_compatible(compatability.compatible_cpus, request, floor)
 
 
 def _db_get_compatible_cpu_coolers(
-    cpu: LLMPartPick, form_factor: str, request: BuildRequest,
-) -> list[str] | None:
-    """TODO: Filter by CPU socket, TDP (air vs AIO), form factor clearance."""
-    return None
+    cpu: PartOption | None, form_factor: str, request: BuildRequest,
+) -> list[PartOption] | None:
+    """Coolers for the CPU's socket and TDP, with ITX clearance (RGB ones first when requested)."""
+    return _query_compatible(compatability.compatible_cpu_coolers, cpu, form_factor, request)
 
 
 def _db_get_compatible_motherboards(
-    cpu: LLMPartPick, form_factor: str, request: BuildRequest,
-) -> list[str] | None:
-    """TODO: Filter by CPU socket, form factor, WiFi, feature set."""
-    return None
+    cpu: PartOption | None, form_factor: str, request: BuildRequest,
+) -> list[PartOption] | None:
+    """Boards for the CPU's socket and memory, form factor and WiFi."""
+    return _query_compatible(compatability.compatible_motherboards, cpu, form_factor, request)
 
 
 def _db_get_compatible_ram(
-    motherboard: LLMPartPick, request: BuildRequest,
-) -> list[str] | None:
-    """TODO: Filter by DDR type supported by the motherboard, capacity needs."""
-    return None
+    motherboard: PartOption | None, floor: SoftwareRequirements,
+) -> list[PartOption] | None:
+    """RAM of the motherboard's DDR generation."""
+    return _query_compatible(compatability.compatible_ram, motherboard, floor)
 
 
 def _db_get_compatible_storage(
-    motherboard: LLMPartPick, request: BuildRequest,
-) -> list[str] | None:
-    """TODO: Filter by M.2 slots, interface (NVMe/SATA), capacity needs."""
-    return None
+    motherboard: PartOption | None, floor: SoftwareRequirements,
+) -> list[PartOption] | None:
+    """Drives the motherboard can take (SATA only without M.2 slots)."""
+    return _query_compatible(compatability.compatible_storage, motherboard, floor)
+
 
+def _db_get_compatible_gpus(
+    request: BuildRequest, floor: SoftwareRequirements,
+) -> list[PartOption] | None:
+    """GPUs matching the brand preference and the software floor."""
+    return _query_compatible(compatability.compatible_gpus, request, floor)
 
-def _db_get_compatible_gpus(request: BuildRequest) -> list[str] | None:
-    """TODO: Filter by use-case VRAM needs, physical size constraints."""
-    return None
+
+def _with_fps_estimates(
+    options: list[PartOption] | None, cpu: PartOption | None, request: BuildRequest,
+) -> list[PartOption] | None:
+    """
+    For gaming builds, add each GPU's estimated fps with the chosen CPU (at
+    the answered resolution, worst case over the answered game types) as
+    the `est_fps` spec, which the ranking weighs.
+    """
+    if not options or cpu is None or "gaming" not in request.use_cases:
+        return options
+    target = fps_estimator.gaming_target(request.answers)
+    try:
+        estimates = fps_estimator.get_fps_estimator().gpu_fps_with_cpu(cpu.id, target.genres, target.resolution)
+    except Exception:
+        logger.exception("FPS estimation failed")
+        return options
+    return [
+        option.model_copy(update={"specs": {**option.specs, "est_fps": round(estimates[option.id])}})
+        if option.id in estimates else option
+        for option in options
+    ]
 
 
 def _db_get_compatible_psus(
-    cpu: LLMPartPick, gpu: LLMPartPick | None, request: BuildRequest,
-) -> list[str] | None:
-    """TODO: Calculate total TDP + headroom, filter by wattage & efficiency."""
-    return None
+    cpu: PartOption | None, gpu: PartOption | None, request: BuildRequest,
+) -> list[PartOption] | None:
+    """PSUs covering CPU + GPU TDP with headroom (SFX for ITX)."""
+    return _query_compatible(compatability.compatible_psus, cpu, gpu, request)
 
 
 def _db_get_compatible_cases(
-    motherboard: LLMPartPick, cpu_cooler: LLMPartPick,
-    gpu: LLMPartPick | None, request: BuildRequest,
-) -> list[str] | None:
-    """TODO: Filter by form factor, GPU clearance, cooler height/radiator support."""
-    return None
+    motherboard: PartOption | None, cpu_cooler: PartOption | None,
+    gpu: PartOption | None, request: BuildRequest,
+) -> list[PartOption] | None:
+    """Cases fitting the board, GPU length and cooler height / radiator."""
+    return _query_compatible(compatability.compatible_cases, motherboard, cpu_cooler, gpu, request)
 
 
 def _db_get_compatible_fans(
-    case: LLMPartPick, request: BuildRequest,
-) -> list[str] | None:
-    """TODO: Check case's included fans vs thermal needs, return options if needed."""
-    return None
+    case: PartOption | None, request: BuildRequest,
+) -> list[PartOption] | None:
+    """Case fans in sizes the case mounts, RGB-only when RGB lighting is requested."""
+    return _query_compatible(compatability.compatible_fans, case, request)
 
 
 # ╔═══════════════════════════════════════════════════════════════════════════╗
@@ -387,7 +539,10 @@ graphics for the workload), respond with a pick where name is "NONE" and
 reason explains why integrated graphics suffice.
 
 Otherwise pick the best GPU for the user's workloads and brand preference.
-Consider VRAM requirements for AI/ML and creative workloads.
+Consider VRAM requirements for AI/ML and creative workloads.  For gaming,
+est_fps is the estimated frame rate with the selected CPU at the user's
+resolution in their most demanding game type; prefer options that reach
+their frame-rate target.
 """,
 
     "psu": _BASE_RULES + """
@@ -428,25 +583,61 @@ Otherwise recommend a fan kit (e.g. a 3-pack of 120mm or 140mm fans).
 def _build_user_prompt(
     state: PipelineState,
     component: str,
-    compatible_options: list[str] | None = None,
-) -> str:
-    """Assemble the user-turn prompt for a single-component LLM call."""
+    compatible_options: list[str] | list[PartOption] | None = None,
+    key: str | None = None,
+) -> tuple[str, dict[str, PartOption]]:
+    """
+    Assemble the user-turn prompt for a single-component LLM call.
+
+    Plain-string options are listed as-is.  `PartOption`s are pre-ranked for
+    the build's use cases (scored with the `key` component's weights) and
+    rendered as a compact table, so the prompt stays small however many
+    parts the compatibility query returned.
+
+    Returns (prompt, {table row id: option}); the map is empty unless a
+    table was rendered.
+    """
     parts: list[str] = []
+    ids: dict[str, PartOption] = {}
 
     parts.append(_format_request_context(state.request))
 
-    prior = _format_prior_selections(state)
+    prior = _format_prior_selections(state, _STEP_READS.get(key or component, []))
     if prior:
         parts.append(prior)
 
-    if compatible_options:
+    if compatible_options and isinstance(compatible_options[0], PartOption):
+        table, ids = compact_options(compatible_options, key or component, state.request.use_cases)
+        parts.append(
+            f"COMPATIBLE {component.upper()} OPTIONS — the {len(ids)} best of "
+            f"{len(compatible_options)} for this build (you MUST pick from this table "
+            f"and set option_id to the row's id):\n{table}"
+        )
+    elif compatible_options:
         parts.append(
             f"COMPATIBLE {component.upper()} OPTIONS (you MUST pick from this list):\n"
             + "\n".join(f"  - {opt}" for opt in compatible_options)
         )
 
     parts.append(f"Now select the {component}.")
-    return "\n\n".join(parts)
+    return "\n\n".join(parts), ids
+
+
+def _resolve_pick(pick: LLMPartPick, ids: dict[str, PartOption]) -> LLMPartPick:
+    """
+    Tie a pick to the table row it chose: by `option_id`, or failing that by
+    exact (case-insensitive) name.  A resolved pick carries the row id and
+    the catalog name; otherwise its `option_id` is cleared.
+    """
+    option_id = (pick.option_id or "").strip().lower()
+    if option_id not in ids:
+        name = pick.name.strip().lower()
+        option_id = next((i for i, option in ids.items() if option.name.lower() == name), "")
+    if not option_id:
+        if ids:
+            logger.info("Pick %r (option_id=%r) is not in the options table", pick.name, pick.option_id)
+        return pick.model_copy(update={"option_id": None})
+    return pick.model_copy(update={"option_id": option_id, "name": ids[option_id].name})
 
 
 # ---- Step 1: CPU ----
@@ -454,10 +645,15 @@ def _build_user_prompt(
 def pick_cpu(state: PipelineState) -> dict:
     _emit_progress(state, "cpu", "Choosing your CPU…")
     try:
-        options = _db_get_compatible_cpus(state.request)
-        prompt = _build_user_prompt(state, "CPU", options)
-        pick = _call_llm_structured(_SYSTEM_PROMPTS["cpu"], prompt, LLMPartPick)
-        return {"cpu": pick}
+        floor = _software_floor(state)
+        options = _db_get_compatible_cpus(state.request, floor)
+        prompt, ids = _build_user_prompt(state, "CPU", options, key="cpu")
+        pick = _call_llm_structured(_SYSTEM_PROMPTS["cpu"], prompt, LLMPartPick, step="cpu")
+        return {
+            "cpu": _resolve_pick(pick, ids),
+            "option_ids": {**state.option_ids, "cpu": ids},
+            "software_floor": floor,
+        }
     except Exception as exc:
         return {"error": f"CPU selection failed: {exc}"}
 
@@ -468,10 +664,12 @@ def pick_cpu_cooler(state: PipelineState) -> dict:
     _emit_progress(state, "cpu_cooler", "Selecting a CPU cooler…")
     try:
         form_factor = state.request.preferences.form_factor
-        options = _db_get_compatible_cpu_coolers(state.cpu, form_factor, state.request)
-        prompt = _build_user_prompt(state, "CPU cooler", options)
-        pick = _call_llm_structured(_SYSTEM_PROMPTS["cpu_cooler"], prompt, LLMPartPick)
-        return {"cpu_cooler": pick}
+        options = _db_get_compatible_cpu_coolers(
+            _picked_option(state, "cpu", state.cpu), form_factor, state.request,
+        )
+        prompt, ids = _build_user_prompt(state, "CPU cooler", options, key="cpu_cooler")
+        pick = _call_llm_structured(_SYSTEM_PROMPTS["cpu_cooler"], prompt, LLMPartPick, step="cpu_cooler")
+        return {"cpu_cooler": _resolve_pick(pick, ids), "option_ids": {**state.option_ids, "cpu_cooler": ids}}
     except Exception as exc:
         return {"error": f"CPU cooler selection failed: {exc}"}
 
@@ -482,10 +680,12 @@ def pick_motherboard(state: PipelineState) -> dict:
     _emit_progress(state, "motherboard", "Finding the right motherboard…")
     try:
         form_factor = state.request.preferences.form_factor
-        options = _db_get_compatible_motherboards(state.cpu, form_factor, state.request)
-        prompt = _build_user_prompt(state, "motherboard", options)
-        pick = _call_llm_structured(_SYSTEM_PROMPTS["motherboard"], prompt, LLMPartPick)
-        return {"motherboard": pick}
+        options = _db_get_compatible_motherboards(
+            _picked_option(state, "cpu", state.cpu), form_factor, state.request,
+        )
+        prompt, ids = _build_user_prompt(state, "motherboard", options, key="motherboard")
+        pick = _call_llm_structured(_SYSTEM_PROMPTS["motherboard"], prompt, LLMPartPick, step="motherboard")
+        return {"motherboard": _resolve_pick(pick, ids), "option_ids": {**state.option_ids, "motherboard": ids}}
     except Exception as exc:
         return {"error": f"Motherboard selection failed: {exc}"}
 
@@ -495,10 +695,15 @@ def pick_motherboard(state: PipelineState) -> dict:
 def pick_ram(state: PipelineState) -> dict:
     _emit_progress(state, "ram", "Picking your memory…")
     try:
-        options = _db_get_compatible_ram(state.motherboard, state.request)
-        prompt = _build_user_prompt(state, "RAM", options)
-        pick = _call_llm_structured(_SYSTEM_PROMPTS["ram"], prompt, LLMPartPick)
-        return {"ram": pick}
+        floor = _software_floor(state)
+        options = _db_get_compatible_ram(_picked_option(state, "motherboard", state.motherboard), floor)
+        prompt, ids = _build_user_prompt(state, "RAM", options, key="ram")
+        pick = _call_llm_structured(_SYSTEM_PROMPTS["ram"], prompt, LLMPartPick, step="ram")
+        return {
+            "ram": _resolve_pick(pick, ids),
+            "option_ids": {**state.option_ids, "ram": ids},
+            "software_floor": floor,
+        }
     except Exception as exc:
         return {"error": f"RAM selection failed: {exc}"}
 
@@ -508,10 +713,15 @@ def pick_ram(state: PipelineState) -> dict:
 def pick_storage(state: PipelineState) -> dict:
     _emit_progress(state, "storage", "Choosing your storage…")
     try:
-        options = _db_get_compatible_storage(state.motherboard, state.request)
-        prompt = _build_user_prompt(state, "storage drive", options)
-        pick = _call_llm_structured(_SYSTEM_PROMPTS["storage"], prompt, LLMPartPick)
-        return {"storage": pick}
+        floor = _software_floor(state)
+        options = _db_get_compatible_storage(_picked_option(state, "motherboard", state.motherboard), floor)
+        prompt, ids = _build_user_prompt(state, "storage drive", options, key="storage")
+        pick = _call_llm_structured(_SYSTEM_PROMPTS["storage"], prompt, LLMPartPick, step="storage")
+        return {
+            "storage": _resolve_pick(pick, ids),
+            "option_ids": {**state.option_ids, "storage": ids},
+            "software_floor": floor,
+        }
     except Exception as exc:
         return {"error": f"Storage selection failed: {exc}"}
 
@@ -521,13 +731,17 @@ def pick_storage(state: PipelineState) -> dict:
 def pick_gpu(state: PipelineState) -> dict:
     _emit_progress(state, "gpu", "Selecting a graphics card…")
     try:
-        options = _db_get_compatible_gpus(state.request)
-        prompt = _build_user_prompt(state, "GPU", options)
-        pick = _call_llm_structured(_SYSTEM_PROMPTS["gpu"], prompt, LLMPartPick)
+        floor = _software_floor(state)
+        options = _with_fps_estimates(
+            _db_get_compatible_gpus(state.request, floor), _picked_option(state, "cpu", state.cpu), state.request,
+        )
+        prompt, ids = _build_user_prompt(state, "GPU", options, key="gpu")
+        pick = _call_llm_structured(_SYSTEM_PROMPTS["gpu"], prompt, LLMPartPick, step="gpu")
 
+        update = {"option_ids": {**state.option_ids, "gpu": ids}, "software_floor": floor}
         if pick.name.upper() == "NONE":
-            return {"gpu": None, "gpu_required": False}
-        return {"gpu": pick, "gpu_required": True}
+            return {"gpu": None, "gpu_required": False, **update}
+        return {"gpu": _resolve_pick(pick, ids), "gpu_required": True, **update}
     except Exception as exc:
         return {"error": f"GPU selection failed: {exc}"}
 
@@ -537,10 +751,12 @@ def pick_gpu(state: PipelineState) -> dict:
 def pick_psu(state: PipelineState) -> dict:
     _emit_progress(state, "psu", "Sizing your power supply…")
     try:
-        options = _db_get_compatible_psus(state.cpu, state.gpu, state.request)
-        prompt = _build_user_prompt(state, "power supply (PSU)", options)
-        pick = _call_llm_structured(_SYSTEM_PROMPTS["psu"], prompt, LLMPartPick)
-        return {"psu": pick}
+        options = _db_get_compatible_psus(
+            _picked_option(state, "cpu", state.cpu), _picked_option(state, "gpu", state.gpu), state.request,
+        )
+        prompt, ids = _build_user_prompt(state, "power supply (PSU)", options, key="psu")
+        pick = _call_llm_structured(_SYSTEM_PROMPTS["psu"], prompt, LLMPartPick, step="psu")
+        return {"psu": _resolve_pick(pick, ids), "option_ids": {**state.option_ids, "psu": ids}}
     except Exception as exc:
         return {"error": f"PSU selection failed: {exc}"}
 
@@ -551,12 +767,18 @@ def pick_case_options(state: PipelineState) -> dict:
     _emit_progress(state, "case", "Finding compatible cases for you to choose from…")
     try:
         options = _db_get_compatible_cases(
-            state.motherboard, state.cpu_cooler, state.gpu, state.request,
+            _picked_option(state, "motherboard", state.motherboard),
+            _picked_option(state, "cpu_cooler", state.cpu_cooler),
+            _picked_option(state, "gpu", state.gpu),
+            state.request,
         )
-        prompt = _build_user_prompt(state, "case", options)
+        prompt, ids = _build_user_prompt(state, "case", options, key="case")
         prompt += "\n\nProvide exactly 3 case options."
-        multi = _call_llm_structured(_SYSTEM_PROMPTS["case"], prompt, LLMMultiPartPick)
-        return {"case_options": multi.options}
+        multi = _call_llm_structured(_SYSTEM_PROMPTS["case"], prompt, LLMMultiPartPick, step="case")
+        return {
+            "case_options": [_resolve_pick(pick, ids) for pick in multi.options],
+            "option_ids": {**state.option_ids, "case": ids},
+        }
     except Exception as exc:
         return {"error": f"Case selection failed: {exc}"}
 
@@ -591,13 +813,14 @@ def await_case_selection(state: PipelineState) -> dict:
 def pick_fans(state: PipelineState) -> dict:
     _emit_progress(state, "fans", "Checking if you need extra fans…")
     try:
-        options = _db_get_compatible_fans(state.case_selection, state.request)
-        prompt = _build_user_prompt(state, "case fans", options)
-        pick = _call_llm_structured(_SYSTEM_PROMPTS["fans"], prompt, LLMPartPick)
+        options = _db_get_compatible_fans(_picked_option(state, "case", state.case_selection), state.request)
+        prompt, ids = _build_user_prompt(state, "case fans", options, key="fans")
+        pick = _call_llm_structured(_SYSTEM_PROMPTS["fans"], prompt, LLMPartPick, step="fans")
 
+        option_ids = {**state.option_ids, "fans": ids}
         if pick.name.upper() == "NONE":
-            return {"fans": None}
-        return {"fans": pick}
+            return {"fans": None, "option_ids": option_ids}
+        return {"fans": _resolve_pick(pick, ids), "option_ids": option_ids}
     except Exception as exc:
         return {"error": f"Fan selection failed: {exc}"}
 
@@ -607,7 +830,7 @@ def pick_fans(state: PipelineState) -> dict:
 def assemble_build(state: PipelineState) -> dict:
     """Collect all picks into the final BuildRecommendation."""
     _emit_progress(state, "done", "Finalizing your build…")
-    return {"build_notes": "Build assembled successfully."}
+    return {"build_notes": "Build assembled successfully.", "dirty": None}
 
 
 # ╔═══════════════════════════════════════════════════════════════════════════╗
@@ -619,11 +842,113 @@ def _check_error(state: PipelineState) -> str:
     return "error" if state.error else "continue"
 
 
+# ╔═══════════════════════════════════════════════════════════════════════════╗
+# ║  NODE DEPENDENCIES  (used for incremental re-planning)                    ║
+# ╚═══════════════════════════════════════════════════════════════════════════╝
+
+_STEP_ORDER = [
+    "pick_cpu",
+    "pick_cpu_cooler",
+    "pick_motherboard",
+    "pick_ram",
+    "pick_storage",
+    "pick_gpu",
+    "pick_psu",
+    "pick_case_options",
+    "await_case_selection",
+    "pick_fans",
+    "assemble_build",
+]
+
+# BuildRequest fields each pick depends on directly ("preferences.<name>"
+# for preference fields; `answers` is treated as a single field).
+_NODE_REQUEST_FIELDS: dict[str, set[str]] = {
+    "pick_cpu": {"use_cases", "answers", "preferences.preferred_brand_cpu"},
+    "pick_cpu_cooler": {"preferences.form_factor", "preferences.rgb_lighting", "preferences.color_theme"},
+    "pick_motherboard": {"preferences.form_factor", "preferences.wifi_required"},
+    "pick_ram": {"use_cases", "answers", "preferences.rgb_lighting", "preferences.color_theme"},
+    "pick_storage": {"use_cases", "answers"},
+    "pick_gpu": {"use_cases", "answers", "preferences.preferred_brand_gpu"},
+    "pick_psu": {"preferences.form_factor"},
+    "pick_case_options": {"preferences.form_factor", "preferences.rgb_lighting", "preferences.color_theme"},
+    "pick_fans": {"preferences.rgb_lighting", "preferences.color_theme"},
+}
+
+# State fields each node writes, and their reset values.
+_NODE_OUTPUTS: dict[str, dict[str, Any]] = {
+    "pick_cpu": {"cpu": None},
+    "pick_cpu_cooler": {"cpu_cooler": None},
+    "pick_motherboard": {"motherboard": None},
+    "pick_ram": {"ram": None},
+    "pick_storage": {"storage": None},
+    "pick_gpu": {"gpu": None, "gpu_required": True},
+    "pick_psu": {"psu": None},
+    "pick_case_options": {"case_options": None, "case_selection": None},
+    "pick_fans": {"fans": None},
+}
+
+# Node of each step key (see _STEP_READS).
+_STEP_NODES = {
+    "cpu": "pick_cpu",
+    "cpu_cooler": "pick_cpu_cooler",
+    "motherboard": "pick_motherboard",
+    "ram": "pick_ram",
+    "storage": "pick_storage",
+    "gpu": "pick_gpu",
+    "psu": "pick_psu",
+    "case": "pick_case_options",
+    "fans": "pick_fans",
+}
+
+# Nodes whose picks each node reads: the writers of its _STEP_READS fields.
+_NODE_UPSTREAM: dict[str, set[str]] = {
+    _STEP_NODES[step]: {
+        writer for field in fields for writer, outputs in _NODE_OUTPUTS.items() if field in outputs
+    }
+    for step, fields in _STEP_READS.items()
+}
+
+
+def _changed_request_fields(old: BuildRequest, new: BuildRequest) -> set[str]:
+    def _flatten(req: BuildRequest) -> dict[str, Any]:
+        data = req.model_dump()
+        flat = {f"preferences.{k}": v for k, v in data.pop("preferences").items()}
+        flat.update(data)
+        return flat
+
+    before, after = _flatten(old), _flatten(new)
+    return {field for field in after if before.get(field) != after[field]}
+
+
+def _dirty_nodes(changed_fields: set[str]) -> list[str]:
+    """Nodes affected by `changed_fields` plus everything downstream, in run order."""
+    dirty: set[str] = set()
+    for node in _STEP_ORDER:
+        if _NODE_REQUEST_FIELDS.get(node, set()) & changed_fields:
+            dirty.add(node)
+        elif _NODE_UPSTREAM.get(node, set()) & dirty:
+            dirty.add(node)
+    return [node for node in _STEP_ORDER if node in dirty]
+
+
+def _skip_unless_dirty(name: str, fn: Callable[[PipelineState], dict]) -> Callable[[PipelineState], dict]:
+    """During a re-plan, keep the checkpointed pick for nodes that are not dirty."""
+
+    def node(state: PipelineState) -> dict:
+        if state.dirty is not None and name not in state.dirty:
+            return {}
+        return fn(state)
+
+    return node
+
+
 # ╔═══════════════════════════════════════════════════════════════════════════╗
 # ║  GRAPH CONSTRUCTION                                                      ║
 # ╚═══════════════════════════════════════════════════════════════════════════╝
 
-def _build_graph() -> Any:
+def _build_graph(checkpointer: Any) -> Any:
+    from langgraph.graph import END, StateGraph
+
     g = StateGraph(PipelineState)
 
     # --- Add nodes ---
@@ -641,28 +966,16 @@ def _build_graph() -> Any:
         ("assemble_build",       assemble_build),
     ]
     for name, fn in nodes:
+        if name in _NODE_OUTPUTS:
+            fn = _skip_unless_dirty(name, fn)
         g.add_node(name, fn)
 
     # --- Entry point ---
     g.set_entry_point("pick_cpu")
 
     # --- Sequential edges with error checking after each step ---
-    step_order = [
-        "pick_cpu",
-        "pick_cpu_cooler",
-        "pick_motherboard",
-        "pick_ram",
-        "pick_storage",
-        "pick_gpu",
-        "pick_psu",
-        "pick_case_options",
-        "await_case_selection",
-        "pick_fans",
-        "assemble_build",
-    ]
-
-    for i, step in enumerate(step_order[:-1]):
-        next_step = step_order[i + 1]
+    for i, step in enumerate(_STEP_ORDER[:-1]):
+        next_step = _STEP_ORDER[i + 1]
         g.add_conditional_edges(
             step,
             _check_error,
@@ -673,17 +986,290 @@ def _build_graph() -> Any:
     g.add_edge("assemble_build", END)
 
     # --- Compile with interrupt before case selection (human-in-the-loop) ---
-    return g.compile(interrupt_before=["await_case_selection"])
+    return g.compile(checkpointer=checkpointer, interrupt_before=["await_case_selection"])
+
+
+_MAX_SESSIONS = int(os.getenv("RECOMMENDER_MAX_SESSIONS", "1000"))
+_SESSION_TTL_SECONDS = float(os.getenv("RECOMMENDER_SESSION_TTL_SECONDS", "3600"))
+
+
+def _bounded_memory_saver(max_sessions: int = _MAX_SESSIONS, ttl_seconds: float = _SESSION_TTL_SECONDS) -> Any:
+    """An InMemorySaver that deletes expired and least recently written threads."""
+    from langgraph.checkpoint.memory import InMemorySaver
+
+    class BoundedMemorySaver(InMemorySaver):
+        def __init__(self) -> None:
+            super().__init__()
+            self._written: OrderedDict[str, float] = OrderedDict()  # thread id -> last write
+            self._written_lock = threading.Lock()
+
+        def put(self, config: Any, checkpoint: Any, metadata: Any, new_versions: Any) -> Any:
+            result = super().put(config, checkpoint, metadata, new_versions)
+            self._touch(config["configurable"]["thread_id"])
+            return result
 
+        def _touch(self, thread_id: str) -> None:
+            now = time.monotonic()
+            evicted: list[str] = []
+            with self._written_lock:
+                self._written[thread_id] = now
+                self._written.move_to_end(thread_id)
+                while self._written:
+                    oldest, written_at = next(iter(self._written.items()))
+                    if len(self._written) <= max_sessions and now - written_at <= ttl_seconds:
+                        break
+                    del self._written[oldest]
+                    evicted.append(oldest)
+            for old in evicted:
+                self.delete_thread(old)
 
-# Compile once at module level
-_pipeline = _build_graph()
+    return BoundedMemorySaver()
+
+
+@functools.cache
+def _get_pipeline() -> Any:
+    """Compile the graph once, on first use (langgraph is slow to import)."""
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    return _build_graph(_bounded_memory_saver())
+
+
+_async_pipeline: Any = None
+_async_pipeline_lock = asyncio.Lock()
+
+
+async def _get_async_pipeline() -> Any:
+    """
+    The graph used by the streaming API: Postgres-checkpointed when
+    RECOMMENDER_CHECKPOINT_DB_URI is set, otherwise the in-memory one.
+    """
+    global _async_pipeline
+    async with _async_pipeline_lock:
+        if _async_pipeline is None:
+            _async_pipeline = await _build_async_pipeline()
+    return _async_pipeline
+
+
+async def _build_async_pipeline() -> Any:
+    db_uri = os.getenv("RECOMMENDER_CHECKPOINT_DB_URI")
+    if not db_uri:
+        return _get_pipeline()
+
+    from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
+    from psycopg.rows import dict_row
+    from psycopg_pool import AsyncConnectionPool
+
+    pool = AsyncConnectionPool(
+        db_uri,
+        max_size=10,
+        open=False,
+        kwargs={"autocommit": True, "prepare_threshold": 0, "row_factory": dict_row},
+    )
+    await pool.open()
+    saver = AsyncPostgresSaver(pool)
+    await saver.setup()
+    return _build_graph(saver)
 
 
 # ╔═══════════════════════════════════════════════════════════════════════════╗
 # ║  PUBLIC API                                                              ║
 # ╚═══════════════════════════════════════════════════════════════════════════╝
 
+_PICK_FIELDS = ["cpu", "cpu_cooler", "motherboard", "ram", "storage", "gpu", "psu", "fans"]
+
+
+def _session_config(session_id: str) -> dict:
+    return {"configurable": {"thread_id": session_id}}
+
+
+def _to_build_recommendation(state: dict) -> BuildRecommendation:
+    return BuildRecommendation(
+        cpu=PartRecommendation.from_llm(state["cpu"], "CPU"),
+        cpu_cooler=PartRecommendation.from_llm(state["cpu_cooler"], "CPU Cooler"),
+        motherboard=PartRecommendation.from_llm(state["motherboard"], "Motherboard"),
+        ram=PartRecommendation.from_llm(state["ram"], "RAM"),
+        storage=PartRecommendation.from_llm(state["storage"], "Storage"),
+        gpu=PartRecommendation.from_llm(state["gpu"], "GPU") if state.get("gpu") else None,
+        case=PartRecommendation.from_llm(state["case_selection"], "Case"),
+        psu=PartRecommendation.from_llm(state["psu"], "PSU"),
+        fans=PartRecommendation.from_llm(state["fans"], "Fans") if state.get("fans") else None,
+        build_notes=state.get("build_notes", ""),
+    )
+
+
+def _update_events(node: str, update: dict | None) -> list[dict]:
+    """Translate one node's state update into client events."""
+    if not update:
+        return []
+    if update.get("error"):
+        return [{"type": "error", "step": node, "message": update["error"]}]
+
+    events: list[dict] = []
+    for field in _PICK_FIELDS:
+        if field in update:
+            pick = update[field]
+            events.append({
+                "type": "pick",
+                "component": field,
+                "part": pick.model_dump() if pick is not None else None,
+            })
+    if update.get("case_options"):
+        events.append({
+            "type": "case_options",
+            "options": [opt.model_dump() for opt in update["case_options"]],
+        })
+    return events
+
+
+async def _astream_events(pipeline: Any, graph_input: Any, config: dict) -> AsyncIterator[dict]:
+    async for mode, chunk in pipeline.astream(
+        graph_input, config=config, stream_mode=["updates", "custom"],
+    ):
+        if mode == "custom":
+            yield chunk
+            continue
+        for node, update in chunk.items():
+            if node.startswith("__"):
+                continue  # e.g. "__interrupt__"
+            for event in _update_events(node, update):
+                yield event
+
+
+async def astream_build_phase1(request: BuildRequest) -> AsyncIterator[dict]:
+    """
+    Stream Phase 1 as events: a "session" event carrying the session id,
+    then "progress" / "pick" events as each node starts / finishes, the
+    "case_options", and finally "awaiting_case_selection" (or "error").
+    """
+    pipeline = await _get_async_pipeline()
+    session_id = uuid.uuid4().hex
+    config = _session_config(session_id)
+
+    yield {"type": "session", "session_id": session_id}
+
+    failed = False
+    async for event in _astream_events(pipeline, PipelineState(request=request), config):
+        failed = failed or event["type"] == "error"
+        yield event
+
+    if not failed:
+        yield {"type": "awaiting_case_selection", "session_id": session_id}
+
+
+async def aget_build_session(session_id: str) -> dict | None:
+    """Checkpointed state values of a build session, or None if unknown."""
+    pipeline = await _get_async_pipeline()
+    snapshot = await pipeline.aget_state(_session_config(session_id))
+    return snapshot.values or None
+
+
+async def astream_build_phase2(session_id: str, selected_case_index: int) -> AsyncIterator[dict]:
+    """
+    Resume a session with the chosen case and stream the remaining nodes,
+    ending with a "build" event holding the BuildRecommendation.
+    """
+    pipeline = await _get_async_pipeline()
+    config = _session_config(session_id)
+
+    values = await aget_build_session(session_id) or {}
+    case_options = values.get("case_options") or []
+    if not case_options or not 0 <= selected_case_index < len(case_options):
+        raise ValueError("Invalid case selection. Must be 0, 1, or 2.")
+
+    await pipeline.aupdate_state(config, {"case_selection": case_options[selected_case_index]})
+
+    failed = False
+    async for event in _astream_events(pipeline, None, config):
+        failed = failed or event["type"] == "error"
+        yield event
+
+    if not failed:
+        snapshot = await pipeline.aget_state(config)
+        build = _to_build_recommendation(snapshot.values)
+        yield {"type": "build", "data": build.model_dump()}
+
+
+async def astream_replan(session_id: str, request: BuildRequest) -> AsyncIterator[dict]:
+    """
+    Re-plan a session after the user changed their BuildRequest.
+
+    Only nodes whose request fields changed, and the nodes downstream of
+    them, are re-run from the session's checkpoint; every other pick is
+    reused.  Streams a "replan" event listing the dirty nodes, then the
+    usual progress / pick events.  Ends with "awaiting_case_selection" when
+    the case options were regenerated, otherwise with "build" (or
+    "awaiting_case_selection" if the session had not had a case chosen yet).
+    """
+    pipeline = await _get_async_pipeline()
+    config = _session_config(session_id)
+
+    values = await aget_build_session(session_id)
+    if values is None:
+        raise ValueError(f"Unknown build session {session_id}")
+
+    changed = _changed_request_fields(values["request"], request)
+    dirty = reported = _dirty_nodes(changed)
+    if values.get("case_selection") is None:
+        # Still waiting for the case pick: later nodes have not run yet and
+        # will see the new request when the session is resumed, so they
+        # are not reported but stay dirty (a non-dirty node is skipped).
+        interrupt = _STEP_ORDER.index("await_case_selection")
+        reported = [n for n in dirty if _STEP_ORDER.index(n) < interrupt]
+        dirty = reported + [n for n in _STEP_ORDER[interrupt:] if n in _NODE_OUTPUTS]
+    yield {"type": "replan", "dirty": reported}
+    if not reported:
+        await pipeline.aupdate_state(config, {"request": request, "dirty": dirty or values.get("dirty")})
+        return
+
+    reset: dict[str, Any] = {"request": request, "dirty": dirty, "error": None}
+    if "answers" in changed:
+        reset["software_floor"] = None
+    for node in dirty:
+        reset.update(_NODE_OUTPUTS[node])
+
+    first = _STEP_ORDER.index(dirty[0])
+    if first == 0:
+        # Everything is dirty: restart the thread from the entry point.
+        graph_input: Any = {**values, **reset}
+    else:
+        # Fork the checkpoint as if the node before the first dirty one had
+        # just finished, so the run resumes right there.
+        await pipeline.aupdate_state(config, reset, as_node=_STEP_ORDER[first - 1])
+        graph_input = None
+
+    while True:
+        async for event in _astream_events(pipeline, graph_input, config):
+            yield event
+            if event["type"] == "error":
+                return
+        graph_input = None
+
+        snapshot = await pipeline.aget_state(config)
+        if "await_case_selection" not in snapshot.next:
+            break
+        if snapshot.values.get("case_selection") is None:
+            yield {"type": "awaiting_case_selection", "session_id": session_id}
+            return
+        # The case pick was kept: pass straight through the interrupt.
+
+    build = _to_build_recommendation(snapshot.values)
+    yield {"type": "build", "data": build.model_dump()}
+
+
+def _run_with_progress(
+    pipeline: Any,
+    graph_input: Any,
+    config: dict,
+    progress_callback: Callable[[str, str], None] | None,
+) -> dict:
+    """Run the graph to its next pause, forwarding progress events to the callback."""
+    for event in pipeline.stream(graph_input, config=config, stream_mode="custom"):
+        if progress_callback and event.get("type") == "progress":
+            progress_callback(event["step"], event["message"])
+    return pipeline.get_state(config).values
+
+
 def recommend_build_phase1(
     request: BuildRequest,
     progress_callback: Callable[[str, str], None] | None = None,
@@ -698,13 +1284,11 @@ def recommend_build_phase1(
         "thread_state" : opaque state needed to resume the pipeline
         "error"        : str or None
     """
-    initial = PipelineState(
-        request=request,
-        progress_callback=progress_callback,
-    )
-    config = {"configurable": {"thread_id": "build-session"}}
+    config = _session_config(uuid.uuid4().hex)
 
-    state = _pipeline.invoke(initial, config=config)
+    state = _run_with_progress(
+        _get_pipeline(), PipelineState(request=request), config, progress_callback,
+    )
 
     if state.get("error"):
         return {"case_options": [], "thread_state": None, "error": state["error"]}
@@ -738,37 +1322,24 @@ def recommend_build_phase2(
     -------
     BuildRecommendation with all parts selected (prices still None).
     """
-    current = _pipeline.get_state(thread_state)
+    pipeline = _get_pipeline()
+    current = pipeline.get_state(thread_state)
     case_options = current.values.get("case_options", [])
 
     if not case_options or selected_case_index not in (0, 1, 2):
         raise ValueError("Invalid case selection. Must be 0, 1, or 2.")
 
-    _pipeline.update_state(
+    pipeline.update_state(
         thread_state,
-        {
-            "case_selection": case_options[selected_case_index],
-            "progress_callback": progress_callback,
-        },
+        {"case_selection": case_options[selected_case_index]},
     )
 
-    state = _pipeline.invoke(None, config=thread_state)
+    state = _run_with_progress(pipeline, None, thread_state, progress_callback)
 
     if state.get("error"):
         raise RuntimeError(f"Recommendation failed: {state['error']}")
 
-    return BuildRecommendation(
-        cpu=PartRecommendation.from_llm(state["cpu"], "CPU"),
-        cpu_cooler=PartRecommendation.from_llm(state["cpu_cooler"], "CPU Cooler"),
-        motherboard=PartRecommendation.from_llm(state["motherboard"], "Motherboard"),
-        ram=PartRecommendation.from_llm(state["ram"], "RAM"),
-        storage=PartRecommendation.from_llm(state["storage"], "Storage"),
-        gpu=PartRecommendation.from_llm(state["gpu"], "GPU") if state.get("gpu") else None,
-        case=PartRecommendation.from_llm(state["case_selection"], "Case"),
-        psu=PartRecommendation.from_llm(state["psu"], "PSU"),
-        fans=PartRecommendation.from_llm(state["fans"], "Fans") if state.get("fans") else None,
-        build_notes=state.get("build_notes", ""),
-    )
+    return _to_build_recommendation(state)
 
 
 # ╔═══════════════════════════════════════════════════════════════════════════╗
@@ -833,4 +1404,4 @@ if __name__ == "__main__":
         # Show what a single prompt would look like
         print("\n--- Sample prompt for CPU step ---")
         test_state = PipelineState(request=sample)
-        print(_build_user_prompt(test_state, "CPU"))
\ No newline at end of file
+        print(_build_user_prompt(test_state, "CPU")[0])
\ No newline at end of file
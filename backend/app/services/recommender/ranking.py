@@ -0,0 +1,224 @@
+"""
+Pre-ranking of compatible part options before they reach the LLM.
+
+A compatibility query can return hundreds of parts; listing all of them
+in a pick step's prompt costs thousands of input tokens and slows the
+call down.  Options are instead scored for the user's workloads, cut to
+the best RECOMMENDER_MAX_OPTIONS plus up to RECOMMENDER_DIVERSITY_PICKS
+picks that add a missing brand or the cheapest option, and rendered as a
+compact pipe-separated table with short row ids.  Prompt size per step is
+then bounded no matter how large the catalog grows.
+
+Scoring
+-------
+Each component has per-use-case metric weights (benchmark slugs or spec
+columns).  Metrics are min-max normalised across the candidate set;
+negative weights mean lower is better, and a missing value counts as
+average.  The performance score is blended with price (cheaper is
+better) so the shortlist is not just the most expensive parts.
+
+  RECOMMENDER_MAX_OPTIONS       top-scored options kept per step (default 12)
+  RECOMMENDER_DIVERSITY_PICKS   extra brand / price coverage picks (default 4)
+"""
+
+from __future__ import annotations
+
+import os
+from typing import Any
+
+from app.services.recommender.schemas import PartOption
+
+_MAX_OPTIONS = int(os.getenv("RECOMMENDER_MAX_OPTIONS", "12"))
+_DIVERSITY_PICKS = int(os.getenv("RECOMMENDER_DIVERSITY_PICKS", "4"))
+
+# Share of the score that comes from performance; the rest is price.
+_PERFORMANCE_WEIGHT = 0.7
+
+# component -> use case -> metric -> weight.  "_default" applies to every
+# build and is added to the weights of the selected use cases.
+_WORKLOAD_METRICS: dict[str, dict[str, dict[str, float]]] = {
+    "cpu": {
+        "gaming": {"cinebench_r24_single": 2.0, "geekbench_6_single": 1.0, "l3_cache_mb": 1.0},
+        "productivity": {"cinebench_r24_multi": 1.0, "geekbench_6_multi": 1.0},
+        "creative": {"cinebench_r24_multi": 2.0, "cores": 1.0},
+        "streaming": {"cinebench_r24_multi": 1.0, "threads": 1.0},
+        "aiml": {"cinebench_r24_multi": 1.0, "max_memory_gb": 1.0},
+        "nas": {"tdp_watts": -1.0},
+    },
+    "cpu_cooler": {
+        "_default": {"max_tdp_watts": 1.0, "noise_dba": -1.0},
+    },
+    "motherboard": {
+        "_default": {"m2_slots": 1.0, "m2_pcie_gen": 1.0},
+        "nas": {"sata_ports": 2.0},
+    },
+    "ram": {
+        "_default": {"capacity_gb": 1.0, "speed_mhz": 1.0, "cas_latency": -0.5},
+        "creative": {"capacity_gb": 2.0},
+        "aiml": {"capacity_gb": 3.0},
+    },
+    "storage": {
+        "_default": {"capacity_gb": 1.0, "read_speed_mbps": 1.0},
+        "creative": {"write_speed_mbps": 1.0},
+        "nas": {"capacity_gb": 3.0, "endurance_tbw": 1.0},
+    },
+    "gpu": {
+        # est_fps: fps_estimator's estimate with the chosen CPU (see pipeline)
+        "gaming": {"timespy": 2.0, "speed_way": 1.0, "port_royal": 1.0, "est_fps": 3.0},
+        "productivity": {"timespy": 1.0},
+        "creative": {"geekbench_6_compute": 2.0, "vram_gb": 1.0},
+        "streaming": {"timespy": 1.0},
+        "aiml": {"vram_gb": 3.0, "geekbench_6_compute": 2.0},
+    },
+    "psu": {
+        "_default": {"efficiency_rating": 1.0},
+    },
+    "case": {
+        "_default": {"included_fan_count": 1.0, "max_gpu_length_mm": 0.5},
+    },
+    "fans": {
+        "_default": {"airflow_cfm": 1.0, "noise_dba": -1.0},
+    },
+}
+
+
+# Categorical specs scored by their position in these (worst → best) lists.
+_ORDINALS: dict[str, list[str]] = {
+    "efficiency_rating": [
+        "80plus", "80plus_bronze", "80plus_silver", "80plus_gold", "80plus_platinum", "80plus_titanium",
+    ],
+}
+
+
+def _metric(option: PartOption, name: str) -> float | None:
+    value = option.benchmarks.get(name, option.specs.get(name))
+    if name in _ORDINALS:
+        return float(_ORDINALS[name].index(value)) if value in _ORDINALS[name] else None
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    return float(value)
+
+
+def _normalised(values: list[float | None], higher_is_better: bool = True) -> list[float]:
+    """Min-max scale to [0, 1]; missing values (and constant columns) score 0.5."""
+    known = [v for v in values if v is not None]
+    if not known or max(known) == min(known):
+        return [0.5] * len(values)
+    lo, hi = min(known), max(known)
+    scaled = [0.5 if v is None else (v - lo) / (hi - lo) for v in values]
+    return scaled if higher_is_better else [1.0 - s for s in scaled]
+
+
+def _weights(component: str, use_cases: list[str]) -> dict[str, float]:
+    table = _WORKLOAD_METRICS.get(component, {})
+    weights: dict[str, float] = dict(table.get("_default", {}))
+    for use_case in use_cases:
+        for metric, weight in table.get(use_case, {}).items():
+            weights[metric] = weights.get(metric, 0.0) + weight
+    return weights
+
+
+def score_options(
+    options: list[PartOption], component: str, use_cases: list[str],
+) -> list[float]:
+    """Score each option in [0, 1] for the given component and workloads."""
+    if not options:
+        return []
+
+    weights = _weights(component, use_cases)
+    total = sum(abs(w) for w in weights.values())
+    performance = [0.0] * len(options)
+    for metric, weight in weights.items():
+        column = _normalised([_metric(o, metric) for o in options], higher_is_better=weight > 0)
+        for i, value in enumerate(column):
+            performance[i] += abs(weight) / total * value
+    if not weights:
+        performance = [0.5] * len(options)
+
+    price = _normalised(
+        [float(o.price_cents) if o.price_cents is not None else None for o in options],
+        higher_is_better=False,
+    )
+    return [
+        _PERFORMANCE_WEIGHT * perf + (1 - _PERFORMANCE_WEIGHT) * cheap
+        for perf, cheap in zip(performance, price, strict=True)
+    ]
+
+
+def select_options(
+    options: list[PartOption],
+    component: str,
+    use_cases: list[str],
+    top_n: int = _MAX_OPTIONS,
+    diversity: int = _DIVERSITY_PICKS,
+) -> list[PartOption]:
+    """
+    The `top_n` best-scored options, followed by up to `diversity` picks
+    that add an unrepresented manufacturer or the cheapest option.
+    """
+    scores = score_options(options, component, use_cases)
+    ranked = [o for _, o in sorted(zip(scores, options, strict=True), key=lambda pair: -pair[0])]
+    kept = ranked[:top_n]
+    rest = ranked[top_n:]
+
+    extras: list[PartOption] = []
+    seen_brands = {o.manufacturer for o in kept}
+    for option in rest:
+        if len(extras) >= diversity:
+            break
+        if option.manufacturer not in seen_brands:
+            extras.append(option)
+            seen_brands.add(option.manufacturer)
+
+    priced = [o for o in options if o.price_cents is not None]
+    if priced and len(extras) < diversity:
+        cheapest = min(priced, key=lambda o: o.price_cents)
+        if cheapest not in kept and cheapest not in extras:
+            extras.append(cheapest)
+
+    return kept + extras
+
+
+def _cell(value: Any) -> str:
+    if value is None:
+        return "-"
+    if isinstance(value, bool):
+        return "y" if value else "n"
+    if isinstance(value, (list, tuple)):
+        return "/".join(_cell(v) for v in value)
+    if isinstance(value, float):
+        return f"{value:g}"
+    return str(value).replace("|", "/")
+
+
+def render_table(options: list[PartOption], id_prefix: str = "o") -> tuple[str, dict[str, PartOption]]:
+    """
+    Render options as a pipe-separated table with short row ids.
+    Returns (table, {short id: option}).
+    """
+    columns: list[str] = []
+    for option in options:
+        for key in option.specs:
+            if key not in columns:
+                columns.append(key)
+
+    lines = ["|".join(["id", "name", "usd", *columns])]
+    ids: dict[str, PartOption] = {}
+    for i, option in enumerate(options, start=1):
+        short_id = f"{id_prefix}{i}"
+        ids[short_id] = option
+        price = round(option.price_cents / 100) if option.price_cents is not None else None
+        lines.append("|".join([
+            short_id,
+            _cell(option.name),
+            _cell(price),
+            *(_cell(option.specs.get(c)) for c in columns),
+        ]))
+    return "\n".join(lines), ids
+
+
+def compact_options(
+    options: list[PartOption], component: str, use_cases: list[str],
+) -> tuple[str, dict[str, PartOption]]:
+    """Rank, cut and render `options` for a prompt."""
+    return render_table(select_options(options, component, use_cases))
@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+from typing import Any
+
+from pydantic import BaseModel, Field
+
+
+class PartOption(BaseModel):
+    """
+    A compatible catalog part offered to an LLM pick step.
+
+    `specs` holds the compatibility / key spec columns worth showing the
+    model (e.g. {"socket": "AM5", "cores": 8}); `benchmarks` holds raw
+    benchmark scores keyed by benchmark slug, as in `benchmark_scores`.
+    """
+    id: str = Field(..., description="pc_parts.id")
+    name: str
+    manufacturer: str | None = None
+    price_cents: int | None = Field(None, description="Street price, falling back to MSRP")
+    specs: dict[str, Any] = Field(default_factory=dict)
+    benchmarks: dict[str, float] = Field(default_factory=dict)
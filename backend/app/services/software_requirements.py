@@ -0,0 +1,260 @@
+"""
+Combined hardware floor for a set of software workloads.
+
+Workloads come either from `BuildProfile.workloads` (free text) or from
+the configurator's answers (`creative.software`, `aiml.frameworks`,
+`productivity.tasks`).  Each phrase, and each " / "-separated piece of it
+("Adobe Premiere / After Effects"), is resolved against a `NameIndex`
+over `Software.name` / `slug`.
+
+Every software has ordered tiers ("1080p editing" → "8K editing").  The
+tier used is picked by an intensity in [0, 1]: position
+round(intensity × (tiers − 1)).  Intensity comes from the answers that
+describe workload weight (creative.ram, creative.videoRes, aiml.workload,
+aiml.vram) or, for a chat profile, from its budget tier.
+
+The floor is computed in one aggregate query over the chosen tiers:
+max RAM / VRAM / cores, total storage, the union of `gpu_importance`
+values, the share of tiers that prefer single-thread performance, and
+the highest performance index among the tiers' minimum CPUs / GPUs.
+Results are cached per (software set, intensity).
+
+  SOFTWARE_REQUIREMENTS_CACHE_SIZE    workload sets kept (default 256)
+  SOFTWARE_REQUIREMENTS_TTL_SECONDS   lifetime of cached floors and the
+                                      name index (default 3600)
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from pydantic import BaseModel, Field
+
+from app.services.name_index import NameIndex
+
+logger = logging.getLogger(__name__)
+
+_CACHE_SIZE = int(os.getenv("SOFTWARE_REQUIREMENTS_CACHE_SIZE", "256"))
+_TTL_SECONDS = float(os.getenv("SOFTWARE_REQUIREMENTS_TTL_SECONDS", "3600"))
+
+# Strongest first.
+GPU_IMPORTANCE_ORDER = ("required", "accelerated", "optional", "irrelevant")
+
+_SOFTWARE_ANSWER_KEYS = ("creative.software", "aiml.frameworks", "productivity.tasks")
+
+# answer key -> answer prefixes from lightest to heaviest workload.
+_INTENSITY_ANSWERS: dict[str, list[str]] = {
+    "creative.ram": ["light", "medium", "heavy", "extreme"],
+    "creative.videoRes": ["1080p", "4k", "6k"],
+    "aiml.workload": ["experimenting", "inference", "fine-tuning", "training"],
+    "aiml.vram": ["8", "16", "48", "multi"],
+}
+_BUDGET_INTENSITY = {"entry": 0.0, "mid": 0.34, "high": 0.67, "elite": 1.0}
+_DEFAULT_INTENSITY = 0.5
+
+_PARENTHETICAL = re.compile(r"\([^)]*\)")
+
+
+class SoftwareRequirements(BaseModel):
+    software: list[str] = Field(default_factory=list, description="Resolved software names")
+    unresolved: list[str] = Field(default_factory=list)
+    intensity: float = _DEFAULT_INTENSITY
+    min_ram_gb: int | None = None
+    recommended_ram_gb: int | None = None
+    min_vram_gb: int | None = None
+    min_storage_gb: int | None = None
+    min_cores: int | None = None
+    gpu_importance: str | None = Field(None, description="Strongest gpu_importance across tiers")
+    gpu_importances: list[str] = Field(default_factory=list)
+    single_thread_weight: float | None = Field(
+        None, description="Share of tiers preferring single-thread performance (0 = all scale with cores)",
+    )
+    min_single_thread_index: float | None = None
+    min_multi_thread_index: float | None = None
+    min_raster_index: float | None = None
+
+
+def software_phrases(values: list[str]) -> list[str]:
+    """Split answer / workload strings into candidate software names."""
+    phrases: list[str] = []
+    for value in values:
+        value = _PARENTHETICAL.sub("", value).strip()
+        pieces = [value] + (value.split(" / ") if " / " in value else [])
+        for piece in pieces:
+            piece = piece.strip()
+            if piece and piece not in phrases:
+                phrases.append(piece)
+    return phrases
+
+
+def intensity_from_answers(answers: dict[str, str | list[str]]) -> float:
+    """Heaviest workload level among the intensity answers, in [0, 1]."""
+    levels = []
+    for key, prefixes in _INTENSITY_ANSWERS.items():
+        value = answers.get(key)
+        for answer in [value] if isinstance(value, str) else (value or []):
+            answer = answer.lower()
+            for position, prefix in enumerate(prefixes):
+                if answer.startswith(prefix):
+                    levels.append(position / (len(prefixes) - 1))
+                    break
+    return max(levels) if levels else _DEFAULT_INTENSITY
+
+
+def _strongest(importances: list[str]) -> str | None:
+    known = [i for i in GPU_IMPORTANCE_ORDER if i in importances]
+    return known[0] if known else None
+
+
+class SoftwareRequirementResolver:
+    def __init__(self, cache_size: int = _CACHE_SIZE, ttl_seconds: float = _TTL_SECONDS):
+        self.cache_size = cache_size
+        self.ttl_seconds = ttl_seconds
+        self._index: NameIndex | None = None
+        self._names: dict[str, str] = {}
+        self._index_loaded_at = 0.0
+        self._cache: OrderedDict[tuple[frozenset[str], float], tuple[float, SoftwareRequirements]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _name_index(self, db) -> NameIndex:
+        if self._index is None or time.monotonic() - self._index_loaded_at > self.ttl_seconds:
+            from sqlalchemy import select
+
+            from app.models.software_catalog import Software
+
+            rows = db.execute(select(Software.id, Software.name, Software.slug)).all()
+            self._index = NameIndex((str(sid), [name, slug]) for sid, name, slug in rows)
+            self._names = {str(sid): name for sid, name, _ in rows}
+            self._index_loaded_at = time.monotonic()
+        return self._index
+
+    def _query(self, db, software_ids: frozenset[str], intensity: float) -> SoftwareRequirements:
+        import uuid
+
+        from sqlalchemy import Float, and_, case, distinct, func, literal, select
+
+        from app.models.part_compatibility import PartCompatibility as PC
+        from app.models.software_catalog import SoftwareMinimumPart as SMP
+        from app.models.software_catalog import SoftwareTier as T
+
+        ranked = (
+            select(
+                T.id, T.min_ram_gb, T.recommended_ram_gb, T.min_vram_gb, T.min_storage_gb,
+                T.min_cores, T.gpu_importance, T.prefers_single_thread,
+                (func.row_number().over(partition_by=T.software_id, order_by=T.sort_order) - 1).label("pos"),
+                func.count().over(partition_by=T.software_id).label("n"),
+            )
+            .where(T.software_id.in_([uuid.UUID(s) for s in software_ids]))
+            .cte("ranked")
+        )
+        chosen = (
+            select(ranked)
+            .where(ranked.c.pos == func.round(literal(intensity, Float) * (ranked.c.n - 1)))
+            .cte("chosen")
+        )
+
+        def part_floor(role: str, column):
+            return (
+                select(func.max(column))
+                .select_from(SMP)
+                .join(PC, PC.id == SMP.part_id)
+                .where(and_(SMP.tier_id.in_(select(chosen.c.id)), func.lower(SMP.role) == role))
+                .scalar_subquery()
+            )
+
+        row = db.execute(
+            select(
+                func.max(chosen.c.min_ram_gb),
+                func.max(chosen.c.recommended_ram_gb),
+                func.max(chosen.c.min_vram_gb),
+                func.sum(chosen.c.min_storage_gb),
+                func.max(chosen.c.min_cores),
+                func.array_agg(distinct(chosen.c.gpu_importance)),
+                func.avg(case((chosen.c.prefers_single_thread.is_(True), 1.0), else_=0.0)),
+                part_floor("cpu", PC.single_thread_index),
+                part_floor("cpu", PC.multi_thread_index),
+                part_floor("gpu", PC.raster_index),
+            )
+        ).one()
+
+        importances = [i for i in (row[5] or []) if i is not None]
+        return SoftwareRequirements(
+            software=sorted(self._names.get(s, s) for s in software_ids),
+            intensity=intensity,
+            min_ram_gb=row[0],
+            recommended_ram_gb=row[1],
+            min_vram_gb=row[2],
+            min_storage_gb=int(row[3]) if row[3] is not None else None,
+            min_cores=row[4],
+            gpu_importance=_strongest(importances),
+            gpu_importances=[i for i in GPU_IMPORTANCE_ORDER if i in importances],
+            single_thread_weight=float(row[6]) if row[6] is not None else None,
+            min_single_thread_index=row[7],
+            min_multi_thread_index=row[8],
+            min_raster_index=row[9],
+        )
+
+    def resolve(self, db, phrases: list[str], intensity: float = _DEFAULT_INTENSITY) -> SoftwareRequirements:
+        if not phrases:
+            return SoftwareRequirements(intensity=intensity)
+        matches = self._name_index(db).lookup_many(phrases)
+        software_ids = frozenset(s for s in matches.values() if s is not None)
+        # A phrase is only unresolved if no piece of it (or phrase it is a
+        # piece of) resolved: "Adobe Premiere / After Effects" is covered
+        # by "Adobe Premiere".
+        unresolved = [
+            p for p, s in matches.items()
+            if s is None and not any(
+                (p in q or q in p) and matches[q] is not None for q in matches if q != p
+            )
+        ]
+        if not software_ids:
+            return SoftwareRequirements(unresolved=unresolved, intensity=intensity)
+
+        key = (software_ids, round(intensity, 2))
+        now = time.monotonic()
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None and now - cached[0] <= self.ttl_seconds:
+                self._cache.move_to_end(key)
+                return cached[1].model_copy(update={"unresolved": unresolved})
+
+        result = self._query(db, software_ids, round(intensity, 2))
+        with self._lock:
+            self._cache[key] = (now, result)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return result.model_copy(update={"unresolved": unresolved})
+
+
+_resolver = SoftwareRequirementResolver()
+
+
+def _resolve(phrases: list[str], intensity: float, db=None) -> SoftwareRequirements:
+    if db is not None:
+        return _resolver.resolve(db, phrases, intensity)
+
+    from app.core.db import SessionLocal
+
+    with SessionLocal() as session:
+        return _resolver.resolve(session, phrases, intensity)
+
+
+def resolve_answers(answers: dict[str, str | list[str]], db=None) -> SoftwareRequirements:
+    """Floor for the software named in configurator answers."""
+    values: list[str] = []
+    for key in _SOFTWARE_ANSWER_KEYS:
+        value = answers.get(key)
+        values.extend([value] if isinstance(value, str) else (value or []))
+    return _resolve(software_phrases(values), intensity_from_answers(answers), db)
+
+
+def resolve_workloads(workloads: list[str], budget_tier: str | None = None, db=None) -> SoftwareRequirements:
+    """Floor for a chat profile's free-text workloads."""
+    intensity = _BUDGET_INTENSITY.get(budget_tier or "", _DEFAULT_INTENSITY)
+    return _resolve(software_phrases(workloads), intensity, db)
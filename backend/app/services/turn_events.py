@@ -0,0 +1,398 @@
+"""
+Per-turn event log for resumable chat streams.
+
+Every event a chat turn produces gets a sequential id (starting at 1) and
+is appended to that turn's `TurnLog`, a bounded ring buffer.  The turn
+runs as a background task that writes to the log; HTTP responses are
+just subscribers reading from it, so a client that drops mid-stream can
+reconnect with `Last-Event-ID` and pick up where it left off without the
+pipeline being re-run.
+
+Tiers
+-----
+  memory    `TurnEventStore` keeps recent turns in this worker.  Finished
+            turns expire after CHAT_EVENT_LOG_TTL_SECONDS and the store
+            holds at most CHAT_EVENT_LOG_MAX_TURNS turns; turns still in
+            progress are never evicted.
+  postgres  with CHAT_EVENT_LOG_POSTGRES=1 events are also written to the
+            `chat_turn_events` table in batches, and the turn's owner and
+            completion to `chat_turns` (marked finished with the last
+            batch), so a resume that lands on another worker, or after a
+            restart, can replay whatever had been flushed.  A turn still
+            being produced elsewhere is followed by polling until it is
+            marked finished, or until no new events arrive for
+            CHAT_EVENT_LOG_FOLLOW_TIMEOUT_SECONDS (its worker died).
+            `python -m app.services.turn_events` (run hourly) deletes
+            turns older than CHAT_EVENT_LOG_RETENTION_HOURS.
+
+  CHAT_EVENT_LOG_MAX_EVENTS              ring buffer size per turn (default 4096)
+  CHAT_EVENT_LOG_MAX_TURNS               turns kept in memory (default 1024)
+  CHAT_EVENT_LOG_TTL_SECONDS             lifetime of finished turns (default 900)
+  CHAT_EVENT_LOG_POSTGRES                "1" to enable the Postgres tier
+  CHAT_EVENT_LOG_POLL_SECONDS            poll interval when following a turn
+                                         from Postgres (default 0.5)
+  CHAT_EVENT_LOG_FOLLOW_TIMEOUT_SECONDS  give up following a silent turn
+                                         after this long (default 120)
+  CHAT_EVENT_LOG_RETENTION_HOURS         age at which persisted turns are
+                                         pruned (default 24)
+  CHAT_IDEMPOTENCY_TTL_SECONDS           how long a finished turn answers
+                                         duplicate submissions of the same
+                                         request (default 300)
+
+Idempotency
+-----------
+`TurnEventStore.create` takes an optional idempotency key.  While a turn
+for that key is running, or within CHAT_IDEMPOTENCY_TTL_SECONDS of it
+finishing, the same key returns the existing turn instead of a new one,
+so duplicates attach as extra subscribers (singleflight) or replay the
+finished turn.  A key reused with a different request fingerprint raises
+`IdempotencyConflict`.
+
+Turns started by a signed-in user record that user as their `owner`;
+only the owner may resume them (see the chat routes).  Guest turns have
+no owner, and their random UUID acts as a capability: anyone holding it
+can replay that turn's events.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import logging
+import os
+import time
+import uuid
+from collections import OrderedDict, deque
+from collections.abc import AsyncIterator
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+DONE = "[DONE]"
+
+_MAX_EVENTS = int(os.getenv("CHAT_EVENT_LOG_MAX_EVENTS", "4096"))
+_MAX_TURNS = int(os.getenv("CHAT_EVENT_LOG_MAX_TURNS", "1024"))
+_TTL_SECONDS = float(os.getenv("CHAT_EVENT_LOG_TTL_SECONDS", "900"))
+_POSTGRES = os.getenv("CHAT_EVENT_LOG_POSTGRES") == "1"
+_IDEMPOTENCY_TTL_SECONDS = float(os.getenv("CHAT_IDEMPOTENCY_TTL_SECONDS", "300"))
+_POLL_SECONDS = float(os.getenv("CHAT_EVENT_LOG_POLL_SECONDS", "0.5"))
+_FOLLOW_TIMEOUT_SECONDS = float(os.getenv("CHAT_EVENT_LOG_FOLLOW_TIMEOUT_SECONDS", "120"))
+_RETENTION_HOURS = float(os.getenv("CHAT_EVENT_LOG_RETENTION_HOURS", "24"))
+_PG_FLUSH_EVERY = 64
+
+
+class EventsEvicted(Exception):
+    """The requested events have already been dropped from the ring buffer."""
+
+
+class IdempotencyConflict(Exception):
+    """An idempotency key was reused for a different request."""
+
+
+class TurnLog:
+    """Sequenced, bounded event buffer for one chat turn."""
+
+    def __init__(self, turn_id: str, max_events: int = _MAX_EVENTS, owner: str | None = None):
+        self.turn_id = turn_id
+        self.owner = owner
+        self.finished = False
+        self.updated_at = time.monotonic()
+        self.task: asyncio.Task | None = None
+        self._events: deque[tuple[int, str]] = deque(maxlen=max_events)
+        self._last_seq = 0
+        self._cond = asyncio.Condition()
+        self._unflushed: list[tuple[int, str]] = []
+
+    @property
+    def last_seq(self) -> int:
+        return self._last_seq
+
+    @property
+    def first_seq(self) -> int:
+        return self._events[0][0] if self._events else self._last_seq + 1
+
+    async def append(self, data: str) -> int:
+        async with self._cond:
+            self._last_seq += 1
+            self._events.append((self._last_seq, data))
+            self.updated_at = time.monotonic()
+            self._cond.notify_all()
+            seq = self._last_seq
+
+        if _POSTGRES:
+            self._unflushed.append((seq, data))
+            if len(self._unflushed) >= _PG_FLUSH_EVERY:
+                await self._flush()
+        return seq
+
+    async def finish(self) -> None:
+        async with self._cond:
+            self.finished = True
+            self.updated_at = time.monotonic()
+            self._cond.notify_all()
+        if _POSTGRES:
+            await self._flush(finished=True)
+
+    async def _extend(self, events: list[tuple[int, str]], finished: bool) -> None:
+        """Add events read back from Postgres (they are not written again)."""
+        async with self._cond:
+            for seq, data in events:
+                if seq > self._last_seq:
+                    self._events.append((seq, data))
+                    self._last_seq = seq
+            self.finished = finished
+            self.updated_at = time.monotonic()
+            self._cond.notify_all()
+
+    async def subscribe(self, after: int = 0) -> AsyncIterator[tuple[int, str]]:
+        """
+        Yield (seq, data) for every event after `after`, live, until the turn
+        finishes.  Raises `EventsEvicted` if events after `after` are gone.
+        """
+        next_seq = after + 1
+        while True:
+            async with self._cond:
+                await self._cond.wait_for(lambda seq=next_seq: self._last_seq >= seq or self.finished)
+                if next_seq < self.first_seq:
+                    raise EventsEvicted(
+                        f"turn {self.turn_id}: events before {self.first_seq} were evicted"
+                    )
+                start = next_seq - self.first_seq
+                batch = list(itertools.islice(self._events, start, None))
+                done = self.finished
+
+            for seq, data in batch:
+                yield seq, data
+                next_seq = seq + 1
+            if done:
+                return
+
+    async def _flush(self, finished: bool = False) -> None:
+        rows, self._unflushed = self._unflushed, []
+        if not rows and not finished:
+            return
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(None, _pg_write, self.turn_id, self.owner, rows, finished)
+        except Exception:
+            logger.exception("Failed to persist events for chat turn %s", self.turn_id)
+
+
+class TurnEventStore:
+    """In-memory tier: recent TurnLogs by turn id."""
+
+    def __init__(
+        self,
+        max_turns: int = _MAX_TURNS,
+        ttl_seconds: float = _TTL_SECONDS,
+        idempotency_ttl_seconds: float = _IDEMPOTENCY_TTL_SECONDS,
+    ):
+        self.max_turns = max_turns
+        self.ttl_seconds = ttl_seconds
+        self.idempotency_ttl_seconds = idempotency_ttl_seconds
+        self._turns: OrderedDict[str, TurnLog] = OrderedDict()
+        # idempotency key -> (turn id, request fingerprint)
+        self._keys: dict[str, tuple[str, str]] = {}
+
+    def create(
+        self, idempotency_key: str | None = None, fingerprint: str = "", owner: str | None = None,
+    ) -> tuple[TurnLog, bool]:
+        """
+        Return (log, created).  `created` is False when `idempotency_key`
+        matched a running or recently finished turn, which is returned instead.
+        """
+        self._evict()
+        if idempotency_key is not None:
+            existing = self._keys.get(idempotency_key)
+            if existing is not None:
+                turn_id, known_fingerprint = existing
+                if known_fingerprint != fingerprint:
+                    raise IdempotencyConflict(idempotency_key)
+                return self._turns[turn_id], False
+
+        log = TurnLog(str(uuid.uuid4()), owner=owner)
+        self._turns[log.turn_id] = log
+        if idempotency_key is not None:
+            self._keys[idempotency_key] = (log.turn_id, fingerprint)
+        return log, True
+
+    async def get(self, turn_id: str) -> TurnLog | None:
+        log = self._turns.get(turn_id)
+        if log is None and _POSTGRES:
+            log = await _pg_load(turn_id)
+            if log is not None:
+                self._evict()
+                self._turns[turn_id] = log
+                if not log.finished:
+                    log.task = asyncio.create_task(_pg_follow(log))
+        return log
+
+    def _evict(self) -> None:
+        now = time.monotonic()
+        expired = [
+            turn_id for turn_id, log in self._turns.items()
+            if log.finished and now - log.updated_at > self.ttl_seconds
+        ]
+        for turn_id in expired:
+            del self._turns[turn_id]
+
+        # Oldest finished turns go first once the store is full.
+        overflow = len(self._turns) - self.max_turns + 1
+        if overflow > 0:
+            for turn_id in [t for t, log in self._turns.items() if log.finished][:overflow]:
+                del self._turns[turn_id]
+
+        stale_keys = [
+            key for key, (turn_id, _) in self._keys.items()
+            if turn_id not in self._turns
+            or (
+                self._turns[turn_id].finished
+                and now - self._turns[turn_id].updated_at > self.idempotency_ttl_seconds
+            )
+        ]
+        for key in stale_keys:
+            del self._keys[key]
+
+
+# ---------------------------------------------------------------------------
+# Postgres tier
+# ---------------------------------------------------------------------------
+
+def _pg_write(turn_id: str, owner: str | None, rows: list[tuple[int, str]], finished: bool) -> None:
+    from sqlalchemy import func
+    from sqlalchemy.dialects.postgresql import insert
+
+    from app.core.db import SessionLocal
+    from app.models.chat_turn_event import ChatTurn, ChatTurnEvent
+
+    turn = insert(ChatTurn).values(
+        turn_id=uuid.UUID(turn_id), owner_uid=owner, finished_at=func.now() if finished else None,
+    )
+    with SessionLocal() as db:
+        if rows:
+            db.execute(
+                insert(ChatTurnEvent)
+                .values([{"turn_id": uuid.UUID(turn_id), "seq": seq, "data": data} for seq, data in rows])
+                .on_conflict_do_nothing(index_elements=["turn_id", "seq"])
+            )
+        # Same transaction as the last events: a reader that sees the turn
+        # finished also sees all of its events.
+        if finished:
+            db.execute(turn.on_conflict_do_update(
+                index_elements=["turn_id"], set_={"finished_at": turn.excluded.finished_at},
+            ))
+        else:
+            db.execute(turn.on_conflict_do_nothing(index_elements=["turn_id"]))
+        db.commit()
+
+
+def _pg_read(turn_id: str, after: int, limit: int) -> tuple[str | None, bool, list[tuple[int, str]]] | None:
+    """
+    (owner, finished, the last `limit` events after `after`) of a persisted
+    turn, or None if it has no events.  Completion is read before the
+    events, so a finished turn's events are complete.
+    """
+    from sqlalchemy import select
+
+    from app.core.db import SessionLocal
+    from app.models.chat_turn_event import ChatTurn, ChatTurnEvent
+
+    with SessionLocal() as db:
+        turn = db.execute(
+            select(ChatTurn.owner_uid, ChatTurn.finished_at).where(ChatTurn.turn_id == uuid.UUID(turn_id))
+        ).first()
+        rows = db.execute(
+            select(ChatTurnEvent.seq, ChatTurnEvent.data)
+            .where(ChatTurnEvent.turn_id == uuid.UUID(turn_id), ChatTurnEvent.seq > after)
+            .order_by(ChatTurnEvent.seq.desc())
+            .limit(limit)
+        ).all()
+    if turn is None and not rows:
+        return None
+    events = [(seq, data) for seq, data in reversed(rows)]
+    if turn is None:
+        return None, True, events  # persisted before turns were tracked
+    return turn.owner_uid, turn.finished_at is not None, events
+
+
+async def _pg_load(turn_id: str) -> TurnLog | None:
+    """
+    Rebuild a turn from Postgres.  If it is not marked finished its
+    producer is still running (possibly on another worker) and the caller
+    follows it with `_pg_follow`.
+    """
+    try:
+        uuid.UUID(turn_id)
+    except ValueError:
+        return None
+    loop = asyncio.get_running_loop()
+    try:
+        found = await loop.run_in_executor(None, _pg_read, turn_id, 0, _MAX_EVENTS)
+    except Exception:
+        logger.exception("Failed to load events for chat turn %s", turn_id)
+        return None
+    if found is None:
+        return None
+
+    owner, finished, rows = found
+    log = TurnLog(turn_id, owner=owner)
+    await log._extend(rows, finished)
+    return log
+
+
+async def _pg_follow(log: TurnLog) -> None:
+    """Poll Postgres for new events of `log` until its producer marks it finished."""
+    loop = asyncio.get_running_loop()
+    last_progress = time.monotonic()
+    while not log.finished:
+        await asyncio.sleep(_POLL_SECONDS)
+        try:
+            found = await loop.run_in_executor(None, _pg_read, log.turn_id, log.last_seq, _MAX_EVENTS)
+        except Exception:
+            logger.exception("Failed to poll events for chat turn %s", log.turn_id)
+            found = None
+        _, finished, rows = found if found is not None else (None, False, [])
+
+        if rows:
+            last_progress = time.monotonic()
+        elif not finished and time.monotonic() - last_progress > _FOLLOW_TIMEOUT_SECONDS:
+            logger.warning("Chat turn %s: no events for %.0fs, giving up", log.turn_id, _FOLLOW_TIMEOUT_SECONDS)
+            finished = True
+        await log._extend(rows, finished)
+
+
+def prune(db: Session, retention_hours: float = _RETENTION_HOURS) -> int:
+    """Delete persisted turns (and their events) older than `retention_hours`; returns turns deleted."""
+    from datetime import datetime, timedelta, timezone
+
+    from sqlalchemy import delete
+
+    from app.models.chat_turn_event import ChatTurn, ChatTurnEvent
+
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=retention_hours)
+    db.execute(delete(ChatTurnEvent).where(ChatTurnEvent.created_at < cutoff))
+    return db.execute(delete(ChatTurn).where(ChatTurn.created_at < cutoff)).rowcount
+
+
+_store = TurnEventStore()
+
+
+def get_turn_store() -> TurnEventStore:
+    return _store
+
+
+def main() -> None:
+    from app.core.db import SessionLocal
+
+    logging.basicConfig(level=logging.INFO)
+    with SessionLocal() as db:
+        pruned = prune(db)
+        db.commit()
+    logger.info("Pruned %d chat turns older than %sh", pruned, _RETENTION_HOURS)
+
+
+if __name__ == "__main__":
+    main()
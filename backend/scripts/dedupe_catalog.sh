@@ -0,0 +1,6 @@
+#! /usr/bin/env bash
+
+set -e
+set -x
+
+python -m app.services.catalog_dedupe "$@"
@@ -0,0 +1,54 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.routes import llm
+from app.core.config import settings
+
+
+class FakeEngine:
+    def __init__(self, calls: list[list[tuple[str, str | None]]]):
+        self.calls = calls
+
+    def generate_batch(self, prompts, max_new_tokens=256, temperature=0.7):
+        self.calls.append(prompts)
+        if any(prompt == "boom" for prompt, _ in prompts):
+            raise RuntimeError("out of memory")
+        return [f"{prompt}!" for prompt, _ in prompts]
+
+
+def test_plan_batches_groups_settings_in_submission_order(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(llm, "_BATCH_SIZE", 2)
+    reqs = [
+        llm.GenerateRequest(prompt="a"),
+        llm.GenerateRequest(prompt="b", max_tokens=32),
+        llm.GenerateRequest(prompt="c"),
+        llm.GenerateRequest(prompt="d"),
+    ]
+    assert llm._plan_batches(reqs) == [[0, 2], [3], [1]]
+
+
+def test_generate_batch_streams_ndjson(client: TestClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    calls: list[list[tuple[str, str | None]]] = []
+    monkeypatch.setattr(llm, "get_engine", lambda model: FakeEngine(calls))
+    r = client.post(
+        f"{settings.API_V1_STR}/llm/generate/batch",
+        json=[
+            {"prompt": "hi", "system": "be brief"},
+            {"prompt": "boom", "max_tokens": 16},
+            {"prompt": "yo"},
+        ],
+    )
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("application/x-ndjson")
+
+    results = {line["index"]: line for line in map(json.loads, r.text.splitlines())}
+    assert calls == [[("hi", "be brief"), ("yo", None)], [("boom", None)]]
+    assert results[0]["output_text"] == "hi!" and results[2]["output_text"] == "yo!"
+    assert results[1]["output_text"] is None and results[1]["error"] == "out of memory"
+
+
+def test_generate_batch_rejects_an_empty_list(client: TestClient) -> None:
+    r = client.post(f"{settings.API_V1_STR}/llm/generate/batch", json=[])
+    assert r.status_code == 422
@@ -0,0 +1,153 @@
+from collections.abc import Generator
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import select, text, update
+from sqlmodel import Session
+
+from app.crud.price_history import (
+    PricePoint,
+    PriceWindow,
+    lowest_in,
+    price_trend,
+    price_window,
+    window_start,
+)
+from app.models import Listing, ListingPriceHistory, ListingPriceRollup, PCPart
+from app.services.price_history import ensure_partitions
+
+_NOW = datetime(2026, 10, 19, 14, 37, 5, tzinfo=timezone.utc)
+
+
+def test_window_start_covers_whole_buckets() -> None:
+    assert window_start(_NOW, "day", timedelta(days=30)) == datetime(2026, 9, 19, tzinfo=timezone.utc)
+    assert window_start(_NOW, "hour", timedelta(hours=6)) == datetime(2026, 10, 19, 8, tzinfo=timezone.utc)
+
+
+def test_window_start_is_in_utc() -> None:
+    local = _NOW.astimezone(timezone(timedelta(hours=-7)))
+    assert window_start(local, "day", timedelta(days=1)) == datetime(2026, 10, 18, tzinfo=timezone.utc)
+
+
+def test_is_lowest() -> None:
+    def window(current, low):
+        return PriceWindow(_NOW, "USD", current, low, None, None, 0)
+
+    assert window(49_900, 49_900).is_lowest
+    assert not window(52_900, 49_900).is_lowest
+    assert not window(None, 49_900).is_lowest
+
+
+@pytest.fixture()
+def part(db: Session) -> Generator[PCPart, None, None]:
+    part = PCPart(name="Price history test part", part_type="part")
+    db.add(part)
+    db.flush()
+    yield part
+    # The triggers and partition DDL all run in this transaction.
+    db.rollback()
+
+
+def _listing(db: Session, part: PCPart, price: int | None, currency: str | None = "USD") -> Listing:
+    listing = Listing(part_id=part.id, marketplace="amazon", price_amount=price, currency=currency)
+    db.add(listing)
+    db.flush()
+    return listing
+
+
+def _set(db: Session, listing: Listing, **values) -> None:
+    db.execute(update(Listing).where(Listing.id == listing.id).values(**values))
+
+
+def _history(db: Session, listing: Listing) -> list[tuple]:
+    return db.execute(
+        select(ListingPriceHistory.price_amount, ListingPriceHistory.previous_amount)
+        .where(ListingPriceHistory.listing_id == listing.id)
+        .order_by(ListingPriceHistory.id)
+    ).all()
+
+
+def _bucket(db: Session, granularity: str) -> datetime:
+    return db.scalar(
+        text("SELECT date_trunc(:g, now() AT TIME ZONE 'UTC') AT TIME ZONE 'UTC'"), {"g": granularity},
+    )
+
+
+def test_trigger_records_only_price_changes(db: Session, part: PCPart) -> None:
+    listing = _listing(db, part, 10_000)
+    for price in (10_000, 9_000, None):
+        _set(db, listing, price_amount=price)
+    _set(db, listing, is_active=False)
+
+    assert _history(db, listing) == [(10_000, None), (9_000, 10_000)]
+    assert _history(db, _listing(db, part, None)) == []
+
+
+def test_trigger_upserts_hour_and_day_rollups(db: Session, part: PCPart) -> None:
+    listing = _listing(db, part, 10_000, currency=None)
+    for price in (9_000, 12_000):
+        _set(db, listing, price_amount=price)
+
+    R = ListingPriceRollup
+    rows = db.execute(
+        select(R.granularity, R.currency, R.bucket_start, R.min_price, R.max_price, R.sum_price, R.observations)
+        .where(R.listing_id == listing.id)
+        .order_by(R.granularity)
+    ).all()
+    assert rows == [
+        ("day", "USD", _bucket(db, "day"), 9_000, 12_000, 31_000, 3),
+        ("hour", "USD", _bucket(db, "hour"), 9_000, 12_000, 31_000, 3),
+    ]
+
+
+def test_ensure_partitions_moves_rows_out_of_the_default(db: Session, part: PCPart) -> None:
+    listing = _listing(db, part, 10_000)
+    # A month no maintenance run has partitioned yet.
+    months_ahead = 24
+    now = datetime.now(timezone.utc)
+    month = datetime(now.year + 2, now.month, 1, tzinfo=timezone.utc)
+    partition = f"listing_price_history_{month:%Y_%m}"
+    db.execute(text(f"DROP TABLE IF EXISTS {partition}"))
+    row_id = db.scalar(
+        text("""
+            INSERT INTO listing_price_history (recorded_at, listing_id, price_amount, currency)
+            VALUES (:at, :listing_id, 8000, 'USD') RETURNING id
+        """),
+        {"at": month + timedelta(days=3), "listing_id": listing.id},
+    )
+
+    def table_of_row() -> str:
+        return db.scalar(
+            text("SELECT tableoid::regclass::text FROM listing_price_history WHERE id = :id"), {"id": row_id},
+        )
+
+    assert table_of_row() == "listing_price_history_default"
+    assert ensure_partitions(db, months_ahead) >= 1
+    assert table_of_row() == partition
+
+
+def test_price_window_and_trend(db: Session, part: PCPart) -> None:
+    first = _listing(db, part, 10_000)
+    second = _listing(db, part, 11_000)
+    _set(db, second, price_amount=9_500)
+    _listing(db, part, 7_000, currency="EUR")
+
+    today = _bucket(db, "day")
+    for days_ago, price in ((5, 8_000), (40, 6_000)):
+        db.add(ListingPriceRollup(
+            listing_id=first.id, granularity="day", currency="USD", bucket_start=today - timedelta(days=days_ago),
+            min_price=price, max_price=price, sum_price=price, observations=1,
+        ))
+    db.flush()
+
+    trend = price_trend(db, part.id, "day")
+    assert trend == [
+        PricePoint(today - timedelta(days=5), 8_000, 8_000, 8_000.0, 1),
+        PricePoint(today, 9_500, 11_000, 30_500 / 3, 3),
+    ]
+    window = price_window(db, part.id)
+    assert (window.current_price, window.low, window.high, window.observations) == (9_500, 8_000, 11_000, 4)
+    assert window.avg_price == 38_500 / 4
+    assert not window.is_lowest
+    assert lowest_in(db, part.id, timedelta(days=2)) == 9_500
+    assert price_window(db, part.id, currency="EUR").low == 7_000
@@ -0,0 +1,122 @@
+import json
+import uuid
+from collections.abc import Generator
+
+import pytest
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from app.importers.parts import (
+    ImportStats,
+    _assignments,
+    _CopyStream,
+    _staging_rows,
+    import_parts,
+)
+from app.models.pcparts import Fan, PCPart
+
+_RECORDS = [
+    {"part_type": "cpu", "manufacturer": "AMD", "model_number": "100-100001015BOX", "cores": 8},
+    {"part_type": "cpu", "manufacturer": "AMD", "model_number": ""},
+    {"part_type": "toaster", "manufacturer": "Acme", "model_number": "T1"},
+    {"part_type": "cpu", "manufacturer": "Intel", "model_number": "BX8071514600K", "name": "Core i5-14600K"},
+]
+
+
+def test_staging_rows_skip_incomplete_and_unknown_records() -> None:
+    stats = ImportStats()
+    rows = list(_staging_rows(_RECORDS, {"cpu", "gpu"}, stats))
+
+    assert [row[:3] for row in rows] == [
+        ("cpu", "AMD", "100-100001015BOX"), ("cpu", "Intel", "BX8071514600K"),
+    ]
+    assert json.loads(rows[1][3]) == _RECORDS[3]
+    assert (stats.staged, stats.skipped) == (2, 2)
+    assert stats.skipped_examples[1] == (
+        "record 3: {'part_type': 'toaster', 'manufacturer': 'Acme', 'model_number': 'T1'}"
+    )
+
+
+def test_copy_stream_escapes_text_format_in_any_chunk_size() -> None:
+    stream = _CopyStream(iter([("cpu", "a\tb", None), ("gpu", "c\\d\ne", "f")]))
+    chunks = iter(lambda: stream.read(5), b"")
+    assert b"".join(chunks) == b"cpu\ta\\tb\t\\N\ngpu\tc\\\\d\\ne\tf\n"
+
+
+def test_assignments_only_touch_columns_in_the_record() -> None:
+    set_list, changed = _assignments(["cores", "tdp_watts"], "c")
+    assert set_list == (
+        '"cores" = CASE WHEN d.data ? \'cores\' THEN r."cores" ELSE c."cores" END, '
+        '"tdp_watts" = CASE WHEN d.data ? \'tdp_watts\' THEN r."tdp_watts" ELSE c."tdp_watts" END'
+    )
+    assert changed == (
+        'c."cores" IS DISTINCT FROM CASE WHEN d.data ? \'cores\' THEN r."cores" ELSE c."cores" END OR '
+        'c."tdp_watts" IS DISTINCT FROM CASE WHEN d.data ? \'tdp_watts\' THEN r."tdp_watts" '
+        'ELSE c."tdp_watts" END'
+    )
+    assert _assignments([], "c") == ("", "false")
+
+
+@pytest.fixture()
+def manufacturer(db: Session) -> Generator[str, None, None]:
+    """A manufacturer no other part has; its parts are deleted afterwards."""
+    name = f"Import test {uuid.uuid4().hex[:8]}"
+    yield name
+    db.rollback()
+    db.execute(delete(PCPart).where(PCPart.manufacturer == name))
+    db.commit()
+
+
+def _fan(db: Session, manufacturer: str, model_number: str, **values) -> Fan:
+    fan = Fan(name=model_number, manufacturer=manufacturer, model_number=model_number, size_mm=120, **values)
+    db.add(fan)
+    db.flush()
+    return fan
+
+
+def _fans(db: Session, manufacturer: str) -> dict[str, tuple]:
+    rows = db.execute(
+        select(Fan.model_number, Fan.name, Fan.size_mm, Fan.airflow_cfm, Fan.is_active)
+        .where(Fan.manufacturer == manufacturer)
+    ).all()
+    return {model_number: tuple(rest) for model_number, *rest in rows}
+
+
+def test_import_inserts_updates_and_deactivates(db: Session, manufacturer: str) -> None:
+    kept = _fan(db, manufacturer, "F-KEPT", airflow_cfm=50.0)
+    _fan(db, manufacturer, "F-INACTIVE", is_active=False)
+    _fan(db, manufacturer, "F-MISSING")
+    _fan(db, manufacturer, "F-MERGED", airflow_cfm=10.0, is_active=False, merged_into_id=kept.id)
+    db.commit()
+
+    def fan(model_number: str, **values) -> dict:
+        return {"part_type": "fan", "manufacturer": manufacturer, "model_number": model_number, **values}
+
+    records = [
+        fan("F-NEW", size_mm=140, airflow_cfm=70.0),
+        fan("F-KEPT", airflow_cfm=60.0),
+        fan("F-INACTIVE"),
+        fan("F-MERGED", airflow_cfm=99.0),
+        fan("F-NEW", size_mm=140, airflow_cfm=72.0),  # last record per key wins
+    ]
+    stats = import_parts(db, records, deactivate_missing=True)
+
+    assert _fans(db, manufacturer) == {
+        "F-NEW": (f"{manufacturer} F-NEW", 140, 72.0, True),
+        "F-KEPT": ("F-KEPT", 120, 60.0, True),
+        "F-INACTIVE": ("F-INACTIVE", 120, None, True),
+        "F-MISSING": ("F-MISSING", 120, None, False),
+        "F-MERGED": ("F-MERGED", 120, 10.0, False),
+    }
+    assert (stats.staged, stats.skipped, stats.merged) == (5, 0, 1)
+    assert stats.inserted == stats.updated == stats.specs_updated == {"fan": 1}
+    assert stats.deactivated["fan"] >= 1
+
+    # The same dump again changes nothing; without deactivate_missing,
+    # parts missing from it are left alone.
+    _fan(db, manufacturer, "F-ADDED")
+    db.commit()
+    stats = import_parts(db, records)
+    assert stats.inserted == stats.updated == stats.specs_updated == {"fan": 0}
+    assert stats.deactivated == {}
+    assert _fans(db, manufacturer)["F-ADDED"][-1] is True
@@ -0,0 +1,33 @@
+import io
+
+import pytest
+
+from app.importers import readers
+from app.importers.readers import read_csv, read_json_array, read_ndjson
+
+
+def test_json_array_is_streamed_across_chunk_boundaries(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(readers, "_CHUNK_SIZE", 7)
+    text = '[ {"a": 1, "b": "x, y"},\n {"a": 2, "nested": {"c": [1, 2]}} ,{"a": 3} ]'
+    assert list(read_json_array(io.StringIO(text))) == [
+        {"a": 1, "b": "x, y"}, {"a": 2, "nested": {"c": [1, 2]}}, {"a": 3},
+    ]
+    assert list(read_json_array(io.StringIO("[]"))) == []
+
+
+def test_json_array_rejects_non_arrays() -> None:
+    with pytest.raises(ValueError):
+        list(read_json_array(io.StringIO('{"a": 1}')))
+    with pytest.raises(ValueError):
+        list(read_json_array(io.StringIO('[{"a": 1}')))
+
+
+def test_csv_decodes_empty_and_json_cells() -> None:
+    text = 'part_type,socket,supported_sockets,notes\ncpucooler,,"[""AM4"", ""AM5""]",[not json\n'
+    assert list(read_csv(io.StringIO(text))) == [
+        {"part_type": "cpucooler", "socket": None, "supported_sockets": ["AM4", "AM5"], "notes": "[not json"},
+    ]
+
+
+def test_ndjson_skips_blank_lines() -> None:
+    assert list(read_ndjson(io.StringIO('{"a": 1}\n\n{"a": 2}\n'))) == [{"a": 1}, {"a": 2}]
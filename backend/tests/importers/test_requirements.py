@@ -0,0 +1,61 @@
+from app.importers.requirements import PartResolver, _batches, slugify
+
+
+def _resolver() -> PartResolver:
+    return PartResolver([
+        ("cpu-1", "cpu", "Intel Core i7-6700", "Intel", "BX80662I76700"),
+        ("cpu-2", "cpu", "Ryzen 5 3600", "AMD", "100-100000031BOX"),
+        ("gpu-1", "gpu", "GeForce GTX 1060 6GB", "NVIDIA", None),
+        ("ram-1", "ram", "Vengeance 16GB", "Corsair", None),
+    ])
+
+
+def test_resolves_names_with_and_without_manufacturer() -> None:
+    resolver = _resolver()
+    assert resolver.resolve("cpu", "Core i7-6700") == "cpu-1"
+    assert resolver.resolve("cpu", "Intel Core i7-6700") == "cpu-1"
+    assert resolver.resolve("cpu", "AMD Ryzen 5 3600") == "cpu-2"
+    assert resolver.resolve("gpu", "NVIDIA GeForce GTX 1060 6GB") == "gpu-1"
+
+
+def test_resolution_is_scoped_to_the_role() -> None:
+    resolver = _resolver()
+    assert resolver.resolve("gpu", "Core i7-6700") is None
+    assert resolver.resolve("cpu", "Vengeance 16GB") is None
+
+
+def test_resolves_by_model_number() -> None:
+    assert _resolver().resolve("cpu", "BX80662I76700") == "cpu-1"
+
+
+def test_near_misses_are_not_linked() -> None:
+    resolver = PartResolver([
+        ("4090", "gpu", "GeForce RTX 4090", "NVIDIA", None),
+        ("1060-6", "gpu", "GeForce GTX 1060 6GB", "NVIDIA", None),
+        ("i7", "cpu", "Core i7-6700", "Intel", None),
+    ])
+    assert resolver.resolve("gpu", "GeForce RTX 4060") is None
+    assert resolver.resolve("gpu", "GTX 1060 3GB") is None
+    assert resolver.resolve("cpu", "Core i3-6700") is None
+    assert resolver.resolve("gpu", "GeForce GTX 1060") is None
+    assert resolver.near_miss("gpu", "GeForce GTX1060 6 GB") == "GeForce GTX 1060 6GB"
+
+
+def test_ambiguous_names_are_not_linked() -> None:
+    resolver = PartResolver([
+        ("a", "gpu", "Radeon RX 7600", "AMD", None),
+        ("b", "gpu", "Radeon RX 7600", "AMD", None),
+    ])
+    assert resolver.resolve("gpu", "Radeon RX 7600") is None
+
+
+def test_first_matching_alternative_wins() -> None:
+    resolver = _resolver()
+    assert resolver.resolve("cpu", "Intel Core i7-6700 / AMD Ryzen 5 3600") == "cpu-1"
+    assert resolver.resolve("cpu", "Pentium 4 / Ryzen 5 3600") == "cpu-2"
+    assert resolver.resolve("cpu", "Pentium 4 / Athlon 64") is None
+
+
+def test_batches_and_slugs() -> None:
+    assert [len(b) for b in _batches(({"n": i} for i in range(7)), 3)] == [3, 3, 1]
+    assert slugify("Baldur's Gate III") == "baldurs-gate-3"
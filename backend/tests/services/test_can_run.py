@@ -0,0 +1,56 @@
+import numpy as np
+
+from app.services.can_run import highest_tiers
+
+nan = np.nan
+
+
+def test_highest_tier_met_per_game() -> None:
+    # metrics: cpu_single, cpu_multi, gpu_raster, ram_gb; tiers: min, rec, ultra
+    required = np.array([
+        [[80, nan, 60, 8], [100, nan, 100, 16], [120, nan, 150, 32]],
+        [[150, nan, 60, 8], [nan, nan, nan, nan], [nan, nan, nan, nan]],
+        [[nan, nan, 200, nan], [nan, nan, 250, nan], [nan, nan, nan, nan]],
+    ], dtype=float)
+    has_tier = np.array([
+        [True, True, True],
+        [True, False, False],
+        [True, True, False],
+    ])
+    build = np.array([110, 100, 160, 16], dtype=float)
+
+    highest, short = highest_tiers(required, has_tier, build)
+    assert highest.tolist() == [1, -1, -1]
+    # Game 0 misses ultra on CPU and RAM only.
+    assert short[0, 2].tolist() == [True, False, False, True]
+
+
+def test_missing_part_fails_only_tiers_that_need_it() -> None:
+    required = np.array([[[nan, nan, nan, 8], [nan, nan, 100, 8]]], dtype=float)
+    has_tier = np.array([[True, True]])
+    build = np.array([100, 100, nan, 16], dtype=float)  # no GPU
+    highest, _ = highest_tiers(required, has_tier, build)
+    assert highest.tolist() == [0]
+
+
+def test_unverifiable_tiers_are_not_met() -> None:
+    required = np.array([[[200, nan, 300, 32], [nan] * 4, [nan] * 4]], dtype=float)
+    has_tier = np.array([[True, True, True]])
+    build = np.array([50, 50, 40, 8], dtype=float)
+    highest, _ = highest_tiers(required, has_tier, build)
+    assert highest.tolist() == [-1]
+
+    # Minimum met, recommended names a GPU with no index.
+    required = np.array([[[40, nan, 30, 8], [nan, nan, nan, 16], [nan] * 4]], dtype=float)
+    unverifiable = np.array([[False, True, False]])
+    highest, _ = highest_tiers(required, np.array([[True, True, False]]), build, unverifiable)
+    assert highest.tolist() == [0]
+
+
+def test_tiers_above_a_failed_tier_are_not_met() -> None:
+    required = np.array([[[100, nan, 50, 8], [nan, nan, 60, 8]]], dtype=float)
+    has_tier = np.array([[True, True]])
+    build = np.array([50, 50, 80, 16], dtype=float)
+    highest, short = highest_tiers(required, has_tier, build)
+    assert highest.tolist() == [-1]
+    assert not short[0, 1].any()
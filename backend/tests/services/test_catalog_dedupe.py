@@ -0,0 +1,53 @@
+from datetime import datetime
+
+import numpy as np
+
+from app.services.catalog_dedupe import (
+    CatalogPart,
+    candidate_pairs,
+    find_duplicates,
+    minhash_signatures,
+    shingles,
+)
+
+_RTX_5070 = {"chipset": "GB205", "brand": "nvidia", "vram_gb": 12, "tdp_watts": 250, "length_mm": None}
+
+
+def _gpu(part_id: str, name: str, manufacturer: str | None = "NVIDIA", **specs) -> CatalogPart:
+    return CatalogPart(
+        id=part_id, part_type="gpu", name=name, manufacturer=manufacturer,
+        created_at=datetime(2025, 1, int(part_id[-1]) + 1), specs={**_RTX_5070, **specs},
+    )
+
+
+def test_shingles_drop_manufacturer_words() -> None:
+    part = CatalogPart(id=1, part_type="gpu", name="NVIDIA GeForce RTX 5070 12GB",
+                       manufacturer="NVIDIA", model_number="900-1G141")
+    assert shingles(part) == {"geforce", "rtx", "5070", "12gb", "model:9001g141"}
+
+
+def test_signature_similarity_tracks_jaccard() -> None:
+    sets = [{f"t{i}" for i in range(100)}, {f"t{i}" for i in range(50, 150)}, set()]
+    signatures = minhash_signatures(sets, num_hashes=512)
+    assert abs(np.mean(signatures[0] == signatures[1]) - 1 / 3) < 0.08
+    # Identical sets always collide; empty sets never do.
+    assert (0, 1) not in candidate_pairs(minhash_signatures([{"a"}, set(), {"b"}]))
+    assert (0, 1) in candidate_pairs(minhash_signatures([{"x", "y"}, {"x", "y"}]))
+
+
+def test_proposes_merge_into_most_complete_part() -> None:
+    parts = [
+        _gpu("p0", "RTX 5070", manufacturer=None),
+        _gpu("p1", "NVIDIA GeForce RTX 5070 12GB", length_mm=242),
+        _gpu("p2", "GeForce RTX 5070 Ti", chipset="GB203", vram_gb=16, tdp_watts=300),
+    ]
+    [proposal] = find_duplicates(parts)
+    assert (proposal.keep_id, proposal.duplicate_id) == ("p1", "p0")
+    assert proposal.spec_agreement == 1.0 and proposal.compared == 4
+
+
+def test_conflicting_manufacturer_or_model_is_not_a_duplicate() -> None:
+    assert find_duplicates([_gpu("p0", "RTX 5070 Ventus"), _gpu("p1", "RTX 5070 Ventus", manufacturer="MSI")]) == []
+    left, right = _gpu("p0", "RTX 5070"), _gpu("p1", "RTX 5070")
+    left.model_number, right.model_number = "A-1", "B-2"
+    assert find_duplicates([left, right]) == []
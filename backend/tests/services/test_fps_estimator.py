@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+
+from app.services.fps_estimator import (
+    FpsEstimator,
+    PartIndices,
+    build_game_profiles,
+    gaming_target,
+)
+
+
+def _parts(primary: list[float], prices: list[float]) -> PartIndices:
+    return PartIndices(
+        ids=[f"p{i}" for i in range(len(primary))],
+        price_cents=np.array(prices, dtype=float),
+        primary=np.array(primary, dtype=float),
+        secondary=np.full(len(primary), np.nan),
+    )
+
+
+def _estimator(anchors=None) -> FpsEstimator:
+    cpus = _parts([80, 100, 140], [15000, 25000, 45000])
+    gpus = _parts([50, 100, 200, np.nan], [20000, 40000, 90000, 10000])
+    games = build_game_profiles([("g1", "aaa_open_world"), ("g2", "competitive_fps")], anchors)
+    return FpsEstimator(cpus, gpus, games)
+
+
+def test_estimate_shape_and_monotonicity() -> None:
+    fps = _estimator().estimate()
+    assert fps.shape == (2, 3, 3, 4)
+    # Faster GPU → more fps; higher resolution → fewer fps.
+    assert fps[0, 0, 1, 2] > fps[0, 0, 1, 1] > fps[0, 0, 1, 0]
+    assert fps[0, 0, 1, 1] > fps[0, 1, 1, 1] > fps[0, 2, 1, 1]
+    # Unknown index → NaN.
+    assert np.isnan(fps[0, 0, 0, 3])
+
+
+def test_calibration_hits_tier_target() -> None:
+    anchors = {"g1": {"gpu": (100.0, np.nan, 60.0), "cpu": (100.0, np.nan, 60.0)}}
+    fps = _estimator(anchors).estimate(["g1"])
+    # Median CPU + median GPU are the anchors: together they hit 60.
+    assert fps[0, 0, 1, 1] == pytest.approx(60, rel=1e-6)
+
+
+def test_calibration_of_mixed_tiers_hits_the_lower_target() -> None:
+    anchors = {"g1": {"gpu": (100.0, np.nan, 60.0), "cpu": (100.0, np.nan, 90.0)}}
+    fps = _estimator(anchors).estimate(["g1"])
+    assert fps[0, 0, 1, 1] == pytest.approx(60, rel=1e-6)
+
+
+def test_rank_pairs_respects_target_and_budget() -> None:
+    est = _estimator()
+    pairs = est.rank_pairs(["g1", "g2"], "1440p", target_fps=60, max_price_cents=120000)
+    assert pairs
+    assert all(p["fps"] >= 60 and p["price_cents"] <= 120000 for p in pairs)
+    assert [p["price_cents"] for p in pairs] == sorted(p["price_cents"] for p in pairs)
+    assert all(p["gpu_id"] != "p3" for p in pairs)
+
+
+def test_estimate_of_selected_resolutions() -> None:
+    est = _estimator()
+    fps = est.estimate(["g1"], ["1440p"])
+    assert fps.shape == (1, 1, 3, 4)
+    np.testing.assert_array_equal(fps[:, 0], est.estimate(["g1"])[:, 1])
+
+
+def test_gpu_fps_with_cpu() -> None:
+    fps = _estimator().gpu_fps_with_cpu("p1", ["aaa_open_world", "competitive_fps"], "1440p")
+    assert set(fps) == {"p0", "p1", "p2"}  # p3 has no index
+    assert fps["p2"] > fps["p1"] > fps["p0"]
+    assert _estimator().gpu_fps_with_cpu("unknown", ["indie"], "1080p") == {}
+
+
+def test_gaming_target_from_answers() -> None:
+    target = gaming_target({
+        "gaming.resolution": "4K (Ultra HD)",
+        "gaming.fps": "144+ fps (Competitive)",
+        "gaming.gameTypes": ["Competitive FPS (Valorant, CS2)", "Strategy / Simulation (Civ, Cities)"],
+    })
+    assert target.genres == ["competitive_fps", "strategy", "simulation"]
+    assert target.resolution == "4k"
+    assert target.target_fps == 144
+
+    assert gaming_target({"gaming.fps": "Uncapped / As high as possible"}).target_fps is None
+    assert gaming_target({}).resolution == "1080p"
@@ -0,0 +1,40 @@
+from app.services.game_requirements import _GameEntry, _TierRow, combine
+
+
+def _entry(title: str, storage: int, tiers: dict) -> _GameEntry:
+    return _GameEntry(title=title, min_storage_gb=storage, hard_requirements=["dx12"], tiers=tiers)
+
+
+def test_combine_takes_elementwise_max() -> None:
+    a = _entry("A", 70, {
+        "recommended": {
+            "cpu": _TierRow("c1", "CPU 1", 120.0, 16),
+            "gpu": _TierRow("g1", "GPU 1", 90.0, None),
+        },
+    })
+    b = _entry("B", 50, {
+        "recommended": {
+            "cpu": _TierRow("c2", "CPU 2", 100.0, 32),
+            "gpu": _TierRow("g2", "GPU 2", 150.0, None),
+        },
+    })
+    result = combine([a, b], "recommended")
+    assert result.cpu.part_id == "c1" and result.cpu.game == "A"
+    assert result.gpu.part_id == "g2" and result.gpu.game == "B"
+    assert result.min_ram_gb == 32
+    assert result.min_storage_gb == 120
+    assert result.hard_requirements == ["dx12"]
+
+
+def test_missing_tier_falls_back_to_lower_then_higher() -> None:
+    low = _entry("Low", 10, {"minimum": {"gpu": _TierRow("g1", "GPU 1", 50.0, 8)}})
+    high = _entry("High", 10, {"ultra": {"gpu": _TierRow("g2", "GPU 2", 40.0, 8)}})
+    assert combine([low], "recommended").gpu.part_id == "g1"
+    assert combine([high], "recommended").gpu.part_id == "g2"
+
+
+def test_indexed_part_beats_unindexed() -> None:
+    a = _entry("A", 0, {"recommended": {"gpu": _TierRow(None, "GTX 970", None, None)}})
+    b = _entry("B", 0, {"recommended": {"gpu": _TierRow("g", "RX 580", 30.0, None)}})
+    assert combine([a, b], "recommended").gpu.name == "RX 580"
+    assert combine([b, a], "recommended").gpu.name == "RX 580"
@@ -0,0 +1,27 @@
+import logging
+import sys
+
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("transformers")
+
+from app.services.llm import benchmark  # noqa: E402
+
+
+def test_main_logs_a_row_per_profile(monkeypatch: pytest.MonkeyPatch, caplog: pytest.LogCaptureFixture) -> None:
+    def fake_benchmark(_model_id, profile_name, *_args):
+        if profile_name == "cpu_bf16":
+            raise RuntimeError("bf16 unsupported")
+        return {"profile": profile_name, "load_s": 1.25, "tokens": 192, "tokens_per_s": 24.5}
+
+    monkeypatch.setattr(benchmark, "benchmark_profile", fake_benchmark)
+    monkeypatch.setattr(sys, "argv", ["benchmark", "--model", "tiny", "--profiles", "cpu_fp32", "cpu_bf16"])
+    with caplog.at_level(logging.INFO, logger=benchmark.__name__):
+        benchmark.main()
+
+    lines = [record.getMessage() for record in caplog.records]
+    assert lines[0] == "Model: tiny"
+    assert lines[2].split() == ["cpu_fp32", "1.2", "192", "24.50"]
+    assert lines[3].split() == ["cpu_bf16", "failed"]
+    assert caplog.records[3].exc_info is not None
@@ -0,0 +1,224 @@
+import asyncio
+
+import pytest
+
+from app.services.llm import gateway
+
+
+@pytest.fixture(autouse=True)
+def hedge_settings(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(gateway, "_HEDGE_MIN_SAMPLES", 3)
+    monkeypatch.setattr(gateway, "_HEDGE_BUDGET", 1.0)
+    gateway._latencies.clear()
+    gateway._hedges.clear()
+
+
+def _calls(delays: list[float]):
+    attempts: list[int] = []
+
+    async def fn() -> int:
+        attempts.append(len(attempts))
+        n = attempts[-1]
+        await asyncio.sleep(delays[n])
+        return n
+
+    return fn, attempts
+
+
+def test_no_hedge_until_enough_samples() -> None:
+    fn, attempts = _calls([0.05, 0.0])
+    assert asyncio.run(gateway._hedged("step", fn)) == 0
+    assert len(attempts) == 1
+
+
+def test_slow_call_is_hedged_and_hedge_wins() -> None:
+    fn, attempts = _calls([0.01, 0.01, 0.01, 1.0, 0.01])
+
+    async def run() -> int:
+        for _ in range(3):
+            await gateway._hedged("step", fn)
+        return await gateway._hedged("step", fn)
+
+    assert asyncio.run(run()) == 4
+    stats = gateway.hedge_stats()["step"]
+    assert stats["hedged"] == 1
+    assert stats["hedge_wins"] == 1
+
+
+def test_cancelled_call_records_its_elapsed_time() -> None:
+    fn, attempts = _calls([0.01, 0.01, 0.01, 1.0, 0.01])
+
+    async def run() -> None:
+        for _ in range(4):
+            await gateway._hedged("step", fn)
+        await asyncio.sleep(0)  # let the cancelled primary unwind
+
+    asyncio.run(run())
+    samples = list(gateway._latencies["step"])
+    # Three calls, the winning hedge and the cancelled primary, which ran
+    # past the deadline but not to its full second.
+    assert len(samples) == 5
+    assert 0.01 < samples[-1] < 1.0
+
+
+def test_budget_caps_hedges(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(gateway, "_HEDGE_BUDGET", 0.0)
+    fn, attempts = _calls([0.01, 0.01, 0.01, 0.2])
+
+    async def run() -> int:
+        for _ in range(4):
+            result = await gateway._hedged("step", fn)
+        return result
+
+    assert asyncio.run(run()) == 3
+    assert len(attempts) == 4
+    assert gateway.hedge_stats()["step"]["over_budget"] == 1
+
+
+@pytest.fixture
+def one_slot(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(gateway, "_MAX_CONCURRENCY", 1)
+    monkeypatch.setattr(gateway, "_QUEUE_TIMEOUT", 0.05)
+    gateway._slots.clear()
+    gateway._stats.clear()
+
+
+@pytest.mark.usefixtures("one_slot")
+def test_queue_timeout_rejects_without_losing_the_slot() -> None:
+    async def run() -> None:
+        async with gateway._admit("model"):
+            with pytest.raises(gateway.GatewayBusyError):
+                async with gateway._admit("model"):
+                    pass
+        # Time out exactly when the slot frees up.
+        held = asyncio.Event()
+
+        async def hold() -> None:
+            async with gateway._admit("model"):
+                held.set()
+                await asyncio.sleep(0.05)
+
+        holder = asyncio.ensure_future(hold())
+        await held.wait()
+        try:
+            async with gateway._admit("model"):
+                pass
+        except gateway.GatewayBusyError:
+            pass
+        await holder
+        async with gateway._admit("model"):
+            pass
+
+    asyncio.run(run())
+    assert gateway._slots["model"].in_use == 0
+    assert gateway.gateway_stats()["model"]["rejected"] >= 1
+
+
+@pytest.mark.usefixtures("one_slot")
+def test_cancel_while_queued_does_not_lose_the_slot() -> None:
+    async def run() -> None:
+        async with gateway._admit("model"):
+            waiter = asyncio.ensure_future(gateway._admit("model").__aenter__())
+            await asyncio.sleep(0.01)
+            waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        async with gateway._admit("model"):
+            pass
+
+    asyncio.run(run())
+    assert gateway._slots["model"].in_use == 0
+
+
+@pytest.mark.usefixtures("one_slot")
+def test_sync_and_async_calls_share_the_limit() -> None:
+    with gateway._admit_sync("model"):
+
+        async def queued() -> None:
+            async with gateway._admit("model"):
+                pass
+
+        with pytest.raises(gateway.GatewayBusyError):
+            asyncio.run(queued())
+
+    async def hold_while_sync_queues() -> None:
+        async with gateway._admit("model"):
+            with pytest.raises(gateway.GatewayBusyError):
+                await asyncio.to_thread(lambda: gateway._admit_sync("model").__enter__())
+
+    asyncio.run(hold_while_sync_queues())
+    assert gateway._slots["model"].in_use == 0
+
+
+@pytest.mark.usefixtures("one_slot")
+def test_released_slot_goes_to_a_waiter_on_the_other_path(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(gateway, "_QUEUE_TIMEOUT", 5.0)
+
+    async def run() -> None:
+        admission = gateway._admit("model")
+        with gateway._admit_sync("model"):
+            waiter = asyncio.ensure_future(admission.__aenter__())
+            await asyncio.sleep(0.01)
+            assert not waiter.done()
+        await asyncio.wait_for(waiter, timeout=1.0)
+        assert gateway._slots["model"].in_use == 1
+        await admission.__aexit__(None, None, None)
+
+    asyncio.run(run())
+    assert gateway._slots["model"].in_use == 0
+
+
+def test_retries_sleep_for_the_retry_delay(monkeypatch: pytest.MonkeyPatch) -> None:
+    sleeps: list[float] = []
+
+    async def sleep(delay: float) -> None:
+        sleeps.append(delay)
+
+    monkeypatch.setattr(gateway.asyncio, "sleep", sleep)
+    monkeypatch.setattr(gateway, "_retry_delay", lambda exc, attempt: None if isinstance(exc, KeyError) else attempt + 0.5)
+    monkeypatch.setattr(gateway, "_MAX_RETRIES", 3)
+    gateway._stats.clear()
+
+    failures = [ConnectionError(), ConnectionError()]
+
+    async def flaky() -> str:
+        if failures:
+            raise failures.pop()
+        return "ok"
+
+    async def broken() -> str:
+        raise KeyError("not retryable")
+
+    assert asyncio.run(gateway._call_with_retries("model", flaky)) == "ok"
+    assert sleeps == [0.5, 1.5]
+    with pytest.raises(KeyError):
+        asyncio.run(gateway._call_with_retries("model", broken))
+    assert gateway.gateway_stats()["model"] == {
+        "calls": 0, "retries": 2, "rejected": 0, "failures": 1, "queue_wait_s": 0.0,
+    }
+
+
+def _status_error(status: int, retry_after: str | None = None) -> Exception:
+    anthropic = pytest.importorskip("anthropic")
+    import httpx
+
+    headers = {"retry-after": retry_after} if retry_after is not None else {}
+    response = httpx.Response(status, headers=headers, request=httpx.Request("POST", "https://api.test"))
+    return anthropic.APIStatusError("error", response=response, body=None)
+
+
+def test_retry_delay_is_full_jitter_up_to_the_cap(monkeypatch: pytest.MonkeyPatch) -> None:
+    bounds: list[tuple[float, float]] = []
+    monkeypatch.setattr(gateway.random, "uniform", lambda low, high: bounds.append((low, high)) or high)
+
+    delays = [gateway._retry_delay(_status_error(529), attempt) for attempt in range(8)]
+    assert bounds == [(0, min(gateway._BACKOFF_CAP, gateway._BACKOFF_BASE * 2**n)) for n in range(8)]
+    assert delays == [high for _, high in bounds]
+    assert gateway._retry_delay(_status_error(400), 0) is None
+
+
+def test_retry_delay_honours_retry_after(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(gateway.random, "uniform", lambda low, high: low)
+    assert gateway._retry_delay(_status_error(429, "3"), 0) == 3.0
+    assert gateway._retry_delay(_status_error(429, "600"), 0) == gateway._BACKOFF_CAP
+    assert gateway._retry_delay(_status_error(503, "soon"), 0) == 0.0
@@ -0,0 +1,62 @@
+from types import SimpleNamespace
+
+from app.services.llm.prefix_cache import PrefixCache, cache_nbytes
+
+
+class FakeTensor:
+    def __init__(self, numel: int, element_size: int = 2):
+        self._numel = numel
+        self._element_size = element_size
+
+    def numel(self) -> int:
+        return self._numel
+
+    def element_size(self) -> int:
+        return self._element_size
+
+
+def _past(numel: int, layers: int = 2) -> SimpleNamespace:
+    """A DynamicCache-like object of `layers` key/value pairs, 4 * numel * layers bytes."""
+    return SimpleNamespace(layers=[
+        SimpleNamespace(keys=FakeTensor(numel), values=FakeTensor(numel)) for _ in range(layers)
+    ])
+
+
+def test_cache_nbytes_supports_both_cache_layouts() -> None:
+    assert cache_nbytes(_past(10)) == 80
+    legacy = SimpleNamespace(key_cache=[FakeTensor(10, 4)], value_cache=[FakeTensor(5, 4)])
+    assert cache_nbytes(legacy) == 60
+
+
+def test_hits_and_misses() -> None:
+    cache = PrefixCache(max_bytes=1000)
+    assert cache.get("system") is None
+    past = _past(10)
+    cache.put("system", "ids", past)
+    assert cache.get("system") == ("ids", past)
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_evicts_least_recently_used_over_the_byte_budget() -> None:
+    cache = PrefixCache(max_bytes=200)
+    cache.put("a", "a-ids", _past(10))
+    cache.put("b", "b-ids", _past(10))
+    cache.get("a")
+    cache.put("c", "c-ids", _past(10))
+    assert cache.total_bytes == 160
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+
+
+def test_replacing_an_entry_keeps_the_byte_count() -> None:
+    cache = PrefixCache(max_bytes=200)
+    cache.put("a", "ids", _past(10))
+    cache.put("a", "ids", _past(20))
+    assert cache.total_bytes == 160
+
+
+def test_oversized_and_disabled() -> None:
+    cache = PrefixCache(max_bytes=50)
+    cache.put("a", "ids", _past(10))
+    assert cache.get("a") is None and cache.total_bytes == 0
+    assert not PrefixCache(max_bytes=0).enabled
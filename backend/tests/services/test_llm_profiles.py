@@ -0,0 +1,50 @@
+import pytest
+
+from app.services.llm.profiles import (
+    CPU_PROFILES,
+    PROFILES,
+    get_profile,
+    resolve_profile,
+)
+
+_QWEN = "Qwen/Qwen2.5-0.5B-Instruct"
+
+
+@pytest.fixture(autouse=True)
+def clean_env(monkeypatch: pytest.MonkeyPatch) -> None:
+    for name in (
+        "LLM_INFERENCE_PROFILE", "LLM_MODEL_PROFILES", "LLM_NUM_THREADS", "LLM_TORCH_COMPILE",
+        "LLM_MMAP_WEIGHTS",
+    ):
+        monkeypatch.delenv(name, raising=False)
+
+
+def test_benchmark_profiles_exist() -> None:
+    assert all(PROFILES[name].device == "cpu" for name in CPU_PROFILES)
+
+
+def test_unknown_profile_lists_the_choices() -> None:
+    with pytest.raises(ValueError, match="cpu_int8"):
+        get_profile("tpu")
+
+
+def test_default_is_auto() -> None:
+    assert resolve_profile(_QWEN) is PROFILES["auto"]
+
+
+def test_per_model_override_beats_the_default(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("LLM_INFERENCE_PROFILE", "cpu_fp32")
+    monkeypatch.setenv("LLM_MODEL_PROFILES", f"mistralai/Mistral-7B-Instruct-v0.2=cpu_int8, {_QWEN}=cpu_bf16")
+    assert resolve_profile(_QWEN).name == "cpu_bf16"
+    assert resolve_profile("mistralai/Mistral-7B-Instruct-v0.2").name == "cpu_int8"
+    assert resolve_profile("other/model").name == "cpu_fp32"
+
+
+def test_env_knobs_override_the_resolved_profile(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("LLM_INFERENCE_PROFILE", "cpu_bf16_compile")
+    monkeypatch.setenv("LLM_NUM_THREADS", "6")
+    monkeypatch.setenv("LLM_TORCH_COMPILE", "0")
+    monkeypatch.setenv("LLM_MMAP_WEIGHTS", "1")
+    profile = resolve_profile(_QWEN)
+    assert (profile.num_threads, profile.compile, profile.mmap_weights) == (6, False, True)
+    assert (profile.dtype, PROFILES["cpu_bf16_compile"].compile) == ("bfloat16", True)
@@ -0,0 +1,13 @@
+import os
+
+import pytest
+
+from app.services.llm import registry
+
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/smaps_rollup"), reason="needs Linux smaps_rollup")
+def test_memory_report_splits_shared_and_private() -> None:
+    report = registry.memory_report()
+    assert report["rss_mb"] > 0
+    assert report["shared_mb"] + report["private_mb"] == pytest.approx(report["rss_mb"], rel=0.05)
+
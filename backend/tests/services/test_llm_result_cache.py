@@ -0,0 +1,53 @@
+from pathlib import Path
+
+from app.services.llm.result_cache import GenerationCache, cache_key
+
+
+def test_cache_key_depends_on_every_input() -> None:
+    base = cache_key("model", "cpu_fp32", "sys", "prompt", 64)
+    assert base == cache_key("model", "cpu_fp32", "sys", "prompt", 64)
+    assert base != cache_key("other", "cpu_fp32", "sys", "prompt", 64)
+    assert base != cache_key("model", "cpu_int8", "sys", "prompt", 64)
+    assert base != cache_key("model", "cpu_fp32", None, "prompt", 64)
+    assert base != cache_key("model", "cpu_fp32", "sys", "prompt!", 64)
+    assert base != cache_key("model", "cpu_fp32", "sys", "prompt", 65)
+
+
+def test_cache_evicts_least_recently_used() -> None:
+    cache = GenerationCache(max_entries=2)
+    cache.put("a", "A")
+    cache.put("b", "B")
+    assert cache.get("a") == "A"
+    cache.put("c", "C")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "A"
+    assert cache.get("c") == "C"
+
+
+def test_cache_persists_to_disk(tmp_path: Path) -> None:
+    path = str(tmp_path / "generations.sqlite")
+    GenerationCache(max_entries=4, path=path).put("key", "output")
+
+    reopened = GenerationCache(max_entries=4, path=path)
+    assert reopened.get("key") == "output"
+    assert reopened.hits == 1
+
+
+def test_disk_entries_expire(tmp_path: Path) -> None:
+    path = str(tmp_path / "generations.sqlite")
+    GenerationCache(max_entries=4, path=path).put("key", "output")
+
+    reopened = GenerationCache(max_entries=4, path=path, ttl_days=0)
+    assert reopened.get("key") is None
+
+
+def test_disk_is_pruned_to_its_size(tmp_path: Path) -> None:
+    path = str(tmp_path / "generations.sqlite")
+    cache = GenerationCache(max_entries=4, path=path)
+    for key in ("a", "b", "c"):
+        cache.put(key, key.upper())
+
+    reopened = GenerationCache(max_entries=4, path=path, max_disk_entries=2)
+    assert reopened._db is not None
+    assert reopened._db.execute("SELECT count(*) FROM generations").fetchone()[0] == 2
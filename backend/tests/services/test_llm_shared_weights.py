@@ -0,0 +1,55 @@
+import json
+import struct
+from pathlib import Path
+
+import pytest
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("accelerate")
+pytest.importorskip("transformers")
+
+from app.services.llm import shared_weights  # noqa: E402
+
+
+def _write_safetensors(path: Path, tensors: dict[str, torch.Tensor]) -> None:
+    header, blobs, offset = {}, [], 0
+    for name, tensor in tensors.items():
+        blob = tensor.contiguous().view(torch.uint8).numpy().tobytes()
+        dtype = {torch.float32: "F32", torch.bfloat16: "BF16", torch.int64: "I64"}[tensor.dtype]
+        header[name] = {"dtype": dtype, "shape": list(tensor.shape), "data_offsets": [offset, offset + len(blob)]}
+        blobs.append(blob)
+        offset += len(blob)
+    encoded = json.dumps({"__metadata__": {"format": "pt"}, **header}).encode()
+    path.write_bytes(struct.pack("<Q", len(encoded)) + encoded + b"".join(blobs))
+
+
+def test_mmap_safetensors_returns_views_of_the_file(tmp_path: Path) -> None:
+    weights = {
+        "w": torch.arange(6, dtype=torch.float32).reshape(2, 3),
+        "b": torch.ones(4, dtype=torch.bfloat16),
+        "steps": torch.tensor([7], dtype=torch.int64),
+        "empty": torch.empty(0, 3),
+    }
+    path = tmp_path / "model.safetensors"
+    _write_safetensors(path, weights)
+
+    loaded = shared_weights.mmap_safetensors(path)
+    assert set(loaded) == set(weights)
+    for name, tensor in weights.items():
+        assert loaded[name].dtype == tensor.dtype
+        assert torch.equal(loaded[name], tensor)
+
+    # Copy-on-write: writing to a view never reaches the file.
+    loaded["w"][0, 0] = 100.0
+    assert torch.equal(shared_weights.mmap_safetensors(path)["w"], weights["w"])
+
+
+def test_resolve_weight_files_requires_safetensors(tmp_path: Path) -> None:
+    with pytest.raises(FileNotFoundError):
+        shared_weights.resolve_weight_files(str(tmp_path))
+    (tmp_path / "model-00002.safetensors").touch()
+    (tmp_path / "model-00001.safetensors").touch()
+    assert [p.name for p in shared_weights.resolve_weight_files(str(tmp_path))] == [
+        "model-00001.safetensors", "model-00002.safetensors",
+    ]
+
@@ -0,0 +1,78 @@
+from app.schemas.chat import ChatMessage
+from app.services import local_extraction
+
+
+class FakeEngine:
+    """Scores options from a lookup table and replays canned completions."""
+
+    def __init__(self, picks: dict[str, str], completions: list[str], margin: float = 5.0):
+        self.picks = picks
+        self.completions = list(completions)
+        self.margin = margin
+
+    def chat_prompt(self, system: str, user: str) -> str:
+        return f"{system}\n{user}\n"
+
+    def score_choices(self, prefix: str, choices: list[str], per_token: bool = False) -> list[float]:
+        field = prefix.rsplit('"', 2)[-2]
+        return [self.margin if c.strip() == self.picks[field] else 0.0 for c in choices]
+
+    def complete_until(self, prefix: str, stop: str, max_new_tokens: int = 64) -> str | None:
+        return self.completions.pop(0)
+
+
+_MESSAGES = [ChatMessage(role="user", content="1440p Cyberpunk rig, around $1500")]
+
+
+def test_extract_assembles_profile() -> None:
+    engine = FakeEngine(
+        picks={"primary_use": '"gaming"', "gaming_resolution": '"1440p"', "budget_tier": '"high"'},
+        completions=['"Cyberpunk 2077"', "", "wants RGB"],
+    )
+    profile = local_extraction._extract(engine, _MESSAGES)
+
+    assert profile is not None
+    assert profile.primary_use == "gaming"
+    assert profile.gaming_resolution == "1440p"
+    assert profile.budget_tier == "high"
+    assert profile.games == ["Cyberpunk 2077"]
+    assert profile.workloads == []
+    assert profile.notes == "wants RGB"
+
+
+def test_extract_rejects_low_confidence() -> None:
+    engine = FakeEngine(
+        picks={"primary_use": '"general"', "budget_tier": '"mid"'},
+        completions=[],
+        margin=0.1,
+    )
+    assert local_extraction._extract(engine, _MESSAGES) is None
+
+
+def test_extract_rejects_unparseable_lists() -> None:
+    engine = FakeEngine(
+        picks={"primary_use": '"general"', "budget_tier": '"mid"'},
+        completions=["Cyberpunk 2077"],
+    )
+    assert local_extraction._extract(engine, _MESSAGES) is None
+
+
+class TokenEngine:
+    """Scores options from per-token log-probabilities."""
+
+    def __init__(self, token_logprobs: dict[str, list[float]]):
+        self.token_logprobs = token_logprobs
+
+    def score_choices(self, prefix: str, choices: list[str], per_token: bool = False) -> list[float]:
+        sums = [sum(self.token_logprobs[c]) for c in choices]
+        if per_token:
+            return [total / len(self.token_logprobs[c]) for total, c in zip(sums, choices, strict=True)]
+        return sums
+
+
+def test_choose_normalizes_for_option_length() -> None:
+    # Two confident tokens for the long option outscore one unsure token.
+    engine = TokenEngine({' "gaming"': [-1.5], ' "video_editing"': [-0.2, -0.1, -0.1]})
+    option, confidence = local_extraction._choose(engine, "", [' "gaming"', ' "video_editing"'])
+    assert option == ' "video_editing"'
+    assert confidence > 0.7
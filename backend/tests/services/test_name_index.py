@@ -0,0 +1,37 @@
+from app.services.name_index import NameIndex, normalize
+
+
+def test_normalize() -> None:
+    assert normalize("Baldur's Gate III") == "baldurs gate 3"
+    assert normalize("Tom Clancy’s Rainbow Six® Siege") == "tom clancys rainbow six siege"
+    assert normalize("Ratchet & Clank") == "ratchet and clank"
+    assert normalize("Pokémon") == "pokemon"
+
+
+def test_exact_slug_and_fuzzy_lookup() -> None:
+    index = NameIndex([
+        ("cp", ["Cyberpunk 2077", "cyberpunk-2077"]),
+        ("cs", ["Counter-Strike 2", "counter-strike-2"]),
+        ("bg", ["Baldur's Gate 3", "baldurs-gate-3"]),
+    ])
+    assert index.lookup("cyberpunk-2077") == ("cp", 1.0)
+    assert index.lookup("CounterStrike 2") == ("cs", 1.0)
+    assert index.lookup("baldurs gate III") == ("bg", 1.0)
+    key, score = index.lookup("cyberpnk 2077")
+    assert key == "cp" and score < 1.0
+    assert index.lookup("Minecraft") is None
+    assert index.lookup_many(["Cyberpunk 2077", "Minecraft"]) == {"Cyberpunk 2077": "cp", "Minecraft": None}
+
+
+def test_numbers_must_match_exactly() -> None:
+    index = NameIndex([
+        ("bf1", ["Battlefield 1"]),
+        ("fc6", ["Far Cry 6"]),
+        ("w3", ["The Witcher 3: Wild Hunt"]),
+        ("4090", ["GeForce RTX 4090"]),
+    ])
+    assert index.lookup("Battlefield 4") is None
+    assert index.lookup("Far Cry 5") is None
+    assert index.lookup("Far Cry VI") == ("fc6", 1.0)
+    assert index.lookup("Witcher III Wild Hunt")[0] == "w3"
+    assert index.lookup("GeForce RTX 4060") is None
@@ -0,0 +1,34 @@
+import pytest
+
+from app.services.performance_index import compute_indices
+
+INDICES = {"single": ["a", "b"], "multi": ["c"]}
+
+
+def test_median_part_scores_100() -> None:
+    scores = {i: {"a": 100 * i, "b": 10 * i, "c": 1000 * i} for i in (1, 2, 3)}
+    result = compute_indices(scores, INDICES)
+    assert result[2] == {"single": 100.0, "multi": 100.0}
+    assert result[3]["single"] == pytest.approx(150.0)
+
+
+def test_missing_benchmark_is_imputed_from_correlated_one() -> None:
+    scores = {i: {"a": 100 * i, "b": 10 * i} for i in (1, 2, 3, 4)}
+    scores[5] = {"a": 500}
+    # b tracks a exactly, so part 5's b is imputed as 50 (median b is 25).
+    expected = 100 * ((500 / 300) * (50 / 25)) ** 0.5
+    assert compute_indices(scores, INDICES)[5]["single"] == pytest.approx(expected, abs=0.1)
+
+
+def test_lower_is_better_is_inverted() -> None:
+    scores = {i: {"a": 100 * i, "lat": 10 / i} for i in (1, 2, 3, 4)}
+    scores[5] = {"lat": 2}
+    result = compute_indices(scores, {"single": ["a"]}, higher_is_better={"lat": False})
+    assert result[5]["single"] > result[4]["single"]
+
+
+def test_index_is_none_without_data() -> None:
+    scores = {1: {"a": 1}, 2: {"x": 5}, 3: {}}
+    result = compute_indices(scores, INDICES)
+    assert result[2] == {"single": None, "multi": None}
+    assert result[3] == {"single": None, "multi": None}
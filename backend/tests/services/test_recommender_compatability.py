@@ -0,0 +1,16 @@
+from app.models.part_compatibility import PartCompatibility
+from app.services.recommender.compatability import case_fan_sizes
+
+
+def _case(front: int | None, top: int | None) -> PartCompatibility:
+    return PartCompatibility(part_type="case", max_radiator_front_mm=front, max_radiator_top_mm=top)
+
+
+def test_case_fan_sizes_follow_the_radiator_mounts() -> None:
+    assert case_fan_sizes(_case(360, 240)) == [120]
+    assert case_fan_sizes(_case(360, 280)) == [120, 140]
+    assert case_fan_sizes(_case(None, 140)) == [120, 140]
+
+
+def test_unknown_mounts_do_not_filter() -> None:
+    assert case_fan_sizes(_case(None, None)) == []
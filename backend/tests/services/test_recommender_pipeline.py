@@ -0,0 +1,75 @@
+import pytest
+
+from app.services.recommender.pipeline import (
+    BuildRequest,
+    LLMPartPick,
+    PipelineState,
+    _bounded_memory_saver,
+    _picked_option,
+    _resolve_pick,
+    _software_floor,
+    _with_fps_estimates,
+)
+from app.services.recommender.schemas import PartOption
+from app.services.software_requirements import SoftwareRequirements
+
+_IDS = {
+    "o1": PartOption(id="11111111-0000-0000-0000-000000000001", name="AMD Ryzen 7 7800X3D"),
+    "o2": PartOption(id="11111111-0000-0000-0000-000000000002", name="Intel Core i5-14600K"),
+}
+
+
+def test_pick_resolves_through_option_id() -> None:
+    pick = _resolve_pick(LLMPartPick(name="Ryzen 7800X3D", reason="fast", option_id="O1"), _IDS)
+    assert pick.option_id == "o1"
+    assert pick.name == "AMD Ryzen 7 7800X3D"
+
+
+def test_pick_without_valid_id_falls_back_to_exact_name() -> None:
+    pick = _resolve_pick(LLMPartPick(name="intel core i5-14600k", reason="value", option_id="o9"), _IDS)
+    assert pick.option_id == "o2"
+    assert pick.name == "Intel Core i5-14600K"
+
+
+def test_unknown_pick_is_left_unresolved() -> None:
+    pick = _resolve_pick(LLMPartPick(name="Intel Core i5-14600", reason="value", option_id="o9"), _IDS)
+    assert pick.option_id is None
+    assert pick.name == "Intel Core i5-14600"
+
+
+def test_picked_option_follows_the_resolved_row_id() -> None:
+    state = PipelineState(request=BuildRequest(use_cases=["gaming"]), option_ids={"cpu": _IDS})
+    pick = _resolve_pick(LLMPartPick(name="AMD Ryzen 7 7800X3D", reason="fast"), _IDS)
+    assert _picked_option(state, "cpu", pick) == _IDS["o1"]
+    assert _picked_option(state, "cpu", LLMPartPick(name="AMD Ryzen 7 7800X3D", reason="fast")) is None
+    assert _picked_option(state, "cpu", None) is None
+
+
+def test_software_floor_is_reused_from_state() -> None:
+    floor = SoftwareRequirements(min_ram_gb=32)
+    state = PipelineState(request=BuildRequest(use_cases=["creative"]), software_floor=floor)
+    assert _software_floor(state) is floor
+
+
+def test_memory_saver_drops_least_recently_written_sessions() -> None:
+    pytest.importorskip("langgraph")
+    from langgraph.checkpoint.base import empty_checkpoint
+
+    def config(thread_id: str) -> dict:
+        return {"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}}
+
+    saver = _bounded_memory_saver(max_sessions=2, ttl_seconds=3600)
+    for thread_id in ("a", "b", "c"):
+        saver.put(config(thread_id), empty_checkpoint(), {}, {})
+
+    assert saver.get_tuple(config("a")) is None
+    assert saver.get_tuple(config("b")) is not None
+    assert saver.get_tuple(config("c")) is not None
+
+
+def test_fps_estimates_only_for_gaming_builds() -> None:
+    gpus = [PartOption(id="g1", name="GPU 1")]
+    cpu = _IDS["o1"]
+    office = BuildRequest(use_cases=["productivity"])
+    assert _with_fps_estimates(gpus, cpu, office) is gpus
+    assert _with_fps_estimates(gpus, None, BuildRequest(use_cases=["gaming"])) is gpus
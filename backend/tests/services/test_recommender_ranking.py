@@ -0,0 +1,40 @@
+from app.services.recommender.ranking import render_table, score_options, select_options
+from app.services.recommender.schemas import PartOption
+
+
+def _gpu(i: int, maker: str, price: int, timespy: float, vram: int) -> PartOption:
+    return PartOption(
+        id=str(i),
+        name=f"{maker} GPU {i}",
+        manufacturer=maker,
+        price_cents=price,
+        specs={"vram_gb": vram},
+        benchmarks={"timespy": timespy},
+    )
+
+
+def test_workload_changes_ranking() -> None:
+    fast = _gpu(1, "nvidia", 60000, timespy=20000, vram=12)
+    big = _gpu(2, "nvidia", 60000, timespy=15000, vram=24)
+
+    gaming = score_options([fast, big], "gpu", ["gaming"])
+    aiml = score_options([fast, big], "gpu", ["aiml"])
+    assert gaming[0] > gaming[1]
+    assert aiml[1] > aiml[0]
+
+
+def test_select_keeps_top_n_plus_diverse_picks() -> None:
+    options = [_gpu(i, "nvidia", 50000 + i * 1000, 20000 - i * 100, 16) for i in range(10)]
+    options.append(_gpu(99, "intel", 80000, 5000, 8))
+
+    picked = select_options(options, "gpu", ["gaming"], top_n=3, diversity=2)
+    ids = [o.id for o in picked]
+    assert ids[:3] == ["0", "1", "2"]
+    assert "99" in ids
+    assert len(picked) <= 5
+
+
+def test_render_table_uses_short_ids() -> None:
+    table, ids = render_table([_gpu(1, "amd", 45000, 18000, 16)])
+    assert table.splitlines() == ["id|name|usd|vram_gb", "o1|amd GPU 1|450|16"]
+    assert ids["o1"].id == "1"
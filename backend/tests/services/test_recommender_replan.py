@@ -0,0 +1,109 @@
+import asyncio
+
+import pytest
+
+from app.services.recommender import pipeline
+from app.services.recommender.pipeline import (
+    _NODE_UPSTREAM,
+    BuildRequest,
+    LLMMultiPartPick,
+    LLMPartPick,
+    PipelineState,
+    UserPreferences,
+    _changed_request_fields,
+    _dirty_nodes,
+    _format_prior_selections,
+)
+from app.services.software_requirements import SoftwareRequirements
+
+
+def _request(**prefs: object) -> BuildRequest:
+    return BuildRequest(use_cases=["gaming"], preferences=UserPreferences(**prefs))
+
+
+def test_wifi_change_reruns_motherboard_and_dependents() -> None:
+    changed = _changed_request_fields(_request(wifi_required=True), _request(wifi_required=False))
+    assert changed == {"preferences.wifi_required"}
+    assert _dirty_nodes(changed) == [
+        "pick_motherboard",
+        "pick_ram",
+        "pick_storage",
+        "pick_case_options",
+        "pick_fans",
+    ]
+
+
+def test_gpu_brand_change_keeps_cpu_side_picks() -> None:
+    changed = _changed_request_fields(
+        _request(preferred_brand_gpu="nvidia"), _request(preferred_brand_gpu="amd"),
+    )
+    assert _dirty_nodes(changed) == ["pick_gpu", "pick_psu", "pick_case_options", "pick_fans"]
+
+
+def test_unchanged_request_has_no_dirty_nodes() -> None:
+    assert _dirty_nodes(_changed_request_fields(_request(), _request())) == []
+
+
+def test_dependencies_follow_what_prompts_read() -> None:
+    assert _NODE_UPSTREAM["pick_gpu"] == {"pick_cpu"}
+    assert "pick_gpu" in _NODE_UPSTREAM["pick_case_options"]
+    assert "pick_psu" in _NODE_UPSTREAM["pick_case_options"]
+
+
+def test_cpu_brand_change_reruns_every_pick() -> None:
+    changed = _changed_request_fields(
+        _request(preferred_brand_cpu="amd"), _request(preferred_brand_cpu="intel"),
+    )
+    assert _dirty_nodes(changed) == [
+        "pick_cpu",
+        "pick_cpu_cooler",
+        "pick_motherboard",
+        "pick_ram",
+        "pick_storage",
+        "pick_gpu",
+        "pick_psu",
+        "pick_case_options",
+        "pick_fans",
+    ]
+
+
+def test_prompt_lists_only_the_picks_a_step_reads() -> None:
+    state = PipelineState(
+        request=_request(),
+        cpu=LLMPartPick(name="AMD Ryzen 7 7800X3D", reason="fast"),
+        motherboard=LLMPartPick(name="ASUS B650-A", reason="fits"),
+    )
+    prior = _format_prior_selections(state, ["cpu"])
+    assert "AMD Ryzen 7 7800X3D" in prior
+    assert "ASUS B650-A" not in prior
+
+
+def test_replan_while_awaiting_the_case_still_picks_fans(monkeypatch: pytest.MonkeyPatch) -> None:
+    memory = pytest.importorskip("langgraph.checkpoint.memory")
+
+    def fake_llm(_system, _user, schema, step="recommender"):
+        if schema is LLMMultiPartPick:
+            return LLMMultiPartPick(options=[LLMPartPick(name=f"Case {i}", reason="fits") for i in range(3)])
+        return LLMPartPick(name=f"{step} pick", reason="fits")
+
+    monkeypatch.setattr(pipeline, "_call_llm_structured", fake_llm)
+    monkeypatch.setattr(pipeline, "_query_compatible", lambda query, *args: None)
+    monkeypatch.setattr(pipeline, "_db_get_software_floor", lambda request: SoftwareRequirements())
+    monkeypatch.setattr(pipeline, "_async_pipeline", pipeline._build_graph(memory.InMemorySaver()))
+
+    async def collect(events) -> list[dict]:
+        return [event async for event in events]
+
+    async def run() -> list[dict]:
+        phase1 = await collect(pipeline.astream_build_phase1(_request(rgb_lighting=False)))
+        session_id = phase1[0]["session_id"]
+        replan = await collect(pipeline.astream_replan(session_id, _request(rgb_lighting=True)))
+        assert replan[0] == {"type": "replan", "dirty": ["pick_cpu_cooler", "pick_ram", "pick_case_options"]}
+        assert replan[-1]["type"] == "awaiting_case_selection"
+        return await collect(pipeline.astream_build_phase2(session_id, 1))
+
+    phase2 = asyncio.run(run())
+    build = phase2[-1]
+    assert build["type"] == "build"
+    assert build["data"]["case"]["name"] == "Case 1"
+    assert build["data"]["fans"]["name"] == "fans pick"
@@ -0,0 +1,26 @@
+from app.services.software_requirements import (
+    SoftwareRequirementResolver,
+    intensity_from_answers,
+    software_phrases,
+)
+
+
+def test_software_phrases_split_pieces_and_drop_parentheticals() -> None:
+    assert software_phrases(["Adobe Premiere / After Effects", "Office suite (Word, Excel, etc.)"]) == [
+        "Adobe Premiere / After Effects", "Adobe Premiere", "After Effects", "Office suite",
+    ]
+
+
+def test_intensity_takes_heaviest_answer() -> None:
+    assert intensity_from_answers({}) == 0.5
+    assert intensity_from_answers({"creative.ram": "Light (single project, small files)"}) == 0.0
+    answers = {
+        "creative.ram": "Medium (multiple apps, moderate files)",
+        "aiml.workload": "Training large models",
+    }
+    assert intensity_from_answers(answers) == 1.0
+
+
+def test_no_phrases_skips_the_database() -> None:
+    result = SoftwareRequirementResolver().resolve(db=None, phrases=[], intensity=0.2)
+    assert result.software == [] and result.min_ram_gb is None and result.intensity == 0.2
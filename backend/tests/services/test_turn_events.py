@@ -0,0 +1,127 @@
+import asyncio
+import uuid
+
+import pytest
+
+from app.services import turn_events
+from app.services.turn_events import (
+    DONE,
+    EventsEvicted,
+    IdempotencyConflict,
+    TurnEventStore,
+    TurnLog,
+)
+
+
+async def _collect(log: TurnLog, after: int = 0) -> list[tuple[int, str]]:
+    return [event async for event in log.subscribe(after)]
+
+
+def test_subscriber_resumes_after_last_event_id() -> None:
+    async def run() -> list[tuple[int, str]]:
+        log = TurnLog("turn")
+        for data in ("a", "b", "c", DONE):
+            await log.append(data)
+        await log.finish()
+        return await _collect(log, after=2)
+
+    assert asyncio.run(run()) == [(3, "c"), (4, DONE)]
+
+
+def test_live_subscriber_sees_events_as_they_arrive() -> None:
+    async def run() -> list[tuple[int, str]]:
+        log = TurnLog("turn")
+        subscriber = asyncio.create_task(_collect(log))
+        for data in ("a", "b"):
+            await asyncio.sleep(0)
+            await log.append(data)
+        await log.finish()
+        return await subscriber
+
+    assert asyncio.run(run()) == [(1, "a"), (2, "b")]
+
+
+def test_evicted_events_raise() -> None:
+    async def run() -> None:
+        log = TurnLog("turn", max_events=2)
+        for data in ("a", "b", "c"):
+            await log.append(data)
+        await log.finish()
+        assert log.first_seq == 2
+        await _collect(log, after=0)
+
+    with pytest.raises(EventsEvicted):
+        asyncio.run(run())
+
+
+def test_store_evicts_finished_turns_first() -> None:
+    async def run() -> None:
+        store = TurnEventStore(max_turns=2, ttl_seconds=60)
+        running, _ = store.create()
+        finished, _ = store.create()
+        await finished.finish()
+        newest, _ = store.create()
+
+        assert await store.get(running.turn_id) is running
+        assert await store.get(finished.turn_id) is None
+        assert await store.get(newest.turn_id) is newest
+
+    asyncio.run(run())
+
+
+def test_idempotency_key_returns_existing_turn() -> None:
+    async def run() -> None:
+        store = TurnEventStore()
+        first, created = store.create("key", "fp")
+        assert created
+        again, created = store.create("key", "fp")
+        assert again is first
+        assert not created
+
+        with pytest.raises(IdempotencyConflict):
+            store.create("key", "other")
+
+    asyncio.run(run())
+
+
+def test_idempotency_key_expires_after_finish() -> None:
+    async def run() -> None:
+        store = TurnEventStore(idempotency_ttl_seconds=0)
+        first, _ = store.create("key", "fp")
+        await first.finish()
+        second, created = store.create("key", "fp")
+        assert created
+        assert second is not first
+
+    asyncio.run(run())
+
+
+def test_store_records_the_turn_owner() -> None:
+    store = TurnEventStore()
+    mine, _ = store.create(owner="uid-1")
+    guest, _ = store.create()
+    assert mine.owner == "uid-1"
+    assert guest.owner is None
+
+
+def test_unfinished_turn_from_postgres_is_followed_until_finished(monkeypatch: pytest.MonkeyPatch) -> None:
+    # Another worker is producing the turn: two polls add events, the third
+    # sees it marked finished.
+    reads = iter([
+        ("uid-1", False, [(1, "a")]),
+        ("uid-1", False, [(2, "b")]),
+        ("uid-1", True, [(3, DONE)]),
+    ])
+    monkeypatch.setattr(turn_events, "_POSTGRES", True)
+    monkeypatch.setattr(turn_events, "_POLL_SECONDS", 0)
+    monkeypatch.setattr(turn_events, "_pg_read", lambda turn_id, after, limit: next(reads))
+
+    async def run() -> list[tuple[int, str]]:
+        store = TurnEventStore()
+        log = await store.get(str(uuid.uuid4()))
+        assert log is not None
+        assert log.owner == "uid-1"
+        assert not log.finished
+        return await _collect(log)
+
+    assert asyncio.run(run()) == [(1, "a"), (2, "b"), (3, DONE)]